@@ -5,7 +5,6 @@ A library to read from and write to
 * Apache Parquet
 * ODBC (databases)
 """
-import zoneinfo
 import enum
 import typing
 import datetime
@@ -111,8 +110,8 @@ class DataType:
     def timestamp(
         cls, unit: TimeUnit, tz: typing.Optional[datetime.tzinfo]
     ) -> "DataType":
-        if tz:
-            tz = tz.tzname(None)
+        if tz is not None:
+            tz = _arrowdantic_internal.tzinfo_name(tz)
         if unit == TimeUnit.s:
             return cls._from_type(_arrowdantic_internal.DataType.ts_s(tz))
         if unit == TimeUnit.ms:
@@ -208,7 +207,7 @@ class Array(abc.ABC):
     def _from_array(cls, array):
         # dynamic dispatch of the array based to the corresponding types
         if array.type == _arrowdantic_internal.DataType.time():
-            return TimeArray(array)
+            return TimeArray._from_array(array)
         if array.type == _arrowdantic_internal.DataType.date():
             return DateArray._from_array(array)
         if array.type.is_ts():
@@ -262,36 +261,246 @@ class Array(abc.ABC):
     def __iter__(self):
         return self._array.__iter__()
 
+    def __arrow_c_array__(self, requested_schema=None):
+        """Exports this array through the Arrow C data interface (PyCapsule protocol)"""
+        return self._array.__arrow_c_array__(requested_schema)
+
+    def null_count(self) -> int:
+        """The number of null slots in this array"""
+        return self._array.null_count()
+
+    def count(self) -> int:
+        """The number of non-null slots in this array"""
+        return self._array.count()
+
+    def min(self):
+        """The minimum of the non-null values, or ``None`` when there are none"""
+        return self._array.min()
+
+    def max(self):
+        """The maximum of the non-null values, or ``None`` when there are none"""
+        return self._array.max()
+
+    def eq(self, other) -> "BooleanArray":
+        """
+        Element-wise ``==`` with an array of the same type and length, or with a scalar.
+        Comparisons with nulls are null. Note that ``array == other`` compares whole arrays.
+        """
+        return BooleanArray(self._array.eq(_operand(other)))
+
+    def ne(self, other) -> "BooleanArray":
+        """Element-wise ``!=``. Note that ``array != other`` compares whole arrays."""
+        return BooleanArray(self._array.ne(_operand(other)))
+
+    def lt(self, other) -> "BooleanArray":
+        """Element-wise ``<``, also available as ``array < other``"""
+        return BooleanArray(self._array.lt(_operand(other)))
+
+    def le(self, other) -> "BooleanArray":
+        """Element-wise ``<=``, also available as ``array <= other``"""
+        return BooleanArray(self._array.le(_operand(other)))
+
+    def gt(self, other) -> "BooleanArray":
+        """Element-wise ``>``, also available as ``array > other``"""
+        return BooleanArray(self._array.gt(_operand(other)))
+
+    def ge(self, other) -> "BooleanArray":
+        """Element-wise ``>=``, also available as ``array >= other``"""
+        return BooleanArray(self._array.ge(_operand(other)))
+
+    def __lt__(self, other):
+        return _comparison(self._array.__lt__(_operand(other)))
+
+    def __le__(self, other):
+        return _comparison(self._array.__le__(_operand(other)))
+
+    def __gt__(self, other):
+        return _comparison(self._array.__gt__(_operand(other)))
+
+    def __ge__(self, other):
+        return _comparison(self._array.__ge__(_operand(other)))
+
+    def to_pylist(self) -> typing.List[typing.Any]:
+        """Returns the values of this array (``None`` for nulls) as a list, in a single native call"""
+        return self._array.to_pylist()
+
+    def __getitem__(self, key: typing.Union[int, slice]):
+        """
+        The value at index ``key`` (``None`` when null), or an array with the values of the slice
+        ``key``. Slices with step 1 share this array's memory (no copy is performed).
+        """
+        if isinstance(key, slice):
+            return Array._from_array(self._array[key])
+        return self._array[key]
+
+    def filter(self, mask: "BooleanArray") -> "Array":
+        """Returns the values where ``mask`` is ``True`` (nulls count as ``False``)"""
+        return Array._from_array(self._array.filter(mask._array))
+
+    def take(self, indices: typing.Union["Array", typing.Iterable[int]]) -> "Array":
+        """
+        Returns the values at ``indices``, an integer ``Array`` or an iterable of non-negative
+        integers. Null indices take nulls.
+        """
+        return Array._from_array(self._array.take(_indices(indices)))
+
+    @classmethod
+    def from_arrow(cls, obj) -> "Array":
+        """
+        Imports an array from any object implementing ``__arrow_c_array__``
+        (e.g. a ``pyarrow.Array``) without copying its data. Raises ``TypeError`` when its
+        type is not supported.
+        """
+        return Array._from_array(_arrowdantic_internal.import_array(obj))
+
+
+def _operand(other):
+    """The internal array of ``other`` when it is an ``Array``, or ``other`` (a scalar)"""
+    return other._array if isinstance(other, Array) else other
+
+
+def _comparison(result):
+    """The ``BooleanArray`` of the internal ``result`` of a comparison, or ``NotImplemented``"""
+    return result if result is NotImplemented else BooleanArray(result)
+
+
+def _indices(indices):
+    return indices._array if isinstance(indices, Array) else list(indices)
+
+
+class _PrimitiveArray(Array):
+    """
+    An ``Array`` whose values are stored in a contiguous buffer of a native type.
+
+    Besides iterables of (optional) values, these arrays can be created from any object
+    supporting the buffer protocol with a matching type (e.g. ``numpy.ndarray``,
+    ``array.array``, ``memoryview``), in which case the values are copied in bulk.
+    ``validity`` is an optional sequence or buffer of booleans where ``False`` denotes a null.
+
+    They support the arithmetic operators ``+``, ``-``, ``*`` and ``/`` with arrays of the
+    same type and length and with scalars, computed natively. Nulls propagate; integers wrap
+    around on overflow and ``/`` always returns a ``Float64Array``.
+    """
+
+    def sum(self):
+        """The sum of the non-null values, or ``None`` when there are none"""
+        return self._array.sum()
+
+    def mean(self) -> typing.Optional[float]:
+        """The mean of the non-null values, or ``None`` when there are none"""
+        return self._array.mean()
+
+    def __add__(self, other) -> "_PrimitiveArray":
+        return Array._from_array(self._array + _operand(other))
+
+    def __radd__(self, other) -> "_PrimitiveArray":
+        return Array._from_array(other + self._array)
+
+    def __sub__(self, other) -> "_PrimitiveArray":
+        return Array._from_array(self._array - _operand(other))
 
-class Int8Array(Array):
+    def __rsub__(self, other) -> "_PrimitiveArray":
+        return Array._from_array(other - self._array)
+
+    def __mul__(self, other) -> "_PrimitiveArray":
+        return Array._from_array(self._array * _operand(other))
+
+    def __rmul__(self, other) -> "_PrimitiveArray":
+        return Array._from_array(other * self._array)
+
+    def __truediv__(self, other) -> "Float64Array":
+        return Array._from_array(self._array / _operand(other))
+
+    def __rtruediv__(self, other) -> "Float64Array":
+        return Array._from_array(other / self._array)
+
+    def to_numpy(self, zero_copy_only: bool = True):
+        """
+        Returns a tuple ``(values, validity)`` of numpy arrays.
+
+        ``values`` is a read-only view over this array's memory (no copy is performed).
+        ``validity`` is ``None`` if the array has no nulls; otherwise it is a boolean array
+        where ``False`` denotes a null slot, whose value in ``values`` is undefined.
+
+        Raises ``ValueError`` when ``zero_copy_only`` is true and the array contains nulls,
+        since ``validity`` must then be allocated.
+        """
+        import numpy
+
+        values = numpy.asarray(memoryview(self._array))
+        validity = self._array.validity()
+        if validity is None:
+            return values, None
+        if zero_copy_only:
+            raise ValueError(
+                "The array contains nulls; use zero_copy_only=False to materialize its validity"
+            )
+        return values, numpy.frombuffer(validity, dtype=numpy.bool_)
+
+
+class Int8Array(_PrimitiveArray):
     """An array of 8-bit signed integers"""
 
-    def __init__(self, values: typing.Iterable[typing.Optional[int]]):
-        self._array = _arrowdantic_internal.Int8Array(values)
+    def __init__(
+        self,
+        values: typing.Iterable[typing.Optional[int]],
+        validity: typing.Optional[typing.Iterable[bool]] = None,
+    ):
+        self._array = _arrowdantic_internal.Int8Array(values, validity)
 
 
-class Int16Array(Array):
+class Int16Array(_PrimitiveArray):
     """An array of 16-bit signed integers"""
 
-    def __init__(self, values: typing.Iterable[typing.Optional[int]]):
-        self._array = _arrowdantic_internal.Int16Array(values)
+    def __init__(
+        self,
+        values: typing.Iterable[typing.Optional[int]],
+        validity: typing.Optional[typing.Iterable[bool]] = None,
+    ):
+        self._array = _arrowdantic_internal.Int16Array(values, validity)
 
 
-class Int32Array(Array):
+class Int32Array(_PrimitiveArray):
     """An array of 32-bit signed integers"""
 
-    def __init__(self, values: typing.Iterable[typing.Optional[int]]):
-        self._array = _arrowdantic_internal.Int32Array(values)
+    def __init__(
+        self,
+        values: typing.Iterable[typing.Optional[int]],
+        validity: typing.Optional[typing.Iterable[bool]] = None,
+    ):
+        self._array = _arrowdantic_internal.Int32Array(values, validity)
 
 
-class Int64Array(Array):
+class Int64Array(_PrimitiveArray):
     """An array of 64-bit signed integers"""
 
-    def __init__(self, values: typing.Iterable[typing.Optional[int]]):
-        self._array = _arrowdantic_internal.Int64Array(values)
+    def __init__(
+        self,
+        values: typing.Iterable[typing.Optional[int]],
+        validity: typing.Optional[typing.Iterable[bool]] = None,
+    ):
+        self._array = _arrowdantic_internal.Int64Array(values, validity)
+
+
+class _TemporalArray(Array):
+    """
+    An array of ``datetime``, ``date`` or ``time`` values. Values are converted to and from
+    Python natively, with exact integer arithmetic.
+    """
+
+    __slots__ = ()
+
+    def __iter__(self):
+        return iter(self.to_pylist())
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return super().__getitem__(key)
+        index = range(len(self))[key]
+        return self._array[index : index + 1].to_pylist()[0]
 
 
-class TimestampArray(Int64Array):
+class TimestampArray(_TemporalArray, Int64Array):
     """
     An array where each element represents a ``datetime`` with the same (typing.Optional) timezone
 
@@ -300,6 +509,8 @@ class TimestampArray(Int64Array):
     * Arrow timestamps are represented as integers.
     * While Python ``datetime`` stores its timezone on a per-element, Arrow timestamps have
       a common timezone.
+
+    Naive ``datetime`` are stored as if they were in UTC, and read back as naive ``datetime``.
     """
 
     @classmethod
@@ -319,49 +530,14 @@ class TimestampArray(Int64Array):
         return self._array.type.timeunit()
 
     def __init__(
-        self, values: typing.List[typing.Optional[datetime.datetime]], unit: TimeUnit,
+        self, values: typing.Iterable[typing.Optional[datetime.datetime]], unit: TimeUnit,
         tz: typing.Optional[datetime.tzinfo] = None,
     ):
-        """Initializes a"""
-        if not values:
-            tz = None
-            str_tz = None
-        else:
-            tz = values[0].tzinfo
-            if tz is not None:
-                str_tz = tz.tzname(values[0])
-            else:
-                str_tz = None
-
-        if unit == TimeUnit.s:
-            factor = 1
-        if unit == TimeUnit.ms:
-            factor = 10**3
-        if unit == TimeUnit.us:
-            factor = 10**6
-        if unit == TimeUnit.ns:
-            factor = 10**9
-
-        def _transform(value: typing.Optional[datetime.datetime]):
-            if value is None:
-                return None
-            else:
-                if value.tzinfo != tz:
-                    raise ValueError("Values must all have the same tzinfo")
-                seconds = value.timestamp()
-                microseconds = int(seconds * factor)
-                return microseconds
-
-        values = list(map(_transform, values))
-
-        if unit == TimeUnit.s:
-            self._array = _arrowdantic_internal.Int64Array.from_ts_s(values, str_tz)
-        if unit == TimeUnit.ms:
-            self._array = _arrowdantic_internal.Int64Array.from_ts_ms(values, str_tz)
-        if unit == TimeUnit.us:
-            self._array = _arrowdantic_internal.Int64Array.from_ts_us(values, str_tz)
-        if unit == TimeUnit.ns:
-            self._array = _arrowdantic_internal.Int64Array.from_ts_ns(values, str_tz)
+        """
+        Initializes a ``TimestampArray`` from ``datetime`` values, which must all have the same
+        ``tzinfo``. The timezone of the array is the one of the values.
+        """
+        self._array = _arrowdantic_internal.Int64Array.from_datetimes(values, unit)
 
     @classmethod
     def from_timestamps(
@@ -373,7 +549,7 @@ class TimestampArray(Int64Array):
         self = cls([], unit, tz)
 
         if tz is not None:
-            str_tz = tz.tzname(None)
+            str_tz = _arrowdantic_internal.tzinfo_name(tz)
         else:
             str_tz = None
         if unit == TimeUnit.s:
@@ -386,161 +562,127 @@ class TimestampArray(Int64Array):
             self._array = _arrowdantic_internal.Int64Array.from_ts_ns(values, str_tz)
         return self
 
-    def __iter__(self) -> typing.Iterator[typing.Optional[datetime.datetime]]:
-        return _TimestampIterator(self._array.__iter__(), self.timeunit, self.tzinfo)
-
-
-class _TimestampIterator:
-    """An iterator of timestamps"""
 
-    __slots__ = ("_iter", "_tz", "_factor")
-
-    def __init__(self, iter, unit: TimeUnit, tz: datetime.tzinfo):
-        self._iter = iter
-        self._tz = zoneinfo.ZoneInfo(tz)
-        if unit == TimeUnit.s:
-            factor = 1
-        if unit == TimeUnit.ms:
-            factor = 1 / 10**3
-        if unit == TimeUnit.us:
-            factor = 1 / 10**6
-        if unit == TimeUnit.ns:
-            factor = 1 / 10**9
-        self._factor = factor
-
-    def __iter__(self):
-        return self
-
-    def __next__(self) -> typing.Optional[datetime.datetime]:
-        dt_i64 = next(self._iter)
-        if dt_i64 is not None:
-            return datetime.datetime.fromtimestamp(dt_i64 * self._factor, self._tz)
-
-
-_DATE_EPOCH = datetime.datetime.utcfromtimestamp(0).date()
-
-
-class DateArray(Int32Array):
+class DateArray(_TemporalArray, Int32Array):
     """An array of 32-bit signed integers each representing the day since epoch"""
 
     @classmethod
     def _from_array(cls, array):
         self = DateArray([])
         self._array = array
-
-    def __init__(self, values: typing.List[typing.Optional[datetime.date]]):
-        def _transform(value: typing.Optional[datetime.date]):
-            if value is None:
-                return None
-            else:
-                return (value - _DATE_EPOCH).days
-
-        values = list(map(_transform, values))
-        self._array = _arrowdantic_internal.Int32Array.from_date(values)
-
-    def __iter__(self):
-        return _DateIterator(self._array.__iter__())
-
-
-class _DateIterator:
-    __slots__ = "_iter"
-
-    def __init__(self, iter):
-        self._iter = iter
-
-    def __iter__(self):
         return self
 
-    def __next__(self):
-        dt_i32 = next(self._iter)
-        if dt_i32 is not None:
-            return _DATE_EPOCH + datetime.timedelta(days=dt_i32)
+    def __init__(self, values: typing.Iterable[typing.Optional[datetime.date]]):
+        self._array = _arrowdantic_internal.Int32Array.from_dates(values)
 
 
-class TimeArray(Int64Array):
+class TimeArray(_TemporalArray, Int64Array):
     """An array of 64-bit signed integers each representing the naive time since midnight with microsecond precision"""
 
-    def __init__(self, values: typing.List[typing.Optional[datetime.time]]):
-        def _transform(value: typing.Optional[datetime.time]):
-            if value is None:
-                return None
-            else:
-                return (
-                    (value.hour * 60 + value.minute) * 60 + value.second
-                ) * 10**6 + value.microsecond
-
-        values = list(map(_transform, values))
-        self._array = _arrowdantic_internal.Int64Array.from_time_us(values)
-
-    def __iter__(self):
-        return _TimeIterator(self._array.__iter__())
-
-
-class _TimeIterator:
-    """An iterator of timestamps"""
-
-    __slots__ = "_iter"
-
-    def __init__(self, iter):
-        self._iter = iter
-
-    def __iter__(self):
+    @classmethod
+    def _from_array(cls, array):
+        self = TimeArray([])
+        self._array = array
         return self
 
-    def __next__(self):
-        time_us = next(self._iter)
-        if time_us is not None:
-            return datetime.datetime.fromtimestamp(time_us / 10**6).time()
+    def __init__(self, values: typing.Iterable[typing.Optional[datetime.time]]):
+        self._array = _arrowdantic_internal.Int64Array.from_times(values)
 
 
-class Float32Array(Array):
+class Float32Array(_PrimitiveArray):
     """An array of 32-bit floating point"""
 
-    def __init__(self, values: typing.Iterable[typing.Optional[float]]):
-        self._array = _arrowdantic_internal.Float32Array(values)
+    def __init__(
+        self,
+        values: typing.Iterable[typing.Optional[float]],
+        validity: typing.Optional[typing.Iterable[bool]] = None,
+    ):
+        self._array = _arrowdantic_internal.Float32Array(values, validity)
 
 
-class Float64Array(Array):
+class Float64Array(_PrimitiveArray):
     """An array of 64-bit floating point"""
 
-    def __init__(self, values: typing.Iterable[typing.Optional[float]]):
-        self._array = _arrowdantic_internal.Float64Array(values)
+    def __init__(
+        self,
+        values: typing.Iterable[typing.Optional[float]],
+        validity: typing.Optional[typing.Iterable[bool]] = None,
+    ):
+        self._array = _arrowdantic_internal.Float64Array(values, validity)
 
 
-class UInt8Array(Array):
+class UInt8Array(_PrimitiveArray):
     """An array of 8-bit unsigned integers (also known as bytes)"""
 
-    def __init__(self, values: typing.Iterable[typing.Optional[int]]):
-        self._array = _arrowdantic_internal.UInt8Array(values)
+    def __init__(
+        self,
+        values: typing.Iterable[typing.Optional[int]],
+        validity: typing.Optional[typing.Iterable[bool]] = None,
+    ):
+        self._array = _arrowdantic_internal.UInt8Array(values, validity)
 
 
-class UInt16Array(Array):
+class UInt16Array(_PrimitiveArray):
     """An array of 16-bit unsigned integers"""
 
-    def __init__(self, values: typing.Iterable[typing.Optional[int]]):
-        self._array = _arrowdantic_internal.UInt16Array(values)
+    def __init__(
+        self,
+        values: typing.Iterable[typing.Optional[int]],
+        validity: typing.Optional[typing.Iterable[bool]] = None,
+    ):
+        self._array = _arrowdantic_internal.UInt16Array(values, validity)
 
 
-class UInt32Array(Array):
+class UInt32Array(_PrimitiveArray):
     """An array of 32-bit unsigned integers"""
 
-    def __init__(self, values: typing.Iterable[typing.Optional[int]]):
-        self._array = _arrowdantic_internal.UInt32Array(values)
+    def __init__(
+        self,
+        values: typing.Iterable[typing.Optional[int]],
+        validity: typing.Optional[typing.Iterable[bool]] = None,
+    ):
+        self._array = _arrowdantic_internal.UInt32Array(values, validity)
 
 
-class UInt64Array(Array):
+class UInt64Array(_PrimitiveArray):
     """An array of 64-bit unsigned integers"""
 
-    def __init__(self, values: typing.Iterable[typing.Optional[int]]):
-        self._array = _arrowdantic_internal.UInt64Array(values)
+    def __init__(
+        self,
+        values: typing.Iterable[typing.Optional[int]],
+        validity: typing.Optional[typing.Iterable[bool]] = None,
+    ):
+        self._array = _arrowdantic_internal.UInt64Array(values, validity)
 
 
 class BooleanArray(Array):
-    """An array of booleans"""
+    """
+    An array of booleans. It supports ``&``, ``|`` (with boolean arrays of the same length and
+    with booleans) and ``~``; results are null where either operand is null.
+    """
 
     def __init__(self, values: typing.Iterable[typing.Optional[bool]]):
         self._array = _arrowdantic_internal.BooleanArray(values)
 
+    def sum(self) -> int:
+        """The number of ``True`` values"""
+        return self._array.sum()
+
+    def __and__(self, other) -> "BooleanArray":
+        return BooleanArray(self._array & _operand(other))
+
+    def __rand__(self, other) -> "BooleanArray":
+        return BooleanArray(self._array & other)
+
+    def __or__(self, other) -> "BooleanArray":
+        return BooleanArray(self._array | _operand(other))
+
+    def __ror__(self, other) -> "BooleanArray":
+        return BooleanArray(self._array | other)
+
+    def __invert__(self) -> "BooleanArray":
+        return BooleanArray(~self._array)
+
 
 class StringArray(Array):
     """An array of strings"""
@@ -572,6 +714,17 @@ class LargeBinaryArray(Array):
         self._array = _arrowdantic_internal.LargeBinaryArray(values)
 
 
+def _column_index(key: typing.Union[int, str], schema: typing.Optional[Schema]) -> int:
+    if isinstance(key, int):
+        return key
+    if schema is None:
+        raise ValueError("Columns can only be selected by name with a schema")
+    for index, field in enumerate(schema.fields):
+        if field.name == key:
+            return index
+    raise KeyError(key)
+
+
 class Chunk:
     """A list of ``Array``s all with the same length"""
 
@@ -594,6 +747,105 @@ class Chunk:
     def __len__(self) -> int:
         return self._chunk.__len__()
 
+    def _names(self, schema: typing.Optional[Schema]) -> typing.List[str]:
+        if schema is None:
+            return [f"c{i}" for i in range(len(self._chunk.arrays()))]
+        return [field.name for field in schema.fields]
+
+    def to_pydict(self, schema: typing.Optional[Schema] = None) -> typing.Dict[str, typing.List]:
+        """
+        Returns a dictionary of column name to the list of its values. Columns are named after
+        ``schema`` when provided, and ``c{i}`` otherwise.
+        """
+        return self._chunk.to_pydict(self._names(schema))
+
+    def to_pylist(self, schema: typing.Optional[Schema] = None) -> typing.List[typing.Dict]:
+        """
+        Returns a list with one dictionary of column name to value per row, built in a single
+        native call (e.g. to serialize a chunk to JSON). Columns are named as in ``to_pydict``.
+        """
+        return self._chunk.to_pylist(self._names(schema))
+
+    def column(
+        self, key: typing.Union[int, str], schema: typing.Optional[Schema] = None
+    ) -> Array:
+        """
+        Returns the array of a column, by index or by name. Names are resolved against ``schema``
+        (e.g. the schema of the reader that returned this chunk), since chunks have no names.
+        """
+        return Array._from_array(self._chunk.column(_column_index(key, schema)))
+
+    def select(
+        self,
+        keys: typing.Iterable[typing.Union[int, str]],
+        schema: typing.Optional[Schema] = None,
+    ) -> "Chunk":
+        """
+        Returns a chunk with the columns ``keys`` (indices or names, see ``column``), in order.
+        No data is copied.
+        """
+        return Chunk._from_chunk(
+            self._chunk.select([_column_index(key, schema) for key in keys])
+        )
+
+    def __getitem__(self, key: slice) -> "Chunk":
+        """The rows of the slice ``key``; slices with step 1 do not copy data"""
+        return Chunk._from_chunk(self._chunk[key])
+
+    def filter(self, mask: BooleanArray) -> "Chunk":
+        """Returns the rows where ``mask`` is ``True`` (nulls count as ``False``)"""
+        return Chunk._from_chunk(self._chunk.filter(mask._array))
+
+    def take(self, indices: typing.Union[Array, typing.Iterable[int]]) -> "Chunk":
+        """
+        Returns the rows at ``indices``, an integer ``Array`` or an iterable of non-negative
+        integers
+        """
+        return Chunk._from_chunk(self._chunk.take(_indices(indices)))
+
+    def __arrow_c_array__(self, requested_schema=None):
+        """
+        Exports this chunk as a struct array through the Arrow C data interface (PyCapsule protocol).
+        Fields are named after ``requested_schema`` when provided, and ``c{i}`` otherwise.
+        """
+        return self._chunk.__arrow_c_array__(requested_schema)
+
+    @staticmethod
+    def from_arrow(obj) -> "Chunk":
+        """
+        Imports a chunk from any object implementing ``__arrow_c_array__`` of a struct array
+        (e.g. a ``pyarrow.RecordBatch``) without copying its data.
+        """
+        return Chunk._from_chunk(_arrowdantic_internal.import_chunk(obj))
+
+
+def concat(chunks: typing.Iterable[Chunk]) -> Chunk:
+    """
+    Concatenates chunks with the same number and types of columns into a single ``Chunk``.
+    """
+    return Chunk._from_chunk(_arrowdantic_internal.concat([c._chunk for c in chunks]))
+
+
+def rechunk(
+    chunks: typing.Iterable[Chunk],
+    target_rows: typing.Optional[int] = None,
+    target_bytes: typing.Optional[int] = None,
+) -> typing.Iterator[Chunk]:
+    """
+    Returns an iterator of chunks with the rows of ``chunks``, merged and split into chunks of
+    ``target_rows`` rows and (estimated) ``target_bytes`` bytes, whichever is smaller; only the
+    last chunk may be smaller. Small chunks are concatenated and large chunks are sliced
+    without copying them.
+
+    Example: ``writer.write`` of each chunk of ``rechunk(reader, target_rows=1_000_000)``
+    writes row groups of 1M rows regardless of the sizes of the chunks of ``reader``.
+    """
+    rechunker = _arrowdantic_internal.Rechunker(
+        (chunk._chunk for chunk in chunks), target_rows, target_bytes
+    )
+    for chunk in rechunker:
+        yield Chunk._from_chunk(chunk)
+
 
 class ArrowFileReader:
     """
@@ -601,13 +853,132 @@ class ArrowFileReader:
     Use this class to read Arrow IPC files.
 
     The chunks are guaranteed to have the same schema.
+
+    ``offset`` and ``limit`` restrict the chunks to the rows ``[offset, offset + limit)``.
+    Record batches before ``offset`` are skipped by reading only their headers, and
+    reading stops once ``limit`` rows were read.
+
+    With ``memory_map=True`` (only for paths), the file is memory-mapped instead of read:
+    only the pages of the record batches that are read are loaded, and they are shared
+    between processes mapping the same file.
+
+    Reads are buffered by a read-ahead buffer of ``buffer_size`` bytes, that coalesces small
+    adjacent reads into a single read of the file. File-like objects are read with
+    ``readinto`` when they support it.
+
+    With ``prefetch=k`` (``k > 0``), up to ``k`` chunks are read and decoded ahead on a native
+    background thread, so that reading overlaps with the processing of the current chunk.
+    Prefetching pauses while the decoded chunks not yet consumed exceed ``prefetch_bytes``.
     """
 
-    def __init__(self, path_or_obj):
-        self._reader = _arrowdantic_internal.ArrowFileReader(path_or_obj)
+    def __init__(
+        self,
+        path_or_obj,
+        limit: typing.Optional[int] = None,
+        offset: int = 0,
+        memory_map: bool = False,
+        buffer_size: int = 1 << 20,
+        prefetch: int = 0,
+        prefetch_bytes: int = 256 << 20,
+    ):
+        self._reader = _arrowdantic_internal.ArrowFileReader(
+            path_or_obj,
+            limit,
+            offset,
+            memory_map,
+            buffer_size,
+            prefetch,
+            prefetch_bytes,
+        )
 
     def schema(self) -> Schema:
-        schema = Schema()
+        schema = Schema([])
+        schema._schema = self._reader.schema()
+        return schema
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return Chunk._from_chunk(next(self._reader))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Chunk:
+        """
+        Reads and decodes the next chunk on a native thread without blocking the event loop.
+        """
+        chunk = await self._reader.next_async()
+        if chunk is None:
+            raise StopAsyncIteration
+        return Chunk._from_chunk(chunk)
+
+    def __arrow_c_stream__(self, requested_schema=None):
+        """
+        Exports the remaining chunks through the Arrow C stream interface (PyCapsule protocol).
+        Consuming the stream advances this reader.
+        """
+        return self._reader.__arrow_c_stream__(requested_schema)
+
+
+class ArrowStreamReader:
+    """
+    An iterator of ``Chunk``, each corresponding to a record batch from an Arrow IPC stream.
+    Use this class to read the Arrow IPC streaming format from paths and from file-like
+    objects that are only readable (e.g. pipes, sockets or ``sys.stdin.buffer``).
+
+    Chunks are yielded as soon as their record batch is received. ``buffer_size`` is the
+    size of the read-ahead buffer; it is disabled by default because reads from pipes and
+    sockets block until the buffer is full.
+    """
+
+    def __init__(self, path_or_obj, buffer_size: int = 0):
+        self._reader = _arrowdantic_internal.ArrowStreamReader(path_or_obj, buffer_size)
+
+    def schema(self) -> Schema:
+        schema = Schema([])
+        schema._schema = self._reader.schema()
+        return schema
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return Chunk._from_chunk(next(self._reader))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Chunk:
+        """
+        Reads and decodes the next chunk on a native thread without blocking the event loop.
+        """
+        chunk = await self._reader.next_async()
+        if chunk is None:
+            raise StopAsyncIteration
+        return Chunk._from_chunk(chunk)
+
+    def __arrow_c_stream__(self, requested_schema=None):
+        """
+        Exports the remaining chunks through the Arrow C stream interface (PyCapsule protocol).
+        Consuming the stream advances this reader.
+        """
+        return self._reader.__arrow_c_stream__(requested_schema)
+
+
+class ArrowCStreamReader:
+    """
+    An iterator of ``Chunk`` from any object implementing ``__arrow_c_stream__``
+    (e.g. a ``pyarrow.RecordBatchReader`` or a ``pyarrow.Table``).
+    Chunks are imported without copying their data.
+    """
+
+    def __init__(self, obj):
+        self._reader = _arrowdantic_internal.ArrowCStreamReader(obj)
+
+    def schema(self) -> Schema:
+        schema = Schema([])
         schema._schema = self._reader.schema()
         return schema
 
@@ -625,18 +996,31 @@ class ArrowFileWriter:
     * a header, written when the context manager is entered
     * multiple record batches, written via ``write``
     * a footer, written when the context manager exits
+
+    The bodies of record batches are compressed with ``compression`` (``"lz4"`` or ``"zstd"``)
+    when it is not ``None``. ``ArrowFileReader`` decompresses them transparently.
+
+    Writes are buffered and written to the file in blocks of up to ``buffer_size`` bytes.
     """
 
-    __slots__ = ("_writer", "_schema", "_path")
+    __slots__ = ("_writer", "_schema", "_path", "_compression", "_buffer_size")
 
-    def __init__(self, path_or_obj, schema: Schema):
+    def __init__(
+        self,
+        path_or_obj,
+        schema: Schema,
+        compression: typing.Optional[str] = None,
+        buffer_size: int = 8 << 20,
+    ):
         self._path = path_or_obj
         self._schema = schema
+        self._compression = compression
+        self._buffer_size = buffer_size
         self._writer = None
 
     def __enter__(self) -> "ArrowFileWriter":
         self._writer = _arrowdantic_internal.ArrowFileWriter(
-            self._path, self._schema._schema
+            self._path, self._schema._schema, self._compression, self._buffer_size
         )
         return self
 
@@ -646,6 +1030,64 @@ class ArrowFileWriter:
         """
         self._writer.write(chunk._chunk)
 
+    async def write_async(self, chunk: Chunk):
+        """
+        Writes a ``Chunk`` into the file on a native thread without blocking the event loop.
+        """
+        await self._writer.write_async(chunk._chunk)
+
+    def __exit__(self, _, __, ___):
+        self._writer.__exit__()
+        self._writer = None
+
+
+class ArrowStreamWriter:
+    """
+    Context manager to write an Arrow IPC stream to a path or to a file-like object that is
+    only writable (e.g. pipes, sockets or ``sys.stdout.buffer``). A stream is composed by:
+
+    * a schema, written when the context manager is entered
+    * multiple record batches, written (and flushed) via ``write``
+    * an end-of-stream marker, written when the context manager exits
+
+    The bodies of record batches are compressed with ``compression`` (``"lz4"`` or ``"zstd"``)
+    when it is not ``None``. Each record batch is buffered (up to ``buffer_size`` bytes) and
+    written in blocks.
+    """
+
+    __slots__ = ("_writer", "_schema", "_path", "_compression", "_buffer_size")
+
+    def __init__(
+        self,
+        path_or_obj,
+        schema: Schema,
+        compression: typing.Optional[str] = None,
+        buffer_size: int = 8 << 20,
+    ):
+        self._path = path_or_obj
+        self._schema = schema
+        self._compression = compression
+        self._buffer_size = buffer_size
+        self._writer = None
+
+    def __enter__(self) -> "ArrowStreamWriter":
+        self._writer = _arrowdantic_internal.ArrowStreamWriter(
+            self._path, self._schema._schema, self._compression, self._buffer_size
+        )
+        return self
+
+    def write(self, chunk: Chunk):
+        """
+        Writes a ``Chunk`` into the stream.
+        """
+        self._writer.write(chunk._chunk)
+
+    async def write_async(self, chunk: Chunk):
+        """
+        Writes a ``Chunk`` into the stream on a native thread without blocking the event loop.
+        """
+        await self._writer.write_async(chunk._chunk)
+
     def __exit__(self, _, __, ___):
         self._writer.__exit__()
         self._writer = None
@@ -657,13 +1099,59 @@ class ParquetFileReader:
     Use this class to read Parquet files.
 
     The chunks are guaranteed to have the same schema (provided by ``schema``).
+
+    When ``num_threads`` is larger than 1, the columns of each row group are decompressed
+    and deserialized in parallel on a pool of ``num_threads`` native threads.
+
+    ``columns`` optionally selects (by name or by index) the columns to read; other columns
+    are neither read nor decoded, and ``schema`` only contains the selected ones.
+
+    ``filters`` is an optional list of predicates ``(column, op, value)`` that must all hold,
+    where ``op`` is one of ``==``, ``!=``, ``<``, ``<=``, ``>``, ``>=``, ``in`` and ``not in``
+    (``value`` is then a list), e.g. ``[("ts", ">=", x), ("id", "in", [1, 2])]``.
+    They are evaluated against the statistics of each row group, and row groups that cannot
+    contain matching rows are skipped before they are read. Rows of the remaining row groups
+    are not filtered.
+
+    ``offset`` and ``limit`` restrict the chunks to the rows ``[offset, offset + limit)``
+    (after ``filters`` are applied). Row groups before ``offset`` are skipped using their
+    number of rows, and rows past the window are not decoded.
+
+    Reads are buffered by a read-ahead buffer of ``buffer_size`` bytes, that coalesces small
+    adjacent reads (e.g. of the footer and of small column chunks) into a single read of the
+    file. File-like objects are read with ``readinto`` when they support it.
+
+    With ``prefetch=k`` (``k > 0``), up to ``k`` chunks are read and decoded ahead on a native
+    background thread, so that reading overlaps with the processing of the current chunk.
+    Prefetching pauses while the decoded chunks not yet consumed exceed ``prefetch_bytes``.
     """
 
-    def __init__(self, path_or_obj):
-        self._reader = _arrowdantic_internal.ParquetFileReader(path_or_obj)
+    def __init__(
+        self,
+        path_or_obj,
+        num_threads: int = 1,
+        columns: typing.Optional[typing.Union[typing.List[str], typing.List[int]]] = None,
+        filters: typing.Optional[typing.List[typing.Tuple[str, str, typing.Any]]] = None,
+        limit: typing.Optional[int] = None,
+        offset: int = 0,
+        buffer_size: int = 1 << 20,
+        prefetch: int = 0,
+        prefetch_bytes: int = 256 << 20,
+    ):
+        self._reader = _arrowdantic_internal.ParquetFileReader(
+            path_or_obj,
+            num_threads,
+            columns,
+            filters,
+            limit,
+            offset,
+            buffer_size,
+            prefetch,
+            prefetch_bytes,
+        )
 
     def schema(self) -> Schema:
-        schema = Schema()
+        schema = Schema([])
         schema._schema = self._reader.schema()
         return schema
 
@@ -673,6 +1161,25 @@ class ParquetFileReader:
     def __next__(self):
         return Chunk._from_chunk(next(self._reader))
 
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Chunk:
+        """
+        Reads and decodes the next chunk on a native thread without blocking the event loop.
+        """
+        chunk = await self._reader.next_async()
+        if chunk is None:
+            raise StopAsyncIteration
+        return Chunk._from_chunk(chunk)
+
+    def __arrow_c_stream__(self, requested_schema=None):
+        """
+        Exports the remaining chunks through the Arrow C stream interface (PyCapsule protocol).
+        Consuming the stream advances this reader.
+        """
+        return self._reader.__arrow_c_stream__(requested_schema)
+
 
 class ParquetFileWriter:
     """
@@ -681,18 +1188,57 @@ class ParquetFileWriter:
     * a header, written when the context manager is entered
     * multiple record batches, written via ``write``
     * a footer, written when the context manager exits
+
+    Columns are compressed with ``compression`` (one of ``"uncompressed"``, ``"snappy"``,
+    ``"gzip"``, ``"lz4"``, ``"brotli"`` or ``"zstd"``) at ``compression_level`` (the codec's
+    default when ``None``). ``column_compression`` overrides it per column, mapping column names
+    to a codec or to a tuple ``(codec, level)``.
+
+    ``encodings`` maps column names to their encoding (one of ``"plain"``, ``"dictionary"``,
+    ``"delta_binary_packed"`` or ``"delta_length_byte_array"``); columns default to
+    ``"plain"``. ``data_page_size`` is the target size of data pages in bytes and ``version``
+    the version (1 or 2) of the data pages.
+
+    Writes are buffered and written to the file in blocks of up to ``buffer_size`` bytes.
     """
 
-    __slots__ = ("_writer", "_schema", "_path")
+    __slots__ = ("_writer", "_schema", "_path", "_options")
 
-    def __init__(self, path_or_obj, schema: Schema):
+    def __init__(
+        self,
+        path_or_obj,
+        schema: Schema,
+        compression: str = "zstd",
+        compression_level: typing.Optional[int] = None,
+        encodings: typing.Optional[typing.Dict[str, str]] = None,
+        column_compression: typing.Optional[
+            typing.Dict[str, typing.Union[str, typing.Tuple[str, int]]]
+        ] = None,
+        data_page_size: typing.Optional[int] = None,
+        version: int = 2,
+        buffer_size: int = 8 << 20,
+    ):
         self._path = path_or_obj
         self._schema = schema
         self._writer = None
+        if column_compression is not None:
+            column_compression = {
+                name: (codec, None) if isinstance(codec, str) else tuple(codec)
+                for name, codec in column_compression.items()
+            }
+        self._options = (
+            compression,
+            compression_level,
+            encodings,
+            column_compression,
+            data_page_size,
+            version,
+            buffer_size,
+        )
 
     def __enter__(self) -> "ParquetFileWriter":
         self._writer = _arrowdantic_internal.ParquetFileWriter(
-            self._path, self._schema._schema
+            self._path, self._schema._schema, *self._options
         )
         return self
 
@@ -702,6 +1248,13 @@ class ParquetFileWriter:
         """
         self._writer.write(chunk._chunk)
 
+    async def write_async(self, chunk: Chunk):
+        """
+        Writes a ``Chunk`` into the file as a new row group, on a native thread without
+        blocking the event loop.
+        """
+        await self._writer.write_async(chunk._chunk)
+
     def __exit__(self, _, __, ___):
         self._writer.__exit__()
         self._writer = None
@@ -712,30 +1265,67 @@ class ODBCConnector:
     Context manager to read and write an ODBC connection.
     """
 
-    __slots__ = ("_connection", "_connection_string")
+    __slots__ = ("_connection", "_connection_string", "_pool", "_timeout")
 
     def __init__(self, connection_string: str):
         self._connection_string = connection_string
         self._connection: typing.Optional[_arrowdantic_internal.ODBCConnector] = None
+        self._pool = None
+        self._timeout = None
+
+    @classmethod
+    def _from_pool(
+        cls, pool: "ODBCPool", timeout: typing.Optional[float]
+    ) -> "ODBCConnector":
+        connector = cls.__new__(cls)
+        connector._connection_string = None
+        connector._connection = None
+        connector._pool = pool
+        connector._timeout = timeout
+        return connector
 
     def __enter__(self) -> "ODBCConnector":
-        self._connection = _arrowdantic_internal.ODBCConnector(self._connection_string)
+        if self._pool is None:
+            self._connection = _arrowdantic_internal.ODBCConnector(self._connection_string)
+        else:
+            self._connection = self._pool._pool.connection(self._timeout)
         return self
 
     def execute(
-        self, statement: str, batch_size: typing.Optional[int] = None
+        self,
+        statement: str,
+        batch_size: typing.Optional[int] = None,
+        prefetch: int = 0,
     ) -> typing.Optional[typing.Iterable[Chunk]]:
         """
         Executes an SQL statement. When the statement is expected to return values, `batch_size` must
         be provided.
+
+        Batches are fetched without holding the GIL. With ``prefetch=k`` (``k > 0``), up to ``k``
+        batches are fetched ahead on a native background thread (``prefetch=1`` double-buffers),
+        so that fetching overlaps with the processing of the current chunk.
         """
-        iterator = self._connection.execute(statement, batch_size)
+        iterator = self._connection.execute(statement, batch_size, prefetch)
         if iterator is None:
             return None
         else:
             return ODBCChunkIter._from_iter(iterator)
         return self._connection.execute(statement, batch_size)
 
+    async def execute_async(
+        self,
+        statement: str,
+        batch_size: typing.Optional[int] = None,
+        prefetch: int = 0,
+    ) -> typing.Optional["ODBCChunkIter"]:
+        """
+        Same as ``execute``, but executed on a native thread without blocking the event loop.
+        """
+        iterator = await self._connection.execute_async(statement, batch_size, prefetch)
+        if iterator is None:
+            return None
+        return ODBCChunkIter._from_iter(iterator)
+
     def write(self, statement: str, chunk: Chunk):
         """
         Writes a ``Chunk`` into the ODBC driver. The statement must have the same number
@@ -745,10 +1335,124 @@ class ODBCConnector:
         """
         self._connection.write(statement, chunk._chunk)
 
+    async def write_async(self, statement: str, chunk: Chunk):
+        """
+        Same as ``write``, but written on a native thread without blocking the event loop.
+        """
+        await self._connection.write_async(statement, chunk._chunk)
+
+    def write_many(
+        self,
+        statement: str,
+        chunks: typing.Iterable[Chunk],
+        batch_size: typing.Optional[int] = None,
+        commit_every: typing.Optional[int] = None,
+    ) -> int:
+        """
+        Writes an iterable of ``Chunk`` (e.g. a ``ParquetFileReader``) into the ODBC driver,
+        preparing ``statement`` once and reusing its parameter buffers for all chunks, which
+        must therefore have the data types of the first chunk. Returns the number of rows
+        written. ``chunks`` may be the result of a query on this connector.
+
+        Chunks are executed in slices of up to ``batch_size`` rows, without holding the GIL.
+        When ``commit_every`` is set, executions are grouped in transactions of ``commit_every``
+        executions; a failure rolls back the current transaction.
+        """
+        return self._connection.write_many(
+            statement, (chunk._chunk for chunk in chunks), batch_size, commit_every
+        )
+
+    def export(
+        self,
+        statement: str,
+        sink: typing.Union[str, typing.BinaryIO],
+        format: str = "parquet",
+        batch_size: int = 8192,
+        row_group_size: int = 128 * 1024,
+        compression: typing.Optional[str] = None,
+    ) -> typing.Tuple[int, int]:
+        """
+        Executes ``statement`` and writes its result into ``sink`` (a path or a file-like object)
+        as a ``"parquet"`` or ``"arrow"`` (IPC) file, without creating Python objects.
+        Returns the number of rows and the number of bytes written.
+
+        Batches of ``batch_size`` rows are fetched on a native background thread while previous
+        batches are encoded, and are merged or split into row groups (or record batches) of
+        ``row_group_size`` rows. ``compression`` defaults to ``"zstd"`` for parquet and to
+        uncompressed for arrow.
+        """
+        return self._connection.export(
+            statement, sink, format, batch_size, row_group_size, compression
+        )
+
     def __exit__(self, _, __, ___):
         self._connection = None
 
 
+class ODBCPool:
+    """
+    A pool of ODBC connections to the same data source, that can be shared between threads.
+
+    ``min_size`` connections are opened when the pool is created and kept open; up to
+    ``max_size`` connections are opened on demand. Idle connections above ``min_size`` are
+    closed after ``idle_timeout`` seconds (never when ``None``). When ``health_check`` is
+    a query (e.g. ``"SELECT 1"``), idle connections are checked with it before they are
+    handed out, and replaced when it fails.
+
+    Example:
+
+    .. code-block:: python
+
+        pool = ODBCPool(connection_string, max_size=4, health_check="SELECT 1")
+        with pool.connection() as con:
+            con.execute("SELECT 1", 1024)
+    """
+
+    __slots__ = ("_pool",)
+
+    def __init__(
+        self,
+        connection_string: str,
+        min_size: int = 0,
+        max_size: int = 10,
+        idle_timeout: typing.Optional[float] = None,
+        health_check: typing.Optional[str] = None,
+    ):
+        self._pool = _arrowdantic_internal.ODBCPool(
+            connection_string, min_size, max_size, idle_timeout, health_check
+        )
+
+    def connection(self, timeout: typing.Optional[float] = None) -> ODBCConnector:
+        """
+        Returns a context manager of a connection of the pool, checked out when entered and
+        returned to the pool once exited and the chunk iterators it returned are dropped. When
+        all ``max_size`` connections are checked out, entering waits up to ``timeout`` seconds
+        (forever when ``None``) for one to be returned.
+        """
+        return ODBCConnector._from_pool(self, timeout)
+
+    def stats(self) -> typing.Dict[str, int]:
+        """
+        Returns the counters of the pool: the number of open (``size``) and ``idle``
+        connections, and the total number of ``checkouts``, of checkouts that had to wait
+        (``waits``), of connections opened (``creations``) and of connections closed because
+        they were idle for too long or failed the health check (``discards``).
+        """
+        return self._pool.stats()
+
+    def close(self):
+        """
+        Closes all connections; checked out connections are closed when they are returned.
+        """
+        self._pool.close()
+
+    def __enter__(self) -> "ODBCPool":
+        return self
+
+    def __exit__(self, _, __, ___):
+        self.close()
+
+
 class ODBCChunkIter:
     def _from_iter(iter: _arrowdantic_internal.ODBCIterator) -> "ODBCChunkIter":
         a = ODBCChunkIter()
@@ -764,5 +1468,20 @@ class ODBCChunkIter:
     def __exit__(self, _, __, ___):
         self._iter = None
 
+    def __iter__(self) -> "ODBCChunkIter":
+        return self
+
     def __next__(self) -> Chunk:
         return Chunk._from_chunk(next(self._iter))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Chunk:
+        """
+        Fetches the next chunk on a native thread without blocking the event loop.
+        """
+        chunk = await self._iter.next_async()
+        if chunk is None:
+            raise StopAsyncIteration
+        return Chunk._from_chunk(chunk)
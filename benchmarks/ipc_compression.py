@@ -0,0 +1,64 @@
+"""
+Compares the size and read throughput of Arrow IPC files written without compression and
+with each supported compression codec.
+
+Usage: python benchmarks/ipc_compression.py [rows] [batches]
+"""
+import io
+import sys
+import time
+
+import arrowdantic as ad
+
+
+def _chunk(rows: int) -> ad.Chunk:
+    return ad.Chunk(
+        [
+            ad.Int64Array(list(range(rows))),
+            ad.Float64Array([i / 7 for i in range(rows)]),
+            ad.StringArray([f"value-{i % 1000}" for i in range(rows)]),
+        ]
+    )
+
+
+def _write(chunk: ad.Chunk, batches: int, compression) -> bytes:
+    schema = ad.Schema(
+        [ad.Field(f"c{i}", array.type, True) for i, array in enumerate(chunk.arrays())]
+    )
+    data = io.BytesIO()
+    with ad.ArrowFileWriter(data, schema, compression=compression) as writer:
+        for _ in range(batches):
+            writer.write(chunk)
+    return data.getvalue()
+
+
+def _read(data: bytes, repeats: int = 5) -> float:
+    """Returns the best time (in seconds) to read all batches of ``data``"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in ad.ArrowFileReader(io.BytesIO(data)):
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(rows: int = 100_000, batches: int = 10):
+    chunk = _chunk(rows)
+    print(f"{'compression':<12}{'size (MB)':>12}{'ratio':>8}{'read (MB/s)':>14}")
+    baseline = None
+    for compression in [None, "lz4", "zstd"]:
+        data = _write(chunk, batches, compression)
+        baseline = baseline or len(data)
+        seconds = _read(data)
+        print(
+            f"{str(compression):<12}"
+            f"{len(data) / 1e6:>12.2f}"
+            f"{baseline / len(data):>8.2f}"
+            # throughput in terms of uncompressed bytes
+            f"{baseline / 1e6 / seconds:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -6,12 +6,18 @@ use arrow2::{
     datatypes::{DataType, PhysicalType, TimeUnit},
 };
 
+use std::os::raw::c_int;
+
+use pyo3::buffer::PyBuffer;
 use pyo3::prelude::*;
-use pyo3::types::PyIterator;
-use pyo3::{class::basic::CompareOp, types::PyType};
+use pyo3::types::{PyBytes, PyIterator};
+use pyo3::{class::basic::CompareOp, ffi, types::PyType, AsPyPointer};
 
+use super::buffer;
+use super::c_data;
 use super::datatypes;
 use super::iterator;
+use super::temporal;
 
 macro_rules! primitive {
     ($name:ident, $iterator:ident, $type:ty) => {
@@ -22,20 +28,32 @@ macro_rules! primitive {
         #[pymethods]
         impl $name {
             #[new]
-            fn new(values: &PyAny) -> PyResult<Self> {
-                if let Ok(values) = values.extract::<Self>() {
-                    Ok(values)
+            fn new(values: &PyAny, validity: Option<&PyAny>) -> PyResult<Self> {
+                let array = if let Ok(values) = values.extract::<Self>() {
+                    values.0
+                } else if let Ok(buffer) = PyBuffer::<$type>::get(values) {
+                    buffer::from_buffer(values.py(), &buffer)?
                 } else if let Ok(values) = values.extract::<Vec<$type>>() {
-                    Ok(Self(PrimitiveArray::<$type>::from_vec(values)))
+                    PrimitiveArray::<$type>::from_vec(values)
                 } else if let Ok(values) = values.extract::<Vec<Option<$type>>>() {
-                    Ok(Self(PrimitiveArray::<$type>::from(values)))
+                    PrimitiveArray::<$type>::from(values)
                 } else if let Ok(values) = values.extract::<&PyIterator>() {
                     values
                         .map(|x| x.and_then(|x| x.extract::<Option<$type>>()))
-                        .collect::<Result<PrimitiveArray<$type>, _>>()
-                        .map(Self)
+                        .collect::<Result<PrimitiveArray<$type>, _>>()?
                 } else {
                     todo!()
+                };
+                match validity {
+                    Some(validity) => {
+                        let validity = buffer::validity_from_py(validity, array.len())?;
+                        let validity = match array.validity() {
+                            Some(current) => current & &validity,
+                            None => validity,
+                        };
+                        Ok(Self(array.with_validity(Some(validity))))
+                    }
+                    None => Ok(Self(array)),
                 }
             }
 
@@ -60,17 +78,55 @@ macro_rules! primitive {
                 datatypes::DataType(self.0.data_type().clone())
             }
 
-            fn __richcmp__(&self, py: Python, other: PyObject, op: CompareOp) -> PyResult<bool> {
-                Ok(if let Ok(other) = other.extract::<$name>(py) {
-                    match op {
-                        CompareOp::Eq => self.0 == other.0,
-                        CompareOp::Ne => self.0 != other.0,
-                        _ => todo!(),
+            /// `==` and `!=` compare whole arrays; the other operators compare element-wise
+            fn __richcmp__(&self, py: Python, other: &PyAny, op: CompareOp) -> PyResult<PyObject> {
+                Ok(match op {
+                    CompareOp::Eq | CompareOp::Ne => {
+                        let equal = other
+                            .extract::<PyRef<$name>>()
+                            .map(|other| self.0 == other.0)
+                            .unwrap_or(false);
+                        (equal == matches!(op, CompareOp::Eq)).into_py(py)
                     }
-                } else {
-                    false
+                    _ => match self.compare(other, op)? {
+                        Some(result) => result.into_py(py),
+                        None => py.NotImplemented(),
+                    },
                 })
             }
+
+            /// Exports this array through the Arrow C data interface. `requested_schema` is
+            /// accepted for compatibility; the array is always exported with its own type.
+            fn __arrow_c_array__(
+                &self,
+                py: Python,
+                requested_schema: Option<PyObject>,
+            ) -> PyResult<(PyObject, PyObject)> {
+                let _ = requested_schema;
+                c_data::export_array(py, self.0.clone().boxed())
+            }
+
+            fn null_count(&self) -> usize {
+                self.0.null_count()
+            }
+
+            /// One byte per slot (1 if valid, 0 if null), or `None` when there are no nulls
+            fn validity(&self, py: Python) -> Option<PyObject> {
+                validity_to_py(py, &self.0)
+            }
+
+            unsafe fn __getbuffer__(
+                slf: PyRef<Self>,
+                view: *mut ffi::Py_buffer,
+                flags: c_int,
+            ) -> PyResult<()> {
+                let owner = slf.as_ptr();
+                buffer::fill_view(owner, view, flags, slf.0.values().as_slice())
+            }
+
+            unsafe fn __releasebuffer__(&self, view: *mut ffi::Py_buffer) {
+                buffer::release_view(view)
+            }
         }
     };
 }
@@ -81,165 +137,73 @@ primitive!(UInt32Array, UInt32Iterator, u32);
 primitive!(UInt64Array, UInt64Iterator, u64);
 primitive!(Int8Array, Int8Iterator, i8);
 primitive!(Int16Array, Int16Iterator, i16);
-//primitive!(Int32Array, Int32Iterator, i32);
-//primitive!(Int64Array, Int64Iterator, i64);
+primitive!(Int32Array, Int32Iterator, i32);
+primitive!(Int64Array, Int64Iterator, i64);
 primitive!(Float32Array, Float32Iterator, f32);
 primitive!(Float64Array, Float64Iterator, f64);
 
-#[derive(Clone, PartialEq, Debug)]
-#[pyclass]
-pub struct Int64Array(pub PrimitiveArray<i64>);
-
 #[pymethods]
 impl Int64Array {
-    #[new]
-    fn new(values: &PyAny) -> PyResult<Self> {
-        if let Ok(values) = values.extract::<Self>() {
-            Ok(values)
-        } else if let Ok(values) = values.extract::<Vec<i64>>() {
-            Ok(Self(PrimitiveArray::<i64>::from_vec(values)))
-        } else if let Ok(values) = values.extract::<Vec<Option<i64>>>() {
-            Ok(Self(PrimitiveArray::<i64>::from(values)))
-        } else if let Ok(values) = values.extract::<&PyIterator>() {
-            values
-                .map(|x| x.and_then(|x| x.extract::<Option<i64>>()))
-                .collect::<Result<PrimitiveArray<i64>, _>>()
-                .map(Self)
-        } else {
-            todo!()
-        }
-    }
-
-    fn __repr__(&self) -> String {
-        format!("{:?}", &self.0 as &dyn Array)
-    }
-
-    fn __str__(&self) -> String {
-        self.__repr__()
-    }
-
-    fn __len__(&self) -> usize {
-        self.0.len()
-    }
-
-    fn __iter__(slf: PyRef<Self>) -> iterator::Int64Iterator {
-        iterator::Int64Iterator::new(slf)
-    }
-
-    #[getter(type)]
-    fn dtype(&self) -> datatypes::DataType {
-        datatypes::DataType(self.0.data_type().clone())
-    }
-
-    fn __richcmp__(&self, py: Python, other: PyObject, op: CompareOp) -> PyResult<bool> {
-        Ok(if let Ok(other) = other.extract::<Int64Array>(py) {
-            match op {
-                CompareOp::Eq => self.0 == other.0,
-                CompareOp::Ne => self.0 != other.0,
-                _ => todo!(),
-            }
-        } else {
-            false
-        })
-    }
-
     #[classmethod]
     fn from_ts_s(_: &PyType, values: &PyAny, tz: Option<String>) -> PyResult<Self> {
-        Self::new(values)
+        Self::new(values, None)
             .map(|v| v.0.to(DataType::Timestamp(TimeUnit::Second, tz)))
             .map(Self)
     }
 
     #[classmethod]
     fn from_ts_ms(_: &PyType, values: &PyAny, tz: Option<String>) -> PyResult<Self> {
-        Self::new(values)
+        Self::new(values, None)
             .map(|v| v.0.to(DataType::Timestamp(TimeUnit::Millisecond, tz)))
             .map(Self)
     }
 
     #[classmethod]
     fn from_ts_us(_: &PyType, values: &PyAny, tz: Option<String>) -> PyResult<Self> {
-        Self::new(values)
+        Self::new(values, None)
             .map(|v| v.0.to(DataType::Timestamp(TimeUnit::Microsecond, tz)))
             .map(Self)
     }
 
     #[classmethod]
     fn from_ts_ns(_: &PyType, values: &PyAny, tz: Option<String>) -> PyResult<Self> {
-        Self::new(values)
+        Self::new(values, None)
             .map(|v| v.0.to(DataType::Timestamp(TimeUnit::Nanosecond, tz)))
             .map(Self)
     }
 
     #[classmethod]
     fn from_time_us(_: &PyType, values: &PyAny) -> PyResult<Self> {
-        let values = Self::new(values)?;
+        let values = Self::new(values, None)?;
         Ok(Self(values.0.to(DataType::Time64(TimeUnit::Microsecond))))
     }
-}
-
-#[derive(Clone, PartialEq, Debug)]
-#[pyclass]
-pub struct Int32Array(pub PrimitiveArray<i32>);
-
-#[pymethods]
-impl Int32Array {
-    #[new]
-    fn new(values: &PyAny) -> PyResult<Self> {
-        if let Ok(values) = values.extract::<Self>() {
-            Ok(values)
-        } else if let Ok(values) = values.extract::<Vec<i32>>() {
-            Ok(Self(PrimitiveArray::<i32>::from_vec(values)))
-        } else if let Ok(values) = values.extract::<Vec<Option<i32>>>() {
-            Ok(Self(PrimitiveArray::<i32>::from(values)))
-        } else if let Ok(values) = values.extract::<&PyIterator>() {
-            values
-                .map(|x| x.and_then(|x| x.extract::<Option<i32>>()))
-                .collect::<Result<PrimitiveArray<i32>, _>>()
-                .map(Self)
-        } else {
-            todo!()
-        }
-    }
 
-    fn __repr__(&self) -> String {
-        format!("{:?}", &self.0 as &dyn Array)
-    }
-
-    fn __str__(&self) -> String {
-        self.__repr__()
-    }
-
-    fn __len__(&self) -> usize {
-        self.0.len()
-    }
-
-    fn __iter__(slf: PyRef<Self>) -> iterator::Int32Iterator {
-        iterator::Int32Iterator::new(slf)
-    }
-
-    #[getter(type)]
-    fn dtype(&self) -> datatypes::DataType {
-        datatypes::DataType(self.0.data_type().clone())
+    /// A timestamp array of `unit` from `datetime`s with the same `tzinfo`
+    #[classmethod]
+    fn from_datetimes(_: &PyType, values: &PyAny, unit: &str) -> PyResult<Self> {
+        temporal::timestamps_from_py(values, unit).map(Self)
     }
 
-    fn __richcmp__(&self, py: Python, other: PyObject, op: CompareOp) -> PyResult<bool> {
-        Ok(if let Ok(other) = other.extract::<Int32Array>(py) {
-            match op {
-                CompareOp::Eq => self.0 == other.0,
-                CompareOp::Ne => self.0 != other.0,
-                _ => todo!(),
-            }
-        } else {
-            false
-        })
+    /// A time array of microseconds since midnight from `time`s
+    #[classmethod]
+    fn from_times(_: &PyType, values: &PyAny) -> PyResult<Self> {
+        temporal::times_from_py(values).map(Self)
     }
+}
 
+#[pymethods]
+impl Int32Array {
     #[classmethod]
     fn from_date(_: &PyType, values: &PyAny) -> PyResult<Self> {
-        let values = Self::new(values)?;
+        let values = Self::new(values, None)?;
         Ok(Self(values.0.to(DataType::Date32)))
     }
+
+    /// A date array of days since epoch from `date`s
+    #[classmethod]
+    fn from_dates(_: &PyType, values: &PyAny) -> PyResult<Self> {
+        temporal::dates_from_py(values).map(Self)
+    }
 }
 
 #[derive(Clone, PartialEq, Debug)]
@@ -287,17 +251,33 @@ impl BooleanArray {
         iterator::BooleanIterator::new(slf)
     }
 
-    fn __richcmp__(&self, py: Python, other: PyObject, op: CompareOp) -> PyResult<bool> {
-        Ok(if let Ok(other) = other.extract::<BooleanArray>(py) {
-            match op {
-                CompareOp::Eq => self.0 == other.0,
-                CompareOp::Ne => self.0 != other.0,
-                _ => todo!(),
+    /// `==` and `!=` compare whole arrays; the other operators compare element-wise
+    fn __richcmp__(&self, py: Python, other: &PyAny, op: CompareOp) -> PyResult<PyObject> {
+        Ok(match op {
+            CompareOp::Eq | CompareOp::Ne => {
+                let equal = other
+                    .extract::<PyRef<BooleanArray>>()
+                    .map(|other| self.0 == other.0)
+                    .unwrap_or(false);
+                (equal == matches!(op, CompareOp::Eq)).into_py(py)
             }
-        } else {
-            false
+            _ => match self.compare(other, op)? {
+                Some(result) => result.into_py(py),
+                None => py.NotImplemented(),
+            },
         })
     }
+
+    /// Exports this array through the Arrow C data interface. `requested_schema` is
+    /// accepted for compatibility; the array is always exported with its own type.
+    fn __arrow_c_array__(
+        &self,
+        py: Python,
+        requested_schema: Option<PyObject>,
+    ) -> PyResult<(PyObject, PyObject)> {
+        let _ = requested_schema;
+        c_data::export_array(py, self.0.clone().boxed())
+    }
 }
 
 macro_rules! binary {
@@ -347,17 +327,33 @@ macro_rules! binary {
                 iterator::$iterator::new(slf)
             }
 
-            fn __richcmp__(&self, py: Python, other: PyObject, op: CompareOp) -> PyResult<bool> {
-                Ok(if let Ok(other) = other.extract::<$name>(py) {
-                    match op {
-                        CompareOp::Eq => self.0 == other.0,
-                        CompareOp::Ne => self.0 != other.0,
-                        _ => todo!(),
+            /// `==` and `!=` compare whole arrays; the other operators compare element-wise
+            fn __richcmp__(&self, py: Python, other: &PyAny, op: CompareOp) -> PyResult<PyObject> {
+                Ok(match op {
+                    CompareOp::Eq | CompareOp::Ne => {
+                        let equal = other
+                            .extract::<PyRef<$name>>()
+                            .map(|other| self.0 == other.0)
+                            .unwrap_or(false);
+                        (equal == matches!(op, CompareOp::Eq)).into_py(py)
                     }
-                } else {
-                    false
+                    _ => match self.compare(other, op)? {
+                        Some(result) => result.into_py(py),
+                        None => py.NotImplemented(),
+                    },
                 })
             }
+
+            /// Exports this array through the Arrow C data interface. `requested_schema` is
+            /// accepted for compatibility; the array is always exported with its own type.
+            fn __arrow_c_array__(
+                &self,
+                py: Python,
+                requested_schema: Option<PyObject>,
+            ) -> PyResult<(PyObject, PyObject)> {
+                let _ = requested_schema;
+                c_data::export_array(py, self.0.clone().boxed())
+            }
         }
     };
 }
@@ -412,17 +408,33 @@ macro_rules! string {
                 datatypes::DataType(self.0.data_type().clone())
             }
 
-            fn __richcmp__(&self, py: Python, other: PyObject, op: CompareOp) -> PyResult<bool> {
-                Ok(if let Ok(other) = other.extract::<$name>(py) {
-                    match op {
-                        CompareOp::Eq => self.0 == other.0,
-                        CompareOp::Ne => self.0 != other.0,
-                        _ => todo!(),
+            /// `==` and `!=` compare whole arrays; the other operators compare element-wise
+            fn __richcmp__(&self, py: Python, other: &PyAny, op: CompareOp) -> PyResult<PyObject> {
+                Ok(match op {
+                    CompareOp::Eq | CompareOp::Ne => {
+                        let equal = other
+                            .extract::<PyRef<$name>>()
+                            .map(|other| self.0 == other.0)
+                            .unwrap_or(false);
+                        (equal == matches!(op, CompareOp::Eq)).into_py(py)
                     }
-                } else {
-                    false
+                    _ => match self.compare(other, op)? {
+                        Some(result) => result.into_py(py),
+                        None => py.NotImplemented(),
+                    },
                 })
             }
+
+            /// Exports this array through the Arrow C data interface. `requested_schema` is
+            /// accepted for compatibility; the array is always exported with its own type.
+            fn __arrow_c_array__(
+                &self,
+                py: Python,
+                requested_schema: Option<PyObject>,
+            ) -> PyResult<(PyObject, PyObject)> {
+                let _ = requested_schema;
+                c_data::export_array(py, self.0.clone().boxed())
+            }
         }
     };
 }
@@ -430,6 +442,17 @@ macro_rules! string {
 string!(StringArray, StringIterator, i32);
 string!(LargeStringArray, LargeStringIterator, i64);
 
+/// Returns the validity of `array` as one byte per slot, or `None` if it has no nulls.
+fn validity_to_py(py: Python, array: &dyn Array) -> Option<PyObject> {
+    if array.null_count() == 0 {
+        return None;
+    }
+    array.validity().map(|bitmap| {
+        let bytes = bitmap.iter().map(|x| x as u8).collect::<Vec<_>>();
+        PyBytes::new(py, &bytes).into()
+    })
+}
+
 macro_rules! primitive {
     ($array:expr, $py:expr,$type:ty, $local:ident) => {{
         let array = $array
@@ -440,6 +463,23 @@ macro_rules! primitive {
     }};
 }
 
+/// Returns whether arrays of `data_type` can be converted by [`to_py_object`]
+pub fn is_supported(data_type: &DataType) -> bool {
+    use arrow2::datatypes::PrimitiveType::*;
+    match data_type.to_physical_type() {
+        PhysicalType::Boolean
+        | PhysicalType::Utf8
+        | PhysicalType::LargeUtf8
+        | PhysicalType::Binary
+        | PhysicalType::LargeBinary => true,
+        PhysicalType::Primitive(primitive) => !matches!(
+            primitive,
+            Int128 | Int256 | Float16 | DaysMs | MonthDayNano
+        ),
+        _ => false,
+    }
+}
+
 pub fn to_py_object(py: Python, array: &dyn Array) -> PyObject {
     use arrow2::datatypes::PrimitiveType::*;
     match array.data_type().to_physical_type() {
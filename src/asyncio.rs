@@ -0,0 +1,99 @@
+//! Running blocking work on native threads and awaiting it from asyncio
+use std::panic::{catch_unwind, AssertUnwindSafe};
+use std::sync::{Arc, Mutex};
+use std::thread;
+
+use once_cell::sync::Lazy;
+use pyo3::panic::PanicException;
+use pyo3::prelude::*;
+use pyo3::PyClass;
+use pyo3::wrap_pyfunction;
+
+/// The threads running the work of all awaitables
+static WORKERS: Lazy<rayon::ThreadPool> = Lazy::new(|| {
+    // the work mostly blocks on files and databases, so use more threads than cores
+    let threads = thread::available_parallelism()
+        .map(|threads| threads.get())
+        .unwrap_or(1)
+        .max(4);
+    rayon::ThreadPoolBuilder::new()
+        .num_threads(threads)
+        .thread_name(|index| format!("arrowdantic-asyncio-{}", index))
+        .build()
+        .expect("the asyncio worker threads to start")
+});
+
+/// Serializes the awaitables of an object, so that awaiting several of them concurrently
+/// runs them one after the other
+#[derive(Clone, Default)]
+pub struct Tasks(Arc<Mutex<()>>);
+
+/// Completes `future` with `value` (or with the exception `value` when `is_err`), unless it
+/// was cancelled in the meantime. Called on the thread of the future's event loop.
+#[pyfunction]
+fn resolve(future: &PyAny, value: PyObject, is_err: bool) -> PyResult<()> {
+    if future.call_method0("done")?.is_true()? {
+        return Ok(());
+    }
+    let method = if is_err { "set_exception" } else { "set_result" };
+    future.call_method1(method, (value,))?;
+    Ok(())
+}
+
+/// Runs `f` on a worker thread and returns an `asyncio.Future` of the running event loop
+/// that completes with its result. `f` must release the GIL while it blocks.
+pub fn spawn<F, T>(py: Python, f: F) -> PyResult<PyObject>
+where
+    F: FnOnce() -> PyResult<T> + Send + 'static,
+    T: IntoPy<PyObject>,
+{
+    let event_loop = py.import("asyncio")?.call_method0("get_running_loop")?;
+    let future = event_loop.call_method0("create_future")?;
+
+    let event_loop: PyObject = event_loop.into();
+    let result_future: PyObject = future.into();
+    WORKERS.spawn(move || {
+        let result = catch_unwind(AssertUnwindSafe(f)).unwrap_or_else(|_| {
+            Err(PanicException::new_err("The asyncio task panicked"))
+        });
+        Python::with_gil(|py| {
+            let (value, is_err) = match result {
+                Ok(value) => (value.into_py(py), false),
+                Err(error) => (error.into_py(py), true),
+            };
+            let resolve = wrap_pyfunction!(resolve, py)?;
+            // the loop may be closed, in which case nobody awaits the future
+            event_loop
+                .call_method1(
+                    py,
+                    "call_soon_threadsafe",
+                    (resolve, result_future, value, is_err),
+                )
+                .map(|_| ())
+        })
+        .ok();
+    });
+
+    Ok(future.into())
+}
+
+/// Runs `f` on a worker thread with exclusive access to `obj` and without the GIL, and
+/// returns an `asyncio.Future` that completes with its result. `tasks` must belong to `obj`:
+/// the awaitables of `obj` wait for each other instead of failing to borrow it.
+pub fn spawn_with<C, F, T>(py: Python, tasks: &Tasks, obj: Py<C>, f: F) -> PyResult<PyObject>
+where
+    C: PyClass + Send,
+    F: FnOnce(&mut C) -> PyResult<T> + Send + 'static,
+    T: IntoPy<PyObject> + Send,
+{
+    let tasks = tasks.clone();
+    spawn(py, move || {
+        // taken without the GIL, which the task holding it may be waiting for
+        let _task = tasks.0.lock().unwrap_or_else(|e| e.into_inner());
+        Python::with_gil(|py| {
+            let mut obj = obj.try_borrow_mut(py)?;
+            let obj = &mut *obj;
+            py.allow_threads(|| f(obj))
+        })
+    })
+}
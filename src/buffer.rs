@@ -0,0 +1,149 @@
+//! Conversions between arrow2 buffers and Python's buffer protocol (PEP 3118)
+use std::mem::size_of;
+use std::os::raw::{c_char, c_int, c_void};
+use std::ptr::null_mut;
+
+use arrow2::array::PrimitiveArray;
+use arrow2::bitmap::Bitmap;
+use arrow2::types::NativeType;
+use pyo3::buffer::{Element, PyBuffer};
+use pyo3::exceptions::{PyBufferError, PyValueError};
+use pyo3::prelude::*;
+use pyo3::{ffi, PyResult};
+
+/// Native types that can be exported through the buffer protocol
+pub trait BufferFormat {
+    /// The (nul-terminated) `struct` format character of this type
+    const FORMAT: &'static [u8];
+}
+
+macro_rules! buffer_format {
+    ($type:ty, $format:expr) => {
+        impl BufferFormat for $type {
+            const FORMAT: &'static [u8] = $format;
+        }
+    };
+}
+
+buffer_format!(u8, b"B\0");
+buffer_format!(u16, b"H\0");
+buffer_format!(u32, b"I\0");
+buffer_format!(u64, b"Q\0");
+buffer_format!(i8, b"b\0");
+buffer_format!(i16, b"h\0");
+buffer_format!(i32, b"i\0");
+buffer_format!(i64, b"q\0");
+buffer_format!(f32, b"f\0");
+buffer_format!(f64, b"d\0");
+
+/// Fills `view` with a read-only, one-dimensional view over `values`, owned by `owner`.
+/// # Safety
+/// `owner` must be a valid Python object that keeps `values` alive and unchanged
+/// until `release_view` is called on `view`.
+pub unsafe fn fill_view<T: BufferFormat>(
+    owner: *mut ffi::PyObject,
+    view: *mut ffi::Py_buffer,
+    flags: c_int,
+    values: &[T],
+) -> PyResult<()> {
+    if view.is_null() {
+        return Err(PyBufferError::new_err("View is null"));
+    }
+    if (flags & ffi::PyBUF_WRITABLE) == ffi::PyBUF_WRITABLE {
+        return Err(PyBufferError::new_err("Arrow arrays are immutable"));
+    }
+
+    ffi::Py_INCREF(owner);
+    (*view).obj = owner;
+    (*view).buf = values.as_ptr() as *mut c_void;
+    (*view).len = (values.len() * size_of::<T>()) as ffi::Py_ssize_t;
+    (*view).readonly = 1;
+    (*view).itemsize = size_of::<T>() as ffi::Py_ssize_t;
+    (*view).ndim = 1;
+
+    (*view).format = if (flags & ffi::PyBUF_FORMAT) == ffi::PyBUF_FORMAT {
+        T::FORMAT.as_ptr() as *mut c_char
+    } else {
+        null_mut()
+    };
+
+    // shape and strides must outlive the view; they are freed by `release_view`
+    let shape_and_strides = Box::into_raw(Box::new([
+        values.len() as ffi::Py_ssize_t,
+        size_of::<T>() as ffi::Py_ssize_t,
+    ])) as *mut ffi::Py_ssize_t;
+    (*view).internal = shape_and_strides as *mut c_void;
+
+    (*view).shape = if (flags & ffi::PyBUF_ND) == ffi::PyBUF_ND {
+        shape_and_strides
+    } else {
+        null_mut()
+    };
+    (*view).strides = if (flags & ffi::PyBUF_STRIDES) == ffi::PyBUF_STRIDES {
+        shape_and_strides.add(1)
+    } else {
+        null_mut()
+    };
+    (*view).suboffsets = null_mut();
+
+    Ok(())
+}
+
+/// Releases the resources allocated by `fill_view`.
+/// # Safety
+/// `view` must have been filled by `fill_view`.
+pub unsafe fn release_view(view: *mut ffi::Py_buffer) {
+    let shape_and_strides = (*view).internal as *mut [ffi::Py_ssize_t; 2];
+    if !shape_and_strides.is_null() {
+        drop(Box::from_raw(shape_and_strides));
+        (*view).internal = null_mut();
+    }
+}
+
+/// Creates a [`PrimitiveArray`] from a one-dimensional buffer with a single copy of its values.
+pub fn from_buffer<T: NativeType + Element>(
+    py: Python,
+    buffer: &PyBuffer<T>,
+) -> PyResult<PrimitiveArray<T>> {
+    if buffer.dimensions() != 1 {
+        return Err(PyValueError::new_err(format!(
+            "Arrays can only be created from one-dimensional buffers (got {} dimensions)",
+            buffer.dimensions()
+        )));
+    }
+    Ok(PrimitiveArray::from_vec(buffer.to_vec(py)?))
+}
+
+/// Creates a validity [`Bitmap`] of `length` slots from a sequence of booleans, where `False`
+/// denotes a null slot. Buffers of bytes (e.g. `bytes`, numpy arrays of `bool` or `uint8`)
+/// are read in bulk.
+pub fn validity_from_py(validity: &PyAny, length: usize) -> PyResult<Bitmap> {
+    let py = validity.py();
+    let bitmap = if let Ok(bytes) = bytes_buffer(validity) {
+        bytes.to_vec(py)?.into_iter().map(|x| x != 0).collect::<Bitmap>()
+    } else {
+        validity.extract::<Vec<bool>>()?.into_iter().collect::<Bitmap>()
+    };
+    if bitmap.len() != length {
+        return Err(PyValueError::new_err(format!(
+            "The validity must have the same length as the values ({} != {})",
+            bitmap.len(),
+            length
+        )));
+    }
+    Ok(bitmap)
+}
+
+/// Returns a buffer of bytes over `obj`, casting buffers of booleans (format `?`) to bytes.
+fn bytes_buffer(obj: &PyAny) -> PyResult<PyBuffer<u8>> {
+    PyBuffer::<u8>::get(obj).or_else(|error| {
+        let view = PyModule::import(obj.py(), "builtins")?
+            .getattr("memoryview")?
+            .call1((obj,))?;
+        if view.getattr("format")?.extract::<&str>()? == "?" {
+            PyBuffer::<u8>::get(view.call_method1("cast", ("B",))?)
+        } else {
+            Err(error)
+        }
+    })
+}
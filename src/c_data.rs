@@ -0,0 +1,209 @@
+//! Import and export of arrays and chunks through the Arrow C data and C stream interfaces,
+//! using the [PyCapsule protocol](https://arrow.apache.org/docs/format/CDataInterface/PyCapsuleInterface.html)
+use std::os::raw::{c_char, c_void};
+
+use arrow2::array::{Array, StructArray};
+use arrow2::chunk::Chunk as _Chunk;
+use arrow2::datatypes::{DataType, Field as _Field, Schema as _Schema};
+use arrow2::ffi;
+use pyo3::exceptions::PyTypeError;
+use pyo3::prelude::*;
+use pyo3::{ffi as pyffi, AsPyPointer};
+
+use super::array::{is_supported, to_py_object};
+use super::datatypes::Schema;
+use super::error::Error;
+use super::Chunk;
+
+const SCHEMA: &[u8] = b"arrow_schema\0";
+const ARRAY: &[u8] = b"arrow_array\0";
+const STREAM: &[u8] = b"arrow_array_stream\0";
+
+/// Capsule destructor: drops the boxed `T`, which releases it unless a consumer moved it out.
+unsafe extern "C" fn drop_capsule<T>(capsule: *mut pyffi::PyObject) {
+    let name = pyffi::PyCapsule_GetName(capsule);
+    let ptr = pyffi::PyCapsule_GetPointer(capsule, name);
+    if !ptr.is_null() {
+        drop(Box::from_raw(ptr as *mut T));
+    }
+}
+
+fn new_capsule<T>(py: Python, value: T, name: &'static [u8]) -> PyResult<PyObject> {
+    let ptr = Box::into_raw(Box::new(value)) as *mut c_void;
+    unsafe {
+        let capsule =
+            pyffi::PyCapsule_New(ptr, name.as_ptr() as *const c_char, Some(drop_capsule::<T>));
+        if capsule.is_null() {
+            drop(Box::from_raw(ptr as *mut T));
+            return Err(PyErr::fetch(py));
+        }
+        Ok(PyObject::from_owned_ptr(py, capsule))
+    }
+}
+
+fn capsule_pointer<T>(capsule: &PyAny, name: &'static [u8]) -> PyResult<*mut T> {
+    let ptr =
+        unsafe { pyffi::PyCapsule_GetPointer(capsule.as_ptr(), name.as_ptr() as *const c_char) };
+    if ptr.is_null() {
+        Err(PyErr::fetch(capsule.py()))
+    } else {
+        Ok(ptr as *mut T)
+    }
+}
+
+/// Returns the fields of `requested_schema` (a `arrow_schema` capsule of a struct), if any.
+fn requested_fields(requested_schema: Option<&PyAny>) -> PyResult<Option<Vec<_Field>>> {
+    let requested_schema = match requested_schema {
+        Some(schema) if !schema.is_none() => schema,
+        _ => return Ok(None),
+    };
+    let schema = capsule_pointer::<ffi::ArrowSchema>(requested_schema, SCHEMA)?;
+    let field = unsafe { ffi::import_field_from_c(&*schema) }.map_err(Error)?;
+    Ok(match field.data_type {
+        DataType::Struct(fields) => Some(fields),
+        _ => None,
+    })
+}
+
+/// Returns the fields describing `arrays`, named after `requested_schema` when it matches them
+/// and `c{i}` otherwise.
+fn chunk_fields(
+    arrays: &[Box<dyn Array>],
+    requested_schema: Option<&PyAny>,
+) -> PyResult<Vec<_Field>> {
+    let names = requested_fields(requested_schema)?
+        .filter(|fields| fields.len() == arrays.len())
+        .map(|fields| fields.into_iter().map(|f| f.name).collect::<Vec<_>>())
+        .unwrap_or_else(|| (0..arrays.len()).map(|i| format!("c{}", i)).collect());
+    Ok(arrays
+        .iter()
+        .zip(names)
+        .map(|(array, name)| _Field::new(name, array.data_type().clone(), true))
+        .collect())
+}
+
+fn chunk_to_struct(chunk: _Chunk<Box<dyn Array>>, fields: Vec<_Field>) -> Box<dyn Array> {
+    StructArray::new(DataType::Struct(fields), chunk.into_arrays(), None).boxed()
+}
+
+/// Errors unless arrays of every one of `fields` can be imported
+fn check_supported(fields: &[_Field]) -> PyResult<()> {
+    match fields.iter().find(|field| !is_supported(&field.data_type)) {
+        Some(field) => Err(PyTypeError::new_err(format!(
+            "Arrays of type {:?} (field \"{}\") are not supported",
+            field.data_type, field.name
+        ))),
+        None => Ok(()),
+    }
+}
+
+fn struct_to_chunk(array: Box<dyn Array>) -> PyResult<_Chunk<Box<dyn Array>>> {
+    let array = array
+        .as_any()
+        .downcast_ref::<StructArray>()
+        .ok_or_else(|| PyTypeError::new_err("A chunk can only be imported from a struct array"))?;
+    Ok(_Chunk::try_new(array.values().to_vec()).map_err(Error)?)
+}
+
+/// Exports `array` as a tuple of `arrow_schema` and `arrow_array` capsules
+pub fn export_array(py: Python, array: Box<dyn Array>) -> PyResult<(PyObject, PyObject)> {
+    let field = _Field::new("", array.data_type().clone(), true);
+    let schema = ffi::export_field_to_c(&field);
+    let array = ffi::export_array_to_c(array);
+    Ok((new_capsule(py, schema, SCHEMA)?, new_capsule(py, array, ARRAY)?))
+}
+
+/// Exports `chunk` as a tuple of `arrow_schema` and `arrow_array` capsules of a struct array
+pub fn export_chunk(
+    py: Python,
+    chunk: _Chunk<Box<dyn Array>>,
+    requested_schema: Option<&PyAny>,
+) -> PyResult<(PyObject, PyObject)> {
+    let fields = chunk_fields(chunk.arrays(), requested_schema)?;
+    export_array(py, chunk_to_struct(chunk, fields))
+}
+
+/// Exports an iterator of chunks with schema `schema` as an `arrow_array_stream` capsule
+pub fn export_chunks<I>(py: Python, chunks: I, schema: &_Schema) -> PyResult<PyObject>
+where
+    I: Iterator<Item = arrow2::error::Result<_Chunk<Box<dyn Array>>>> + 'static,
+{
+    let fields = schema.fields.clone();
+    let field = _Field::new("", DataType::Struct(fields.clone()), false);
+    let arrays = chunks.map(move |chunk| chunk.map(|chunk| chunk_to_struct(chunk, fields.clone())));
+    let stream = ffi::export_iterator(Box::new(arrays), field);
+    new_capsule(py, stream, STREAM)
+}
+
+/// Imports an array from an object implementing `__arrow_c_array__`
+#[pyfunction]
+pub fn import_array(py: Python, obj: &PyAny) -> PyResult<PyObject> {
+    let (field, array) = import(obj)?;
+    check_supported(std::slice::from_ref(&field))?;
+    Ok(to_py_object(py, array.as_ref()))
+}
+
+/// Imports a chunk from an object implementing `__arrow_c_array__` of a struct array
+#[pyfunction]
+pub fn import_chunk(obj: &PyAny) -> PyResult<Chunk> {
+    let (field, array) = import(obj)?;
+    if let DataType::Struct(fields) = &field.data_type {
+        check_supported(fields)?;
+    }
+    struct_to_chunk(array).map(Chunk)
+}
+
+fn import(obj: &PyAny) -> PyResult<(_Field, Box<dyn Array>)> {
+    let (schema, array): (&PyAny, &PyAny) = obj.call_method0("__arrow_c_array__")?.extract()?;
+    let schema = capsule_pointer::<ffi::ArrowSchema>(schema, SCHEMA)?;
+    let array = capsule_pointer::<ffi::ArrowArray>(array, ARRAY)?;
+    unsafe {
+        let field = ffi::import_field_from_c(&*schema).map_err(Error)?;
+        // move the array out of the capsule so that it is released with the imported array
+        let array = std::ptr::replace(array, ffi::ArrowArray::empty());
+        let array = ffi::import_array_from_c(array, field.data_type.clone()).map_err(Error)?;
+        Ok((field, array))
+    }
+}
+
+/// An iterator of [`Chunk`] over an object implementing `__arrow_c_stream__`
+#[pyclass(unsendable)]
+pub struct ArrowCStreamReader(ffi::ArrowArrayStreamReader, Schema);
+
+#[pymethods]
+impl ArrowCStreamReader {
+    #[new]
+    fn new(obj: &PyAny) -> PyResult<Self> {
+        let capsule = obj.call_method0("__arrow_c_stream__")?;
+        let stream = capsule_pointer::<ffi::ArrowArrayStream>(capsule, STREAM)?;
+        // move the stream out of the capsule; it is released when the reader is dropped
+        let stream = Box::new(unsafe { std::ptr::replace(stream, ffi::ArrowArrayStream::empty()) });
+        let reader = unsafe { ffi::ArrowArrayStreamReader::try_new(stream) }.map_err(Error)?;
+
+        let fields = match &reader.field().data_type {
+            DataType::Struct(fields) => fields.clone(),
+            _ => {
+                return Err(PyTypeError::new_err(
+                    "Chunks can only be imported from a stream of struct arrays",
+                ))
+            }
+        };
+        // chunks are only read later, so their columns are checked now
+        check_supported(&fields)?;
+        let schema = Schema(_Schema::from(fields));
+        Ok(Self(reader, schema))
+    }
+
+    fn schema(slf: PyRef<Self>) -> Schema {
+        slf.1.clone()
+    }
+
+    fn __iter__(slf: PyRef<Self>) -> PyRef<Self> {
+        slf
+    }
+
+    fn __next__(mut slf: PyRefMut<Self>) -> PyResult<Option<Chunk>> {
+        let array = unsafe { slf.0.next() }.transpose().map_err(Error)?;
+        array.map(struct_to_chunk).transpose().map(|x| x.map(Chunk))
+    }
+}
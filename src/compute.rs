@@ -0,0 +1,593 @@
+//! Vectorized compute kernels (aggregates, comparisons, arithmetic, boolean logic and
+//! selection), exposed as methods and operators of the arrays
+use std::os::raw::c_long;
+
+use arrow2::array::{Array, BooleanArray as _BooleanArray, PrimitiveArray};
+use arrow2::bitmap::{Bitmap, MutableBitmap};
+use arrow2::compute::{aggregate, arity, boolean, cast, filter, take};
+use arrow2::datatypes::DataType;
+use arrow2::types::{Index, NativeType};
+
+use pyo3::class::basic::CompareOp;
+use pyo3::exceptions::{PyIndexError, PyTypeError, PyValueError};
+use pyo3::prelude::*;
+use pyo3::types::PySlice;
+
+use super::array::*;
+use super::error::Error;
+
+fn check_lengths(lhs: usize, rhs: usize) -> PyResult<()> {
+    if lhs == rhs {
+        Ok(())
+    } else {
+        Err(PyValueError::new_err(format!(
+            "Arrays must have the same length (got {} and {})",
+            lhs, rhs
+        )))
+    }
+}
+
+/// Element-wise arithmetic of a native type. Integers wrap around on overflow.
+pub trait Arithmetic: NativeType {
+    fn add(self, rhs: Self) -> Self;
+    fn sub(self, rhs: Self) -> Self;
+    fn mul(self, rhs: Self) -> Self;
+}
+
+macro_rules! integer_arithmetic {
+    ($($type:ty),*) => {
+        $(impl Arithmetic for $type {
+            fn add(self, rhs: Self) -> Self {
+                self.wrapping_add(rhs)
+            }
+            fn sub(self, rhs: Self) -> Self {
+                self.wrapping_sub(rhs)
+            }
+            fn mul(self, rhs: Self) -> Self {
+                self.wrapping_mul(rhs)
+            }
+        })*
+    };
+}
+
+macro_rules! float_arithmetic {
+    ($($type:ty),*) => {
+        $(impl Arithmetic for $type {
+            fn add(self, rhs: Self) -> Self {
+                self + rhs
+            }
+            fn sub(self, rhs: Self) -> Self {
+                self - rhs
+            }
+            fn mul(self, rhs: Self) -> Self {
+                self * rhs
+            }
+        })*
+    };
+}
+
+integer_arithmetic!(i8, i16, i32, i64, u8, u16, u32, u64);
+float_arithmetic!(f32, f64);
+
+/// Element-wise comparisons with an array of the same type or with a scalar, with the
+/// comparison kernels of `$module`
+macro_rules! comparison {
+    ($name:ident, $module:ident, $scalar:ty) => {
+        impl $name {
+            /// Compares this array element-wise with `other`, an array of the same type and
+            /// length or a scalar, or returns `None` for other operands. Comparisons with nulls
+            /// are null.
+            pub(crate) fn compare(
+                &self,
+                other: &PyAny,
+                op: CompareOp,
+            ) -> PyResult<Option<BooleanArray>> {
+                use arrow2::compute::comparison::$module::*;
+
+                let lhs = &self.0;
+                let result = if let Ok(other) = other.extract::<PyRef<$name>>() {
+                    let rhs = &other.0;
+                    check_lengths(lhs.len(), rhs.len())?;
+                    match op {
+                        CompareOp::Eq => eq(lhs, rhs),
+                        CompareOp::Ne => neq(lhs, rhs),
+                        CompareOp::Lt => lt(lhs, rhs),
+                        CompareOp::Le => lt_eq(lhs, rhs),
+                        CompareOp::Gt => gt(lhs, rhs),
+                        CompareOp::Ge => gt_eq(lhs, rhs),
+                    }
+                } else if let Ok(rhs) = other.extract::<$scalar>() {
+                    match op {
+                        CompareOp::Eq => eq_scalar(lhs, rhs),
+                        CompareOp::Ne => neq_scalar(lhs, rhs),
+                        CompareOp::Lt => lt_scalar(lhs, rhs),
+                        CompareOp::Le => lt_eq_scalar(lhs, rhs),
+                        CompareOp::Gt => gt_scalar(lhs, rhs),
+                        CompareOp::Ge => gt_eq_scalar(lhs, rhs),
+                    }
+                } else {
+                    return Ok(None);
+                };
+                Ok(Some(BooleanArray(result)))
+            }
+
+            /// Same as `compare`, but raises a `TypeError` for unsupported operands
+            fn compare_or_raise(&self, other: &PyAny, op: CompareOp) -> PyResult<BooleanArray> {
+                self.compare(other, op)?.ok_or_else(|| {
+                    PyTypeError::new_err(format!(
+                        "{} can only be compared with an array of the same type or a scalar (got {})",
+                        stringify!($name),
+                        other.get_type()
+                    ))
+                })
+            }
+        }
+
+        #[pymethods]
+        impl $name {
+            /// Element-wise `==`; `array == other` compares whole arrays instead
+            #[pyo3(name = "eq")]
+            fn eq_(&self, other: &PyAny) -> PyResult<BooleanArray> {
+                self.compare_or_raise(other, CompareOp::Eq)
+            }
+
+            /// Element-wise `!=`; `array != other` compares whole arrays instead
+            #[pyo3(name = "ne")]
+            fn ne_(&self, other: &PyAny) -> PyResult<BooleanArray> {
+                self.compare_or_raise(other, CompareOp::Ne)
+            }
+
+            fn lt(&self, other: &PyAny) -> PyResult<BooleanArray> {
+                self.compare_or_raise(other, CompareOp::Lt)
+            }
+
+            fn le(&self, other: &PyAny) -> PyResult<BooleanArray> {
+                self.compare_or_raise(other, CompareOp::Le)
+            }
+
+            fn gt(&self, other: &PyAny) -> PyResult<BooleanArray> {
+                self.compare_or_raise(other, CompareOp::Gt)
+            }
+
+            fn ge(&self, other: &PyAny) -> PyResult<BooleanArray> {
+                self.compare_or_raise(other, CompareOp::Ge)
+            }
+        }
+    };
+}
+
+comparison!(Int8Array, primitive, i8);
+comparison!(Int16Array, primitive, i16);
+comparison!(Int32Array, primitive, i32);
+comparison!(Int64Array, primitive, i64);
+comparison!(UInt8Array, primitive, u8);
+comparison!(UInt16Array, primitive, u16);
+comparison!(UInt32Array, primitive, u32);
+comparison!(UInt64Array, primitive, u64);
+comparison!(Float32Array, primitive, f32);
+comparison!(Float64Array, primitive, f64);
+comparison!(BooleanArray, boolean, bool);
+comparison!(StringArray, utf8, &str);
+comparison!(LargeStringArray, utf8, &str);
+comparison!(BinaryArray, binary, &[u8]);
+comparison!(LargeBinaryArray, binary, &[u8]);
+
+/// Aggregates and arithmetic of primitive arrays
+macro_rules! primitive {
+    ($name:ident, $type:ty) => {
+        impl $name {
+            /// Applies `op` element-wise to this array and `other` (an array of the same type
+            /// and length, or a scalar), or returns `NotImplemented` for other operands.
+            /// `reflected` swaps the operands of `op`, for `__radd__` and alike.
+            fn arithmetic(
+                &self,
+                py: Python,
+                other: &PyAny,
+                op: fn($type, $type) -> $type,
+                reflected: bool,
+            ) -> PyResult<PyObject> {
+                let data_type = DataType::from(<$type as NativeType>::PRIMITIVE);
+                let result = if let Ok(other) = other.extract::<PyRef<$name>>() {
+                    check_lengths(self.0.len(), other.0.len())?;
+                    if reflected {
+                        arity::binary(&other.0, &self.0, data_type, op)
+                    } else {
+                        arity::binary(&self.0, &other.0, data_type, op)
+                    }
+                } else if let Ok(value) = other.extract::<$type>() {
+                    if reflected {
+                        arity::unary(&self.0, |x| op(value, x), data_type)
+                    } else {
+                        arity::unary(&self.0, |x| op(x, value), data_type)
+                    }
+                } else {
+                    return Ok(py.NotImplemented());
+                };
+                Ok($name(result).into_py(py))
+            }
+
+            fn as_f64(&self) -> PrimitiveArray<f64> {
+                cast::primitive_to_primitive::<$type, f64>(&self.0, &DataType::Float64)
+            }
+
+            /// Divides element-wise as 64-bit floats, like Python's `/`
+            fn divide(&self, py: Python, other: &PyAny, reflected: bool) -> PyResult<PyObject> {
+                let lhs = self.as_f64();
+                let data_type = DataType::Float64;
+                let result = if let Ok(other) = other.extract::<PyRef<$name>>() {
+                    check_lengths(self.0.len(), other.0.len())?;
+                    let rhs = other.as_f64();
+                    if reflected {
+                        arity::binary(&rhs, &lhs, data_type, |a, b| a / b)
+                    } else {
+                        arity::binary(&lhs, &rhs, data_type, |a, b| a / b)
+                    }
+                } else if let Ok(value) = other.extract::<f64>() {
+                    if reflected {
+                        arity::unary(&lhs, |x| value / x, data_type)
+                    } else {
+                        arity::unary(&lhs, |x| x / value, data_type)
+                    }
+                } else {
+                    return Ok(py.NotImplemented());
+                };
+                Ok(Float64Array(result).into_py(py))
+            }
+        }
+
+        #[pymethods]
+        impl $name {
+            /// The number of non-null values
+            fn count(&self) -> usize {
+                self.0.len() - self.0.null_count()
+            }
+
+            /// The sum of the non-null values, or `None` when there are none. Integers wrap
+            /// around on overflow.
+            fn sum(&self) -> Option<$type> {
+                aggregate::sum_primitive(&self.0)
+            }
+
+            /// The minimum of the non-null values, or `None` when there are none
+            fn min(&self) -> Option<$type> {
+                aggregate::min_primitive(&self.0)
+            }
+
+            /// The maximum of the non-null values, or `None` when there are none
+            fn max(&self) -> Option<$type> {
+                aggregate::max_primitive(&self.0)
+            }
+
+            /// The mean of the non-null values, or `None` when there are none. Values are
+            /// summed as `f64`, so that integers do not overflow.
+            fn mean(&self) -> Option<f64> {
+                let count = self.count();
+                if count == 0 {
+                    return None;
+                }
+                let sum = self.0.iter().flatten().map(|x| *x as f64).sum::<f64>();
+                Some(sum / count as f64)
+            }
+
+            fn __add__(&self, py: Python, other: &PyAny) -> PyResult<PyObject> {
+                self.arithmetic(py, other, Arithmetic::add, false)
+            }
+
+            fn __radd__(&self, py: Python, other: &PyAny) -> PyResult<PyObject> {
+                self.arithmetic(py, other, Arithmetic::add, true)
+            }
+
+            fn __sub__(&self, py: Python, other: &PyAny) -> PyResult<PyObject> {
+                self.arithmetic(py, other, Arithmetic::sub, false)
+            }
+
+            fn __rsub__(&self, py: Python, other: &PyAny) -> PyResult<PyObject> {
+                self.arithmetic(py, other, Arithmetic::sub, true)
+            }
+
+            fn __mul__(&self, py: Python, other: &PyAny) -> PyResult<PyObject> {
+                self.arithmetic(py, other, Arithmetic::mul, false)
+            }
+
+            fn __rmul__(&self, py: Python, other: &PyAny) -> PyResult<PyObject> {
+                self.arithmetic(py, other, Arithmetic::mul, true)
+            }
+
+            fn __truediv__(&self, py: Python, other: &PyAny) -> PyResult<PyObject> {
+                self.divide(py, other, false)
+            }
+
+            fn __rtruediv__(&self, py: Python, other: &PyAny) -> PyResult<PyObject> {
+                self.divide(py, other, true)
+            }
+        }
+    };
+}
+
+primitive!(Int8Array, i8);
+primitive!(Int16Array, i16);
+primitive!(Int32Array, i32);
+primitive!(Int64Array, i64);
+primitive!(UInt8Array, u8);
+primitive!(UInt16Array, u16);
+primitive!(UInt32Array, u32);
+primitive!(UInt64Array, u64);
+primitive!(Float32Array, f32);
+primitive!(Float64Array, f64);
+
+/// Aggregates of arrays of strings and bytes
+macro_rules! variable {
+    ($name:ident, $min:ident, $max:ident) => {
+        #[pymethods]
+        impl $name {
+            fn null_count(&self) -> usize {
+                self.0.null_count()
+            }
+
+            /// The number of non-null values
+            fn count(&self) -> usize {
+                self.0.len() - self.0.null_count()
+            }
+
+            /// The minimum of the non-null values, or `None` when there are none
+            fn min(&self, py: Python) -> Option<PyObject> {
+                aggregate::$min(&self.0).map(|x| x.into_py(py))
+            }
+
+            /// The maximum of the non-null values, or `None` when there are none
+            fn max(&self, py: Python) -> Option<PyObject> {
+                aggregate::$max(&self.0).map(|x| x.into_py(py))
+            }
+        }
+    };
+}
+
+variable!(StringArray, min_string, max_string);
+variable!(LargeStringArray, min_string, max_string);
+variable!(BinaryArray, min_binary, max_binary);
+variable!(LargeBinaryArray, min_binary, max_binary);
+
+impl BooleanArray {
+    /// Applies `op` element-wise to this array and `other` (a boolean array of the same length
+    /// or a boolean), or returns `NotImplemented` for other operands. Results are null where
+    /// either operand is null.
+    fn logical(
+        &self,
+        py: Python,
+        other: &PyAny,
+        op: fn(&_BooleanArray, &_BooleanArray) -> _BooleanArray,
+    ) -> PyResult<PyObject> {
+        let result = if let Ok(other) = other.extract::<PyRef<BooleanArray>>() {
+            check_lengths(self.0.len(), other.0.len())?;
+            op(&self.0, &other.0)
+        } else if let Ok(value) = other.extract::<bool>() {
+            let length = self.0.len();
+            let values: Bitmap = if value {
+                MutableBitmap::from_len_set(length).into()
+            } else {
+                MutableBitmap::from_len_zeroed(length).into()
+            };
+            let constant = _BooleanArray::new(DataType::Boolean, values, None);
+            op(&self.0, &constant)
+        } else {
+            return Ok(py.NotImplemented());
+        };
+        Ok(BooleanArray(result).into_py(py))
+    }
+}
+
+#[pymethods]
+impl BooleanArray {
+    fn null_count(&self) -> usize {
+        self.0.null_count()
+    }
+
+    /// The number of non-null values
+    fn count(&self) -> usize {
+        self.0.len() - self.0.null_count()
+    }
+
+    /// The number of `true` values
+    fn sum(&self) -> usize {
+        let values = self.0.values();
+        match self.0.validity() {
+            Some(validity) => {
+                let valid = values & validity;
+                valid.len() - valid.unset_bits()
+            }
+            None => values.len() - values.unset_bits(),
+        }
+    }
+
+    /// The minimum of the non-null values, or `None` when there are none
+    fn min(&self) -> Option<bool> {
+        aggregate::min_boolean(&self.0)
+    }
+
+    /// The maximum of the non-null values, or `None` when there are none
+    fn max(&self) -> Option<bool> {
+        aggregate::max_boolean(&self.0)
+    }
+
+    fn __and__(&self, py: Python, other: &PyAny) -> PyResult<PyObject> {
+        self.logical(py, other, boolean::and)
+    }
+
+    fn __rand__(&self, py: Python, other: &PyAny) -> PyResult<PyObject> {
+        self.logical(py, other, boolean::and)
+    }
+
+    fn __or__(&self, py: Python, other: &PyAny) -> PyResult<PyObject> {
+        self.logical(py, other, boolean::or)
+    }
+
+    fn __ror__(&self, py: Python, other: &PyAny) -> PyResult<PyObject> {
+        self.logical(py, other, boolean::or)
+    }
+
+    fn __invert__(&self) -> BooleanArray {
+        BooleanArray(boolean::not(&self.0))
+    }
+}
+
+/// Returns `index` as a position in a sequence of `length` items, counting from the end when
+/// negative
+pub(crate) fn normalize_index(index: isize, length: usize) -> PyResult<usize> {
+    let position = if index < 0 {
+        index + length as isize
+    } else {
+        index
+    };
+    if position < 0 || position as usize >= length {
+        Err(PyIndexError::new_err(format!(
+            "Index {} is out of range for length {}",
+            index, length
+        )))
+    } else {
+        Ok(position as usize)
+    }
+}
+
+/// Returns the rows of `arrays` (all of length `length`) selected by `slice`, as zero-copy
+/// slices when its step is 1
+pub(crate) fn slice_arrays(
+    arrays: &[Box<dyn Array>],
+    length: usize,
+    slice: &PySlice,
+) -> PyResult<Vec<Box<dyn Array>>> {
+    let indices = slice.indices(length as c_long)?;
+    let (start, step, length) = (indices.start, indices.step, indices.slicelength);
+    if length == 0 {
+        return Ok(arrays.iter().map(|array| array.slice(0, 0)).collect());
+    }
+    if step == 1 {
+        return Ok(arrays
+            .iter()
+            .map(|array| array.slice(start as usize, length as usize))
+            .collect());
+    }
+    let indices = PrimitiveArray::<u64>::from_vec(
+        (0..length)
+            .map(|i| (start + i * step) as u64)
+            .collect(),
+    );
+    take_arrays(arrays, &indices)
+}
+
+fn take_arrays<I: Index>(
+    arrays: &[Box<dyn Array>],
+    indices: &PrimitiveArray<I>,
+) -> PyResult<Vec<Box<dyn Array>>> {
+    Ok(arrays
+        .iter()
+        .map(|array| take::take(array.as_ref(), indices))
+        .collect::<arrow2::error::Result<Vec<_>>>()
+        .map_err(Error)?)
+}
+
+/// Returns the rows of `arrays` (all of length `length`) at `indices`, an integer array or a
+/// sequence of non-negative integers. Null indices take nulls.
+pub(crate) fn take_rows(
+    arrays: &[Box<dyn Array>],
+    length: usize,
+    indices: &PyAny,
+) -> PyResult<Vec<Box<dyn Array>>> {
+    macro_rules! take_with {
+        ($indices:expr) => {{
+            let indices = $indices;
+            if indices.iter().flatten().any(|index| index.to_usize() >= length) {
+                return Err(PyIndexError::new_err(format!(
+                    "Indices must be non-negative and less than {}",
+                    length
+                )));
+            }
+            take_arrays(arrays, indices)
+        }};
+    }
+
+    if let Ok(indices) = indices.extract::<PyRef<Int32Array>>() {
+        take_with!(&indices.0)
+    } else if let Ok(indices) = indices.extract::<PyRef<Int64Array>>() {
+        take_with!(&indices.0)
+    } else if let Ok(indices) = indices.extract::<PyRef<UInt32Array>>() {
+        take_with!(&indices.0)
+    } else if let Ok(indices) = indices.extract::<PyRef<UInt64Array>>() {
+        take_with!(&indices.0)
+    } else {
+        let indices = indices.extract::<Vec<u64>>()?;
+        take_with!(&PrimitiveArray::<u64>::from_vec(indices))
+    }
+}
+
+/// Returns the rows of `arrays` where `mask` is true (null counts as false)
+pub(crate) fn filter_rows(
+    arrays: &[Box<dyn Array>],
+    length: usize,
+    mask: &_BooleanArray,
+) -> PyResult<Vec<Box<dyn Array>>> {
+    check_lengths(length, mask.len())?;
+    Ok(arrays
+        .iter()
+        .map(|array| filter::filter(array.as_ref(), mask))
+        .collect::<arrow2::error::Result<Vec<_>>>()
+        .map_err(Error)?)
+}
+
+/// Indexing, slicing, filtering and taking
+macro_rules! selection {
+    ($name:ident) => {
+        impl $name {
+            /// Returns the single array of `arrays` as a Python object
+            fn from_arrays(py: Python, arrays: Vec<Box<dyn Array>>) -> PyObject {
+                to_py_object(py, arrays[0].as_ref())
+            }
+        }
+
+        #[pymethods]
+        impl $name {
+            /// The value at an integer index (`None` when null), or the values of a slice:
+            /// zero-copy when its step is 1.
+            fn __getitem__(&self, py: Python, key: &PyAny) -> PyResult<PyObject> {
+                let length = self.0.len();
+                if let Ok(slice) = key.downcast::<PySlice>() {
+                    let arrays = slice_arrays(&[self.0.clone().boxed()], length, slice)?;
+                    return Ok(Self::from_arrays(py, arrays));
+                }
+                let index = normalize_index(key.extract()?, length)?;
+                Ok(if self.0.is_null(index) {
+                    py.None()
+                } else {
+                    self.0.value(index).into_py(py)
+                })
+            }
+
+            /// The values where `mask` (a boolean array of the same length) is true
+            fn filter(&self, py: Python, mask: PyRef<BooleanArray>) -> PyResult<PyObject> {
+                let arrays = filter_rows(&[self.0.clone().boxed()], self.0.len(), &mask.0)?;
+                Ok(Self::from_arrays(py, arrays))
+            }
+
+            /// The values at `indices`, an integer array or a sequence of non-negative integers
+            fn take(&self, py: Python, indices: &PyAny) -> PyResult<PyObject> {
+                let arrays = take_rows(&[self.0.clone().boxed()], self.0.len(), indices)?;
+                Ok(Self::from_arrays(py, arrays))
+            }
+        }
+    };
+}
+
+selection!(Int8Array);
+selection!(Int16Array);
+selection!(Int32Array);
+selection!(Int64Array);
+selection!(UInt8Array);
+selection!(UInt16Array);
+selection!(UInt32Array);
+selection!(UInt64Array);
+selection!(Float32Array);
+selection!(Float64Array);
+selection!(BooleanArray);
+selection!(StringArray);
+selection!(LargeStringArray);
+selection!(BinaryArray);
+selection!(LargeBinaryArray);
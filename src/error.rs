@@ -2,6 +2,13 @@ use pyo3::{exceptions::PyOSError, PyErr};
 
 pub struct Error(pub arrow2::error::Error);
 
+impl Error {
+    /// Wraps a Python exception, so that it is re-raised as it is when converted back
+    pub fn from_py(err: PyErr) -> Self {
+        Error(arrow2::error::Error::External("".to_string(), Box::new(err)))
+    }
+}
+
 impl std::fmt::Display for Error {
     fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
         write!(f, "{}", self.0)
@@ -16,6 +23,11 @@ impl From<arrow2::error::Error> for Error {
 
 impl std::convert::From<Error> for PyErr {
     fn from(err: Error) -> PyErr {
-        PyOSError::new_err(err.to_string())
+        match err.0 {
+            arrow2::error::Error::External(_, err) if err.is::<PyErr>() => {
+                *err.downcast::<PyErr>().expect("checked by the guard")
+            }
+            err => PyOSError::new_err(err.to_string()),
+        }
     }
 }
@@ -1,15 +1,25 @@
 use std::fs::File;
-use std::io::{BufReader, BufWriter, Read, Seek, Write};
+use std::io::{BufReader, BufWriter, Cursor, Read, Seek, Write};
+use std::sync::{Arc, Mutex};
 
+use memmap2::Mmap;
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
 use pyo3::types::PyString;
 
 use super::py_file::PyFileLikeObject;
 
-/// Represents either a path `File` or a file-like object `FileLike`
+/// Default size of the read-ahead buffer of readers
+pub const DEFAULT_BUFFER_SIZE: usize = 1 << 20;
+
+/// Default size of the buffer of writers
+pub const DEFAULT_WRITE_BUFFER_SIZE: usize = 8 << 20;
+
+/// Represents either a path `File`, a memory-mapped path `Mmap` or a file-like object `FileLike`
 #[derive(Debug)]
 pub enum FileReader {
     File(BufReader<File>),
+    Mmap(Cursor<Mmap>),
     FileLike(PyFileLikeObject),
 }
 
@@ -18,6 +28,7 @@ impl Seek for FileReader {
     fn seek(&mut self, pos: std::io::SeekFrom) -> std::io::Result<u64> {
         match self {
             Self::File(file) => file.seek(pos),
+            Self::Mmap(file) => file.seek(pos),
             Self::FileLike(file) => file.seek(pos),
         }
     }
@@ -28,28 +39,65 @@ impl Read for FileReader {
     fn read(&mut self, buf: &mut [u8]) -> std::io::Result<usize> {
         match self {
             Self::File(file) => file.read(buf),
+            Self::Mmap(file) => file.read(buf),
             Self::FileLike(file) => file.read(buf),
         }
     }
 }
 
 impl FileReader {
-    pub fn from_pyobject(path_or_file_like: PyObject) -> PyResult<Self> {
+    /// Creates a reader of a path or of a file-like object, whose reads are buffered by
+    /// a read-ahead buffer of `buffer_size` bytes.
+    pub fn from_pyobject(path_or_file_like: PyObject, buffer_size: usize) -> PyResult<Self> {
+        Self::try_new(path_or_file_like, buffer_size, true)
+    }
+
+    /// Same as `from_pyobject`, but file-like objects are only required to be readable
+    /// (e.g. pipes, sockets or `sys.stdin.buffer`).
+    pub fn from_pyobject_unseekable(
+        path_or_file_like: PyObject,
+        buffer_size: usize,
+    ) -> PyResult<Self> {
+        Self::try_new(path_or_file_like, buffer_size, false)
+    }
+
+    fn try_new(path_or_file_like: PyObject, buffer_size: usize, seek: bool) -> PyResult<Self> {
         let gil = Python::acquire_gil();
         let py = gil.python();
 
         // is a path
         if let Ok(string_ref) = path_or_file_like.cast_as::<PyString>(py) {
             let path = string_ref.to_string_lossy().to_string();
-            return Ok(Self::File(BufReader::new(File::open(path)?)));
+            return Ok(Self::File(BufReader::with_capacity(
+                buffer_size,
+                File::open(path)?,
+            )));
         }
 
         // is a file-like
-        match PyFileLikeObject::with_requirements(path_or_file_like, true, false, true) {
-            Ok(f) => Ok(Self::FileLike(f)),
+        match PyFileLikeObject::with_requirements(path_or_file_like, true, false, seek) {
+            Ok(f) => Ok(Self::FileLike(f.with_buffer_size(buffer_size))),
             Err(e) => Err(e),
         }
     }
+
+    /// Memory-maps the file at the path `path`. Pages are loaded on demand and are shared
+    /// (via the page cache) between all processes mapping the same file.
+    pub fn memory_map(path: PyObject) -> PyResult<Self> {
+        let gil = Python::acquire_gil();
+        let py = gil.python();
+
+        let path = path
+            .cast_as::<PyString>(py)
+            .map_err(|_| PyValueError::new_err("Only paths can be memory-mapped"))?
+            .to_string_lossy()
+            .to_string();
+        let file = File::open(path)?;
+        // Safety: the file must not be truncated while it is mapped. This is the same contract
+        // as reading it: a file modified while it is read is undefined behavior of the reader.
+        let mmap = unsafe { Mmap::map(&file)? };
+        Ok(Self::Mmap(Cursor::new(mmap)))
+    }
 }
 
 /// Represents either a path `File` or a file-like object `FileLike`
@@ -87,20 +135,72 @@ impl Write for FileWriter {
 }
 
 impl FileWriter {
-    pub fn from_pyobject(path_or_file_like: PyObject) -> PyResult<Self> {
+    /// Creates a writer of a path or of a file-like object, whose writes are buffered by
+    /// a buffer of `buffer_size` bytes.
+    pub fn from_pyobject(path_or_file_like: PyObject, buffer_size: usize) -> PyResult<Self> {
+        Self::try_new(path_or_file_like, buffer_size, true)
+    }
+
+    /// Same as `from_pyobject`, but file-like objects are only required to be writable
+    /// (e.g. pipes, sockets or `sys.stdout.buffer`).
+    pub fn from_pyobject_unseekable(
+        path_or_file_like: PyObject,
+        buffer_size: usize,
+    ) -> PyResult<Self> {
+        Self::try_new(path_or_file_like, buffer_size, false)
+    }
+
+    fn try_new(path_or_file_like: PyObject, buffer_size: usize, seek: bool) -> PyResult<Self> {
         let gil = Python::acquire_gil();
         let py = gil.python();
 
         // is a path
         if let Ok(string_ref) = path_or_file_like.cast_as::<PyString>(py) {
             let path = string_ref.to_string_lossy().to_string();
-            return Ok(Self::File(BufWriter::new(File::create(path)?)));
+            return Ok(Self::File(BufWriter::with_capacity(
+                buffer_size,
+                File::create(path)?,
+            )));
         }
 
         // is a file-like
-        match PyFileLikeObject::with_requirements(path_or_file_like, false, true, true) {
-            Ok(f) => Ok(Self::FileLike(f)),
+        match PyFileLikeObject::with_requirements(path_or_file_like, false, true, seek) {
+            Ok(f) => Ok(Self::FileLike(f.with_write_buffer_size(buffer_size))),
             Err(e) => Err(e),
         }
     }
 }
+
+/// A [`FileWriter`] shared between a writer of a format and its owner, so that the owner can
+/// flush it (e.g. after every record batch, or to surface errors when the file is closed).
+/// It counts the bytes written through it.
+#[derive(Debug, Clone)]
+pub struct SharedWriter(Arc<Mutex<(FileWriter, u64)>>);
+
+impl SharedWriter {
+    pub fn new(writer: FileWriter) -> Self {
+        Self(Arc::new(Mutex::new((writer, 0))))
+    }
+
+    fn lock(&self) -> std::sync::MutexGuard<(FileWriter, u64)> {
+        self.0.lock().unwrap_or_else(|e| e.into_inner())
+    }
+
+    /// The number of bytes written so far
+    pub fn bytes_written(&self) -> u64 {
+        self.lock().1
+    }
+}
+
+impl Write for SharedWriter {
+    fn write(&mut self, buf: &[u8]) -> std::io::Result<usize> {
+        let mut writer = self.lock();
+        let written = writer.0.write(buf)?;
+        writer.1 += written as u64;
+        Ok(written)
+    }
+
+    fn flush(&mut self) -> std::io::Result<()> {
+        self.lock().0.flush()
+    }
+}
@@ -1,29 +1,182 @@
+use std::io::{Read, Seek, SeekFrom, Write};
+
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
 
+use arrow2::array::Array;
+use arrow2::chunk::Chunk as _Chunk;
+use arrow2::datatypes::Schema as _Schema;
+use arrow2::error::{Error as ArrowError, Result};
 use arrow2::io::ipc;
+use arrow_format::ipc::planus::ReadAsRoot;
+use arrow_format::ipc::{Block, MessageHeaderRef, MessageRef};
 
+use super::super::asyncio;
+use super::super::c_data;
 use super::super::datatypes::Schema;
 use super::super::file_like;
-use super::super::Chunk;
+use super::super::{slice_chunk, Chunk};
 use super::super::Error;
+use super::prefetch::{Chunks, DEFAULT_PREFETCH_BYTES};
+
+const CONTINUATION_MARKER: [u8; 4] = [0xff; 4];
+
+/// Returns the number of rows of the record batch in `block`, reading only its message header.
+fn block_rows<R: Read + Seek>(reader: &mut R, block: &Block) -> Result<usize> {
+    reader.seek(SeekFrom::Start(block.offset as u64))?;
+    let mut meta_buf = [0; 4];
+    reader.read_exact(&mut meta_buf)?;
+    if meta_buf == CONTINUATION_MARKER {
+        // continuation marker encountered, read message next
+        reader.read_exact(&mut meta_buf)?;
+    }
+    let meta_len = i32::from_le_bytes(meta_buf) as usize;
+    let mut message = vec![0; meta_len];
+    reader.read_exact(&mut message)?;
+
+    let message = MessageRef::read_as_root(&message)
+        .map_err(|err| ArrowError::OutOfSpec(format!("Unable to parse message: {:?}", err)))?;
+    let header = message
+        .header()
+        .map_err(|err| ArrowError::OutOfSpec(format!("Unable to read header: {:?}", err)))?;
+    match header {
+        Some(MessageHeaderRef::RecordBatch(batch)) => batch
+            .length()
+            .map(|length| length as usize)
+            .map_err(|err| ArrowError::OutOfSpec(format!("Unable to read length: {:?}", err))),
+        _ => Err(ArrowError::OutOfSpec(
+            "A block of an Arrow file must contain a record batch".to_string(),
+        )),
+    }
+}
+
+/// Returns the IPC body compression named `name` (uncompressed when `None`)
+pub(super) fn compression(name: Option<&str>) -> PyResult<Option<ipc::write::Compression>> {
+    match name {
+        None | Some("uncompressed") => Ok(None),
+        Some("lz4") => Ok(Some(ipc::write::Compression::LZ4)),
+        Some("zstd") => Ok(Some(ipc::write::Compression::ZSTD)),
+        Some(other) => Err(PyValueError::new_err(format!(
+            "Compression \"{}\" is not supported",
+            other
+        ))),
+    }
+}
+
+/// Writes `chunks` into `writer` as an Arrow file of `schema`, one record batch per chunk
+pub(super) fn write_file<W, I>(
+    writer: W,
+    schema: &_Schema,
+    chunks: I,
+    compression: Option<ipc::write::Compression>,
+) -> Result<()>
+where
+    W: Write,
+    I: Iterator<Item = Result<_Chunk<Box<dyn Array>>>>,
+{
+    let options = ipc::write::WriteOptions { compression };
+    let mut writer = ipc::write::FileWriter::try_new(writer, schema, None, options)?;
+    for chunk in chunks {
+        writer.write(&chunk?, None)?;
+    }
+    writer.finish()
+}
+
+/// An iterator of record batches of an Arrow file, starting at row `offset`.
+pub struct BatchReader {
+    reader: ipc::read::FileReader<file_like::FileReader>,
+    // number of rows to skip from the first batch
+    offset: usize,
+}
+
+impl BatchReader {
+    fn try_new(
+        mut reader: file_like::FileReader,
+        offset: usize,
+        limit: Option<usize>,
+    ) -> Result<Self> {
+        let mut metadata = ipc::read::read_file_metadata(&mut reader)?;
+        if limit == Some(0) {
+            metadata.blocks.clear();
+        }
+
+        // skip whole batches using the row counts of their headers, without reading their bodies
+        let mut offset = offset;
+        let mut first = 0;
+        while offset > 0 && first < metadata.blocks.len() {
+            let rows = block_rows(&mut reader, &metadata.blocks[first])?;
+            if offset < rows {
+                break;
+            }
+            offset -= rows;
+            first += 1;
+        }
+        metadata.blocks.drain(..first);
+
+        let limit = limit.map(|limit| offset + limit);
+        let reader = ipc::read::FileReader::new(reader, metadata, None, limit);
+        Ok(Self { reader, offset })
+    }
+
+    pub fn schema(&self) -> &_Schema {
+        self.reader.schema()
+    }
+}
+
+impl Iterator for BatchReader {
+    type Item = Result<_Chunk<Box<dyn Array>>>;
+
+    fn next(&mut self) -> Option<Self::Item> {
+        let chunk = self.reader.next()?;
+        let offset = std::mem::take(&mut self.offset);
+        Some(chunk.map(|chunk| {
+            if offset == 0 {
+                chunk
+            } else {
+                slice_chunk(&chunk, offset, chunk.len() - offset)
+            }
+        }))
+    }
+}
 
 #[pyclass]
-pub struct ArrowFileReader(ipc::read::FileReader<file_like::FileReader>);
+pub struct ArrowFileReader(Chunks<BatchReader>, Schema, asyncio::Tasks);
 
 #[pymethods]
 impl ArrowFileReader {
     #[new]
-    fn new(obj: PyObject) -> PyResult<Self> {
-        let mut reader = file_like::FileReader::from_pyobject(obj)?;
+    #[args(
+        limit = "None",
+        offset = "0",
+        memory_map = "false",
+        buffer_size = "file_like::DEFAULT_BUFFER_SIZE",
+        prefetch = "0",
+        prefetch_bytes = "DEFAULT_PREFETCH_BYTES"
+    )]
+    fn new(
+        obj: PyObject,
+        limit: Option<usize>,
+        offset: usize,
+        memory_map: bool,
+        buffer_size: usize,
+        prefetch: usize,
+        prefetch_bytes: usize,
+    ) -> PyResult<Self> {
+        let reader = if memory_map {
+            file_like::FileReader::memory_map(obj)?
+        } else {
+            file_like::FileReader::from_pyobject(obj, buffer_size)?
+        };
 
-        let metadata = ipc::read::read_file_metadata(&mut reader).map_err(Error)?;
-        let reader = ipc::read::FileReader::new(reader, metadata, None, None);
+        let reader = BatchReader::try_new(reader, offset, limit).map_err(Error)?;
+        let schema = Schema(reader.schema().clone());
+        let reader = Chunks::new(reader, prefetch, prefetch_bytes);
 
-        Ok(Self(reader))
+        Ok(Self(reader, schema, asyncio::Tasks::default()))
     }
 
     fn schema(slf: PyRef<Self>) -> Schema {
-        Schema(slf.0.schema().clone())
+        slf.1.clone()
     }
 
     fn __iter__(slf: PyRef<Self>) -> PyRef<Self> {
@@ -31,33 +184,264 @@ impl ArrowFileReader {
     }
 
     fn __next__(mut slf: PyRefMut<Self>) -> PyResult<Option<Chunk>> {
-        let chunk = slf.0.next().transpose().map_err(Error)?;
+        let py = slf.py();
+        let reader = &mut slf.0;
+        // decoding does not need the GIL; file-like objects re-acquire it on every call
+        let chunk = py.allow_threads(|| reader.next()).transpose().map_err(Error)?;
         Ok(chunk.map(Chunk))
     }
+
+    /// Returns an `asyncio.Future` of the next chunk (or `None` when exhausted), read and
+    /// decoded on a native thread without the GIL
+    fn next_async(slf: PyRef<Self>, py: Python) -> PyResult<PyObject> {
+        let tasks = slf.2.clone();
+        asyncio::spawn_with(py, &tasks, slf.into(), |reader: &mut Self| {
+            Ok(reader.0.next().transpose().map_err(Error)?.map(Chunk))
+        })
+    }
+
+    /// Exports the remaining chunks through the Arrow C stream interface. Reading the stream
+    /// advances this reader.
+    fn __arrow_c_stream__(
+        slf: PyRef<Self>,
+        py: Python,
+        requested_schema: Option<PyObject>,
+    ) -> PyResult<PyObject> {
+        let _ = requested_schema;
+        let schema = slf.1 .0.clone();
+        let reader: Py<Self> = slf.into();
+        let chunks = std::iter::from_fn(move || {
+            Python::with_gil(|py| match reader.try_borrow_mut(py) {
+                Ok(mut reader) => {
+                    let reader = &mut reader.0;
+                    py.allow_threads(|| reader.next())
+                }
+                Err(e) => Some(Err(arrow2::error::Error::InvalidArgumentError(e.to_string()))),
+            })
+        });
+        c_data::export_chunks(py, chunks, &schema)
+    }
 }
 
 #[pyclass]
-pub struct ArrowFileWriter(ipc::write::FileWriter<file_like::FileWriter>);
+pub struct ArrowFileWriter(
+    ipc::write::FileWriter<file_like::SharedWriter>,
+    file_like::SharedWriter,
+    asyncio::Tasks,
+);
 
 #[pymethods]
 impl ArrowFileWriter {
     #[new]
-    fn new(obj: PyObject, schema: Schema) -> PyResult<Self> {
-        let writer = file_like::FileWriter::from_pyobject(obj)?;
+    #[args(
+        compression = "None",
+        buffer_size = "file_like::DEFAULT_WRITE_BUFFER_SIZE"
+    )]
+    fn new(
+        obj: PyObject,
+        schema: Schema,
+        compression: Option<&str>,
+        buffer_size: usize,
+    ) -> PyResult<Self> {
+        let compression = self::compression(compression)?;
+        let writer = file_like::FileWriter::from_pyobject(obj, buffer_size)?;
+        let writer = file_like::SharedWriter::new(writer);
 
         let reader = ipc::write::FileWriter::try_new(
-            writer,
+            writer.clone(),
             &schema.0,
             None,
-            ipc::write::WriteOptions { compression: None },
+            ipc::write::WriteOptions { compression },
         )
         .map_err(Error)?;
 
-        Ok(Self(reader))
+        Ok(Self(reader, writer, asyncio::Tasks::default()))
+    }
+
+    fn write(mut slf: PyRefMut<Self>, chunk: PyRef<Chunk>) -> PyResult<()> {
+        let py = slf.py();
+        let writer = &mut slf.0;
+        let chunk = &chunk.0;
+        // encoding does not need the GIL; file-like objects re-acquire it when flushed
+        Ok(py.allow_threads(|| writer.write(chunk, None)).map_err(Error)?)
+    }
+
+    /// Returns an `asyncio.Future` that completes once `chunk` was written, encoded and
+    /// written on a native thread without the GIL
+    fn write_async(slf: PyRef<Self>, py: Python, chunk: PyRef<Chunk>) -> PyResult<PyObject> {
+        let chunk = chunk.0.clone();
+        let tasks = slf.2.clone();
+        asyncio::spawn_with(py, &tasks, slf.into(), move |writer: &mut Self| {
+            Ok(writer.0.write(&chunk, None).map_err(Error)?)
+        })
+    }
+
+    fn __enter__(slf: PyRefMut<Self>) -> PyRefMut<Self> {
+        slf
+    }
+
+    fn __exit__(mut slf: PyRefMut<Self>) -> PyResult<()> {
+        slf.0.finish().map_err(Error)?;
+        slf.1.flush()?;
+        Ok(())
+    }
+}
+
+/// An iterator of record batches of an Arrow IPC stream. Unlike [`BatchReader`], it only
+/// requires a readable source.
+pub struct StreamBatchReader(ipc::read::StreamReader<file_like::FileReader>);
+
+impl StreamBatchReader {
+    fn try_new(mut reader: file_like::FileReader) -> Result<Self> {
+        let metadata = ipc::read::read_stream_metadata(&mut reader)?;
+        Ok(Self(ipc::read::StreamReader::new(reader, metadata, None)))
+    }
+
+    pub fn schema(&self) -> &_Schema {
+        &self.0.metadata().schema
+    }
+}
+
+impl Iterator for StreamBatchReader {
+    type Item = Result<_Chunk<Box<dyn Array>>>;
+
+    fn next(&mut self) -> Option<Self::Item> {
+        match self.0.next()? {
+            Ok(ipc::read::StreamState::Some(chunk)) => Some(Ok(chunk)),
+            // reads block until data is available, so waiting means that the source was
+            // closed without an end-of-stream marker
+            Ok(ipc::read::StreamState::Waiting) => None,
+            Err(e) => Some(Err(e)),
+        }
+    }
+}
+
+#[pyclass]
+pub struct ArrowStreamReader(StreamBatchReader, asyncio::Tasks);
+
+#[pymethods]
+impl ArrowStreamReader {
+    #[new]
+    #[args(buffer_size = "0")]
+    fn new(obj: PyObject, buffer_size: usize) -> PyResult<Self> {
+        // reads from pipes block until the buffer is full, so streams are unbuffered by default
+        let reader = file_like::FileReader::from_pyobject_unseekable(obj, buffer_size)?;
+
+        let reader = StreamBatchReader::try_new(reader).map_err(Error)?;
+
+        Ok(Self(reader, asyncio::Tasks::default()))
+    }
+
+    fn schema(slf: PyRef<Self>) -> Schema {
+        Schema(slf.0.schema().clone())
+    }
+
+    fn __iter__(slf: PyRef<Self>) -> PyRef<Self> {
+        slf
     }
 
+    fn __next__(mut slf: PyRefMut<Self>) -> PyResult<Option<Chunk>> {
+        let py = slf.py();
+        let reader = &mut slf.0;
+        // decoding does not need the GIL; file-like objects re-acquire it on every call
+        let chunk = py.allow_threads(|| reader.next()).transpose().map_err(Error)?;
+        Ok(chunk.map(Chunk))
+    }
+
+    /// Returns an `asyncio.Future` of the next chunk (or `None` when exhausted), read and
+    /// decoded on a native thread without the GIL
+    fn next_async(slf: PyRef<Self>, py: Python) -> PyResult<PyObject> {
+        let tasks = slf.1.clone();
+        asyncio::spawn_with(py, &tasks, slf.into(), |reader: &mut Self| {
+            Ok(reader.0.next().transpose().map_err(Error)?.map(Chunk))
+        })
+    }
+
+    /// Exports the remaining chunks through the Arrow C stream interface. Reading the stream
+    /// advances this reader.
+    fn __arrow_c_stream__(
+        slf: PyRef<Self>,
+        py: Python,
+        requested_schema: Option<PyObject>,
+    ) -> PyResult<PyObject> {
+        let _ = requested_schema;
+        let schema = slf.0.schema().clone();
+        let reader: Py<Self> = slf.into();
+        let chunks = std::iter::from_fn(move || {
+            Python::with_gil(|py| match reader.try_borrow_mut(py) {
+                Ok(mut reader) => {
+                    let reader = &mut reader.0;
+                    py.allow_threads(|| reader.next())
+                }
+                Err(e) => Some(Err(arrow2::error::Error::InvalidArgumentError(e.to_string()))),
+            })
+        });
+        c_data::export_chunks(py, chunks, &schema)
+    }
+}
+
+#[pyclass]
+pub struct ArrowStreamWriter(
+    ipc::write::StreamWriter<file_like::SharedWriter>,
+    file_like::SharedWriter,
+    asyncio::Tasks,
+);
+
+impl ArrowStreamWriter {
+    fn write_chunk(&mut self, chunk: &_Chunk<Box<dyn Array>>) -> Result<()> {
+        self.0.write(chunk, None)?;
+        self.1.flush()?;
+        Ok(())
+    }
+}
+
+#[pymethods]
+impl ArrowStreamWriter {
+    #[new]
+    #[args(
+        compression = "None",
+        buffer_size = "file_like::DEFAULT_WRITE_BUFFER_SIZE"
+    )]
+    fn new(
+        obj: PyObject,
+        schema: Schema,
+        compression: Option<&str>,
+        buffer_size: usize,
+    ) -> PyResult<Self> {
+        let compression = self::compression(compression)?;
+        let writer = file_like::FileWriter::from_pyobject_unseekable(obj, buffer_size)?;
+        let writer = file_like::SharedWriter::new(writer);
+
+        let mut stream = ipc::write::StreamWriter::new(
+            writer.clone(),
+            ipc::write::WriteOptions { compression },
+        );
+        stream.start(&schema.0, None).map_err(Error)?;
+        let mut writer = Self(stream, writer, asyncio::Tasks::default());
+        writer.1.flush()?;
+
+        Ok(writer)
+    }
+
+    /// Writes `chunk` as a record batch and flushes it, so that readers receive it immediately
     fn write(mut slf: PyRefMut<Self>, chunk: PyRef<Chunk>) -> PyResult<()> {
-        Ok(slf.0.write(&chunk.0, None).map_err(Error)?)
+        let py = slf.py();
+        let writer = &mut *slf;
+        let chunk = &chunk.0;
+        // encoding does not need the GIL; file-like objects re-acquire it when flushed
+        py.allow_threads(|| writer.write_chunk(chunk))
+            .map_err(Error)?;
+        Ok(())
+    }
+
+    /// Returns an `asyncio.Future` that completes once `chunk` was written, encoded and
+    /// written on a native thread without the GIL
+    fn write_async(slf: PyRef<Self>, py: Python, chunk: PyRef<Chunk>) -> PyResult<PyObject> {
+        let chunk = chunk.0.clone();
+        let tasks = slf.2.clone();
+        asyncio::spawn_with(py, &tasks, slf.into(), move |writer: &mut Self| {
+            Ok(writer.write_chunk(&chunk).map_err(Error)?)
+        })
     }
 
     fn __enter__(slf: PyRefMut<Self>) -> PyRefMut<Self> {
@@ -66,6 +450,7 @@ impl ArrowFileWriter {
 
     fn __exit__(mut slf: PyRefMut<Self>) -> PyResult<()> {
         slf.0.finish().map_err(Error)?;
+        slf.1.flush()?;
         Ok(())
     }
 }
@@ -1,6 +1,8 @@
 mod ipc;
 mod odbc;
 mod parquet;
+mod predicate;
+mod prefetch;
 
 pub use ipc::*;
 pub use odbc::*;
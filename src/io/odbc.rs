@@ -1,84 +1,751 @@
+use std::collections::HashMap;
+use std::io::Write;
+use std::ops::Deref;
+use std::sync::{Arc, Condvar, Mutex, MutexGuard};
+use std::time::{Duration, Instant};
+
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
 
+use arrow2::array::Array;
 use arrow2::chunk::Chunk as _Chunk;
-use arrow2::datatypes::Field as _Field;
+use arrow2::datatypes::{Field as _Field, Schema as _Schema};
+use arrow2::error::Result;
 use arrow2::io::odbc;
 
+use super::super::asyncio;
 use super::super::datatypes::Field;
-use super::super::Chunk;
+use super::super::file_like;
+use super::super::rechunk::Rechunk;
 use super::super::Error;
+use super::super::{slice_chunk, without_gil, Chunk};
+use super::prefetch::{Chunks, DEFAULT_PREFETCH_BYTES};
+use super::{ipc, parquet};
 
 static ENVIRONMENT: once_cell::sync::Lazy<odbc::api::Environment> =
     once_cell::sync::Lazy::new(|| odbc::api::Environment::new().unwrap());
 
-#[pyclass(unsendable)]
-pub struct ODBCConnector(odbc::api::Connection<'static>);
+/// An ODBC connection that can be moved between threads
+struct Connection(odbc::api::Connection<'static>);
 
-#[pymethods]
-impl ODBCConnector {
-    #[new]
-    fn new(connection_string: String) -> PyResult<Self> {
-        let connection = ENVIRONMENT
-            .connect_with_connection_string(&connection_string)
+// Safety: ODBC handles can be used from any thread, as long as they are not used
+// concurrently. An idle connection is only used with the lock of its pool held, and a checked
+// out one (and its statements) with the lock of its `SharedConnection` held.
+unsafe impl Send for Connection {}
+
+impl Connection {
+    fn connect(connection_string: &str) -> Result<Self> {
+        ENVIRONMENT
+            .connect_with_connection_string(connection_string)
+            .map(Self)
             .map_err(arrow2::error::Error::from_external_error)
-            .map_err(Error)?;
-        Ok(Self(connection))
     }
 
-    fn write(slf: PyRefMut<Self>, query: &str, chunk: PyRef<Chunk>) -> PyResult<()> {
-        let prepared = slf
-            .0
+    /// Returns whether `query` executes successfully on this connection
+    fn is_healthy(&self, query: &str) -> bool {
+        self.0.execute(query, ()).is_ok()
+    }
+}
+
+/// The file format (and its compression) of [`ODBCConnector::export`]
+enum ExportFormat {
+    Parquet(arrow2::io::parquet::write::CompressionOptions),
+    Arrow(Option<arrow2::io::ipc::write::Compression>),
+}
+
+/// The connections and counters of a [`Pool`]
+#[derive(Default)]
+struct PoolState {
+    idle: Vec<(Connection, Instant)>,
+    // number of open connections, idle or checked out
+    size: usize,
+    checkouts: usize,
+    waits: usize,
+    creations: usize,
+    discards: usize,
+    closed: bool,
+}
+
+/// A pool of connections to the same data source
+struct Pool {
+    connection_string: String,
+    min_size: usize,
+    max_size: usize,
+    idle_timeout: Option<Duration>,
+    health_check: Option<String>,
+    state: Mutex<PoolState>,
+    released: Condvar,
+}
+
+impl Pool {
+    fn lock(&self) -> MutexGuard<PoolState> {
+        self.state.lock().unwrap_or_else(|e| e.into_inner())
+    }
+
+    /// Removes idle connections that exceeded the idle timeout, keeping at least `min_size`
+    /// connections open. The removed connections are returned, to be closed (which blocks on
+    /// the data source) after the lock is released.
+    fn prune(&self, state: &mut PoolState) -> Vec<Connection> {
+        let idle_timeout = match self.idle_timeout {
+            Some(idle_timeout) => idle_timeout,
+            None => return vec![],
+        };
+        // idle connections are ordered by release time, oldest first
+        let mut expired = 0;
+        while state.size - expired > self.min_size
+            && state
+                .idle
+                .get(expired)
+                .map(|(_, released)| released.elapsed() > idle_timeout)
+                .unwrap_or(false)
+        {
+            expired += 1;
+        }
+        state.size -= expired;
+        state.discards += expired;
+        state
+            .idle
+            .drain(..expired)
+            .map(|(connection, _)| connection)
+            .collect()
+    }
+
+    /// Checks out a connection: an idle one that passes the health check, a new one if the
+    /// pool has less than `max_size` connections, or the first one released within `timeout`.
+    fn acquire(self: &Arc<Self>, timeout: Option<Duration>) -> Result<PooledConnection> {
+        let deadline = timeout.map(|timeout| Instant::now() + timeout);
+        let mut waited = false;
+        let mut state = self.lock();
+        loop {
+            if state.closed {
+                return Err(arrow2::error::Error::InvalidArgumentError(
+                    "The pool is closed".to_string(),
+                ));
+            }
+            let expired = self.prune(&mut state);
+            if !expired.is_empty() {
+                drop(state);
+                drop(expired);
+                state = self.lock();
+                continue;
+            }
+
+            if let Some((connection, _)) = state.idle.pop() {
+                drop(state);
+                let healthy = self
+                    .health_check
+                    .as_ref()
+                    .map(|query| connection.is_healthy(query))
+                    .unwrap_or(true);
+                if !healthy {
+                    drop(connection);
+                    state = self.lock();
+                    state.size -= 1;
+                    state.discards += 1;
+                    continue;
+                }
+                state = self.lock();
+                state.checkouts += 1;
+                return Ok(PooledConnection::new(connection, Some(self.clone())));
+            }
+
+            if state.size < self.max_size {
+                state.size += 1;
+                drop(state);
+                let connection = Connection::connect(&self.connection_string);
+                state = self.lock();
+                return match connection {
+                    Ok(connection) => {
+                        state.creations += 1;
+                        state.checkouts += 1;
+                        Ok(PooledConnection::new(connection, Some(self.clone())))
+                    }
+                    Err(e) => {
+                        state.size -= 1;
+                        self.released.notify_one();
+                        Err(e)
+                    }
+                };
+            }
+
+            if !waited {
+                waited = true;
+                state.waits += 1;
+            }
+            state = match deadline {
+                Some(deadline) => {
+                    let now = Instant::now();
+                    if now >= deadline {
+                        return Err(arrow2::error::Error::from_external_error(
+                            std::io::Error::new(
+                                std::io::ErrorKind::TimedOut,
+                                "Timed out waiting for a connection of the pool",
+                            ),
+                        ));
+                    }
+                    self.released
+                        .wait_timeout(state, deadline - now)
+                        .unwrap_or_else(|e| e.into_inner())
+                        .0
+                }
+                None => self.released.wait(state).unwrap_or_else(|e| e.into_inner()),
+            };
+        }
+    }
+
+    fn release(&self, connection: Connection) {
+        let mut state = self.lock();
+        let closed = if state.closed {
+            state.size -= 1;
+            vec![connection]
+        } else {
+            state.idle.push((connection, Instant::now()));
+            self.prune(&mut state)
+        };
+        drop(state);
+        self.released.notify_one();
+        drop(closed);
+    }
+}
+
+/// A connection, returned to its pool (if any) when dropped, i.e. when its connector and all
+/// the cursors executed on it were dropped
+struct PooledConnection {
+    connection: Option<Connection>,
+    pool: Option<Arc<Pool>>,
+}
+
+impl PooledConnection {
+    fn new(connection: Connection, pool: Option<Arc<Pool>>) -> Self {
+        Self {
+            connection: Some(connection),
+            pool,
+        }
+    }
+}
+
+impl Deref for PooledConnection {
+    type Target = odbc::api::Connection<'static>;
+
+    fn deref(&self) -> &Self::Target {
+        &self.connection.as_ref().expect("only taken on drop").0
+    }
+}
+
+impl Drop for PooledConnection {
+    fn drop(&mut self) {
+        if let (Some(connection), Some(pool)) = (self.connection.take(), self.pool.as_ref()) {
+            pool.release(connection);
+        }
+    }
+}
+
+/// A checked out connection, shared by its connector and the cursors executed on it, so that
+/// it is returned to its pool only once all of them were dropped. It is only used with its
+/// lock held, which is never taken with the GIL held.
+#[derive(Clone)]
+struct SharedConnection(Arc<Mutex<PooledConnection>>);
+
+impl SharedConnection {
+    fn new(connection: PooledConnection) -> Self {
+        Self(Arc::new(Mutex::new(connection)))
+    }
+
+    fn lock(&self) -> MutexGuard<PooledConnection> {
+        self.0.lock().unwrap_or_else(|e| e.into_inner())
+    }
+}
+
+#[pyclass]
+pub struct ODBCConnector(SharedConnection, asyncio::Tasks);
+
+impl ODBCConnector {
+    fn write_chunk(&self, query: &str, chunk: &_Chunk<Box<dyn Array>>) -> Result<()> {
+        let connection = self.0.lock();
+        let prepared = connection
             .prepare(query)
-            .map_err(arrow2::error::Error::from_external_error)
-            .map_err(Error)?;
+            .map_err(arrow2::error::Error::from_external_error)?;
 
         let fields = chunk
-            .0
             .arrays()
             .iter()
             .map(|array| _Field::new("unused", array.data_type().clone(), array.null_count() > 0))
             .collect::<Vec<_>>();
 
-        let mut writer = odbc::write::Writer::try_new(prepared, fields).map_err(Error)?;
+        let mut writer = odbc::write::Writer::try_new(prepared, fields)?;
 
-        writer.write(&chunk.0).map_err(Error)?;
-        Ok(())
+        writer.write(chunk)
     }
 
-    fn execute(
+    fn execute_query(
+        &self,
+        query: &str,
+        batch_size: Option<usize>,
+        prefetch: usize,
+    ) -> Result<Option<ODBCIterator>> {
+        let maybe_cursor = odbc::read::execute(&**self.0.lock(), query, (), batch_size)?;
+
+        Ok(maybe_cursor.map(|cursor| {
+            let fields = cursor.fields().to_vec();
+            let batches = Batches {
+                cursor: Some(Cursor(cursor)),
+                connection: self.0.clone(),
+            };
+            let batches = Chunks::new(batches, prefetch, DEFAULT_PREFETCH_BYTES);
+            ODBCIterator(batches, fields, asyncio::Tasks::default())
+        }))
+    }
+}
+
+#[pymethods]
+impl ODBCConnector {
+    #[new]
+    fn new(connection_string: String) -> PyResult<Self> {
+        let connection = Connection::connect(&connection_string).map_err(Error)?;
+        let connection = SharedConnection::new(PooledConnection::new(connection, None));
+        Ok(Self(connection, asyncio::Tasks::default()))
+    }
+
+    fn write(slf: PyRef<Self>, py: Python, query: &str, chunk: PyRef<Chunk>) -> PyResult<()> {
+        let connector = &*slf;
+        let chunk = &chunk.0;
+        // the connection is locked without the GIL
+        let result = py.allow_threads(|| connector.write_chunk(query, chunk));
+        Ok(result.map_err(Error)?)
+    }
+
+    /// Writes an iterable of chunks with `query`, prepared once and executed with the same
+    /// parameter buffers for every chunk. Chunks are executed in slices of up to `batch_size`
+    /// rows. When `commit_every` is set, executions are grouped in transactions of
+    /// `commit_every` executions. Returns the number of rows written.
+    #[args(batch_size = "None", commit_every = "None")]
+    fn write_many(
+        slf: PyRef<Self>,
+        py: Python,
+        query: &str,
+        chunks: &PyAny,
+        batch_size: Option<usize>,
+        commit_every: Option<usize>,
+    ) -> PyResult<usize> {
+        if batch_size == Some(0) || commit_every == Some(0) {
+            return Err(PyValueError::new_err(
+                "batch_size and commit_every must be positive",
+            ));
+        }
+        // `chunks` may use this connector
+        let connection = slf.0.clone();
+        drop(slf);
+        let external = arrow2::error::Error::from_external_error;
+
+        if commit_every.is_some() {
+            py.allow_threads(|| connection.lock().set_autocommit(false).map_err(external))
+                .map_err(Error)?;
+        }
+
+        // the connection is only locked while executing: `chunks` may read from it
+        let mut statement: Option<Statement> = None;
+        let mut data_types = vec![];
+        let mut rows = 0;
+        let mut executions = 0;
+        let result = chunks.iter().and_then(|chunks| {
+            for (index, chunk) in chunks.enumerate() {
+                let chunk = chunk?.extract::<PyRef<Chunk>>()?.0.clone();
+                let chunk_types = chunk
+                    .arrays()
+                    .iter()
+                    .map(|array| array.data_type().clone())
+                    .collect::<Vec<_>>();
+                if statement.is_some() && chunk_types != data_types {
+                    // the parameter buffers were bound for the types of the first chunk
+                    return Err(PyValueError::new_err(format!(
+                        "All chunks must have the data types of the first chunk, {:?}, but chunk {} has {:?}",
+                        data_types, index, chunk_types
+                    )));
+                }
+
+                if statement.is_none() {
+                    // later chunks may have nulls
+                    let fields = chunk_types
+                        .iter()
+                        .map(|data_type| _Field::new("unused", data_type.clone(), true))
+                        .collect::<Vec<_>>();
+                    let prepared = py
+                        .allow_threads(|| Statement::prepare(&connection, query, fields))
+                        .map_err(Error)?;
+                    statement = Some(prepared);
+                    data_types = chunk_types;
+                }
+                let statement = statement.as_mut().expect("prepared above");
+
+                let (executions, rows) = (&mut executions, &mut rows);
+                // executing does not need the GIL
+                py.allow_threads(move || -> Result<()> {
+                    let connection = statement.connection.lock();
+                    let writer = &mut statement.writer.as_mut().expect("dropped only once").0;
+                    let length = chunk.len();
+                    let batch_size = batch_size.unwrap_or(length).max(1);
+                    for offset in (0..length).step_by(batch_size) {
+                        let slice = slice_chunk(&chunk, offset, batch_size.min(length - offset));
+                        writer.write(&slice)?;
+                        *rows += slice.len();
+                        *executions += 1;
+                        if commit_every.map(|every| *executions % every == 0).unwrap_or(false) {
+                            connection.commit().map_err(external)?;
+                        }
+                    }
+                    Ok(())
+                })
+                .map_err(Error)?;
+            }
+            Ok(rows)
+        });
+        drop(statement);
+
+        if commit_every.is_some() {
+            let ok = result.is_ok();
+            py.allow_threads(|| {
+                let connection = connection.lock();
+                let end = if ok {
+                    connection.commit()
+                } else {
+                    connection.rollback()
+                };
+                end.and_then(|_| connection.set_autocommit(true))
+                    .map_err(external)
+            })
+            .map_err(Error)?;
+        }
+        result
+    }
+
+    /// Executes `query` and writes its result into `sink` (a path or a file-like object) as a
+    /// `"parquet"` or `"arrow"` file. Returns the number of rows and of bytes written.
+    ///
+    /// Batches of `batch_size` rows are fetched and converted on a background thread while
+    /// previous batches are rechunked into row groups (or record batches) of `row_group_size`
+    /// rows, encoded and compressed without the GIL.
+    #[args(
+        format = "\"parquet\"",
+        batch_size = "8192",
+        row_group_size = "128 * 1024",
+        compression = "None"
+    )]
+    fn export(
+        mut slf: PyRefMut<Self>,
+        py: Python,
+        query: &str,
+        sink: PyObject,
+        format: &str,
+        batch_size: usize,
+        row_group_size: usize,
+        compression: Option<&str>,
+    ) -> PyResult<(usize, u64)> {
+        if batch_size == 0 || row_group_size == 0 {
+            return Err(PyValueError::new_err(
+                "batch_size and row_group_size must be positive",
+            ));
+        }
+        let format = match format {
+            "parquet" => ExportFormat::Parquet(parquet::compression(
+                compression.unwrap_or("zstd"),
+                None,
+            )?),
+            "arrow" | "ipc" => ExportFormat::Arrow(ipc::compression(compression)?),
+            other => {
+                return Err(PyValueError::new_err(format!(
+                    "Export format \"{}\" is not supported",
+                    other
+                )))
+            }
+        };
+        let mut writer = file_like::SharedWriter::new(file_like::FileWriter::from_pyobject(
+            sink,
+            file_like::DEFAULT_WRITE_BUFFER_SIZE,
+        )?);
+
+        let connector = &mut *slf;
+        let sink = writer.clone();
+        let mut rows = 0;
+        // file-like sinks re-acquire the GIL when their buffer is flushed
+        py.allow_threads(|| -> PyResult<()> {
+            let ODBCIterator(batches, fields, _) = connector
+                .execute_query(query, Some(batch_size), 2)
+                .map_err(Error)?
+                .ok_or_else(|| PyValueError::new_err("The query does not return rows"))?;
+
+            let batches = batches.inspect(|batch| {
+                if let Ok(batch) = batch {
+                    rows += batch.len();
+                }
+            });
+            let chunks = Rechunk::new(batches, Some(row_group_size), None);
+            let schema = _Schema::from(fields);
+            match format {
+                ExportFormat::Parquet(compression) => {
+                    parquet::write_file(sink, schema, chunks, compression)
+                }
+                ExportFormat::Arrow(compression) => {
+                    ipc::write_file(sink, &schema, chunks, compression)
+                }
+            }
+            .map_err(Error)?;
+            Ok(())
+        })?;
+        writer.flush()?;
+
+        Ok((rows, writer.bytes_written()))
+    }
+
+    /// Returns an `asyncio.Future` that completes once `chunk` was written, on a native
+    /// thread without the GIL
+    fn write_async(
         slf: PyRef<Self>,
+        py: Python,
+        query: String,
+        chunk: PyRef<Chunk>,
+    ) -> PyResult<PyObject> {
+        let chunk = chunk.0.clone();
+        let tasks = slf.1.clone();
+        asyncio::spawn_with(py, &tasks, slf.into(), move |connector: &mut Self| {
+            Ok(connector.write_chunk(&query, &chunk).map_err(Error)?)
+        })
+    }
+
+    #[args(batch_size = "None", prefetch = "0")]
+    fn execute(
+        mut slf: PyRefMut<Self>,
         query: &str,
         batch_size: Option<usize>,
+        prefetch: usize,
     ) -> PyResult<Option<ODBCIterator>> {
-        let maybe_cursor = odbc::read::execute(&slf.0, query, (), batch_size).map_err(Error)?;
+        let py = slf.py();
+        let connector = &mut *slf;
+        // executing the query does not need the GIL
+        let iterator = py.allow_threads(|| connector.execute_query(query, batch_size, prefetch));
+        Ok(iterator.map_err(Error)?)
+    }
+
+    /// Returns an `asyncio.Future` of the result of `execute`, executed on a native thread
+    /// without the GIL
+    #[args(batch_size = "None", prefetch = "0")]
+    fn execute_async(
+        slf: PyRef<Self>,
+        py: Python,
+        query: String,
+        batch_size: Option<usize>,
+        prefetch: usize,
+    ) -> PyResult<PyObject> {
+        let tasks = slf.1.clone();
+        asyncio::spawn_with(py, &tasks, slf.into(), move |connector: &mut Self| {
+            Ok(connector
+                .execute_query(&query, batch_size, prefetch)
+                .map_err(Error)?)
+        })
+    }
+}
+
+/// A cursor of a [`SharedConnection`]
+struct Cursor(odbc::read::ChunkIterator<'static>);
+
+// Safety: see `Connection`; `Batches` only uses and frees the cursor with the lock of its
+// connection held
+unsafe impl Send for Cursor {}
+
+/// The batches of a cursor, as chunks. The cursor keeps its connection checked out.
+pub struct Batches {
+    cursor: Option<Cursor>,
+    connection: SharedConnection,
+}
+
+impl Iterator for Batches {
+    type Item = Result<_Chunk<Box<dyn Array>>>;
+
+    fn next(&mut self) -> Option<Self::Item> {
+        let _connection = self.connection.lock();
+        let cursor = &mut self.cursor.as_mut()?.0;
+        cursor.next().map(|chunk| {
+            chunk.map(|chunk| {
+                _Chunk::new(
+                    chunk
+                        .into_arrays()
+                        .into_iter()
+                        .map(|array| array.into())
+                        .collect(),
+                )
+            })
+        })
+    }
+}
 
-        Ok(maybe_cursor.map(ODBCIterator))
+impl Drop for Batches {
+    fn drop(&mut self) {
+        let (cursor, connection) = (self.cursor.take(), &self.connection);
+        without_gil(move || {
+            let _connection = connection.lock();
+            drop(cursor);
+        });
     }
 }
 
-#[pyclass(unsendable)]
-pub struct ODBCIterator(pub odbc::read::ChunkIterator<'static>);
+/// The prepared statement and parameter buffers of [`ODBCConnector::write_many`]
+struct Writer(odbc::write::Writer<'static>);
+
+// Safety: see `Connection`; `Statement` is only used and freed with the lock of its connection
+// held
+unsafe impl Send for Writer {}
+
+/// A statement prepared on a connection, that keeps the connection checked out
+struct Statement {
+    writer: Option<Writer>,
+    connection: SharedConnection,
+}
+
+impl Statement {
+    fn prepare(connection: &SharedConnection, query: &str, fields: Vec<_Field>) -> Result<Self> {
+        let writer = {
+            let locked = connection.lock();
+            let prepared = locked
+                .prepare(query)
+                .map_err(arrow2::error::Error::from_external_error)?;
+            odbc::write::Writer::try_new(prepared, fields)?
+        };
+        Ok(Self {
+            writer: Some(Writer(writer)),
+            connection: connection.clone(),
+        })
+    }
+}
+
+impl Drop for Statement {
+    fn drop(&mut self) {
+        let (writer, connection) = (self.writer.take(), &self.connection);
+        without_gil(move || {
+            let _connection = connection.lock();
+            drop(writer);
+        });
+    }
+}
+
+#[pyclass]
+pub struct ODBCIterator(Chunks<Batches>, Vec<_Field>, asyncio::Tasks);
 
 #[pymethods]
 impl ODBCIterator {
     fn fields(slf: PyRef<Self>) -> Vec<Field> {
-        slf.0.fields().iter().cloned().map(Field).collect()
+        slf.1.iter().cloned().map(Field).collect()
     }
 
     fn __next__(mut slf: PyRefMut<Self>) -> PyResult<Option<Chunk>> {
-        Ok(slf
-            .0
-            .next()
-            .transpose()
-            .map_err(Error)?
-            .map(|chunk| {
-                chunk
-                    .into_arrays()
-                    .into_iter()
-                    .map(|array| array.into())
-                    .collect()
+        let py = slf.py();
+        let batches = &mut slf.0;
+        // fetching from the database does not need the GIL
+        let chunk = py.allow_threads(|| batches.next()).transpose().map_err(Error)?;
+        Ok(chunk.map(Chunk))
+    }
+
+    /// Returns an `asyncio.Future` of the next chunk (or `None` when exhausted), fetched on a
+    /// native thread without the GIL
+    fn next_async(slf: PyRef<Self>, py: Python) -> PyResult<PyObject> {
+        let tasks = slf.2.clone();
+        asyncio::spawn_with(py, &tasks, slf.into(), |iterator: &mut Self| {
+            Ok(iterator.0.next().transpose().map_err(Error)?.map(Chunk))
+        })
+    }
+}
+
+fn duration(seconds: f64) -> PyResult<Duration> {
+    if seconds.is_finite() && seconds >= 0.0 {
+        Ok(Duration::from_secs_f64(seconds))
+    } else {
+        Err(PyValueError::new_err(format!(
+            "A duration must be a non-negative number of seconds (got {})",
+            seconds
+        )))
+    }
+}
+
+/// A pool of ODBC connections to the same data source, that can be shared between threads
+#[pyclass]
+pub struct ODBCPool(Arc<Pool>);
+
+#[pymethods]
+impl ODBCPool {
+    #[new]
+    #[args(min_size = "0", max_size = "10", idle_timeout = "None", health_check = "None")]
+    fn new(
+        py: Python,
+        connection_string: String,
+        min_size: usize,
+        max_size: usize,
+        idle_timeout: Option<f64>,
+        health_check: Option<String>,
+    ) -> PyResult<Self> {
+        if max_size == 0 || min_size > max_size {
+            return Err(PyValueError::new_err(format!(
+                "The pool sizes must satisfy 0 <= min_size <= max_size and max_size > 0 (got {} and {})",
+                min_size, max_size
+            )));
+        }
+        let idle_timeout = idle_timeout.map(duration).transpose()?;
+
+        // the first `min_size` connections are opened eagerly
+        let idle = py
+            .allow_threads(|| {
+                (0..min_size)
+                    .map(|_| Connection::connect(&connection_string).map(|c| (c, Instant::now())))
+                    .collect::<Result<Vec<_>>>()
             })
-            .map(_Chunk::new)
-            .map(Chunk))
+            .map_err(Error)?;
+        let state = PoolState {
+            size: idle.len(),
+            creations: idle.len(),
+            idle,
+            ..Default::default()
+        };
+
+        Ok(Self(Arc::new(Pool {
+            connection_string,
+            min_size,
+            max_size,
+            idle_timeout,
+            health_check,
+            state: Mutex::new(state),
+            released: Condvar::new(),
+        })))
+    }
+
+    /// Checks out a connection, waiting up to `timeout` seconds (forever when `None`) for one
+    /// to be released when the pool is at `max_size`. The connection is returned to the pool
+    /// when the connector and the cursors executed on it are dropped.
+    #[args(timeout = "None")]
+    fn connection(slf: PyRef<Self>, py: Python, timeout: Option<f64>) -> PyResult<ODBCConnector> {
+        let timeout = timeout.map(duration).transpose()?;
+        let pool = slf.0.clone();
+        let connection = py.allow_threads(|| pool.acquire(timeout));
+        let connection = SharedConnection::new(connection.map_err(Error)?);
+        Ok(ODBCConnector(connection, asyncio::Tasks::default()))
+    }
+
+    /// Returns the counters of the pool
+    fn stats(slf: PyRef<Self>) -> HashMap<&'static str, usize> {
+        let state = slf.0.lock();
+        HashMap::from([
+            ("size", state.size),
+            ("idle", state.idle.len()),
+            ("checkouts", state.checkouts),
+            ("waits", state.waits),
+            ("creations", state.creations),
+            ("discards", state.discards),
+        ])
+    }
+
+    /// Closes the idle connections and the checked out ones once they are released
+    fn close(slf: PyRef<Self>) {
+        let mut state = slf.0.lock();
+        state.closed = true;
+        let idle = std::mem::take(&mut state.idle);
+        state.size -= idle.len();
+        drop(state);
+        slf.0.released.notify_all();
     }
 }
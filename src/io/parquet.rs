@@ -1,36 +1,239 @@
+use std::collections::{HashMap, VecDeque};
+
+use pyo3::exceptions::{PyIndexError, PyKeyError, PyValueError};
 use pyo3::prelude::*;
+use rayon::prelude::*;
 
+use arrow2::array::Array;
+use arrow2::chunk::Chunk as _Chunk;
+use arrow2::compute::cast;
+use arrow2::datatypes::{DataType, IntegerType, Schema as _Schema};
+use arrow2::error::Result;
 use arrow2::io::parquet;
+use arrow2::io::parquet::read::{ArrayIter, ParquetError, RowGroupMetaData};
 
+use super::super::asyncio;
+use super::super::c_data;
 use super::super::datatypes::Schema;
 use super::super::file_like;
-use super::super::Chunk;
+use super::super::{slice_chunk, Chunk};
 use super::super::Error;
+use super::predicate::{self, Predicate};
+use super::prefetch::{Chunks, DEFAULT_PREFETCH_BYTES};
+
+/// An iterator of [`_Chunk`], one per row group, that decodes the columns of each row group
+/// on a thread pool when one is provided.
+pub struct RowGroupReader {
+    reader: file_like::FileReader,
+    row_groups: VecDeque<RowGroupMetaData>,
+    schema: _Schema,
+    pool: Option<rayon::ThreadPool>,
+    // number of rows to skip from the first row group
+    offset: usize,
+    // maximum number of rows still to be yielded
+    remaining: Option<usize>,
+}
+
+impl RowGroupReader {
+    fn new(
+        reader: file_like::FileReader,
+        row_groups: Vec<RowGroupMetaData>,
+        schema: _Schema,
+        pool: Option<rayon::ThreadPool>,
+        offset: usize,
+        limit: Option<usize>,
+    ) -> Self {
+        // skip whole row groups using their number of rows
+        let mut offset = offset;
+        let row_groups = row_groups
+            .into_iter()
+            .skip_while(|row_group| {
+                let skip = offset >= row_group.num_rows();
+                if skip {
+                    offset -= row_group.num_rows();
+                }
+                skip
+            })
+            .collect();
+
+        Self {
+            reader,
+            row_groups,
+            schema,
+            pool,
+            offset,
+            remaining: limit,
+        }
+    }
+
+    fn read_row_group(&mut self, row_group: &RowGroupMetaData) -> Result<_Chunk<Box<dyn Array>>> {
+        // IO-bounded: read the column chunks into memory
+        let columns = parquet::read::read_columns_many(
+            &mut self.reader,
+            row_group,
+            self.schema.fields.clone(),
+            None,
+            // rows past the requested window are not decoded
+            self.remaining.map(|remaining| self.offset + remaining),
+            None,
+        )?;
+
+        // CPU-bounded: decompress and deserialize them
+        let arrays = match &self.pool {
+            Some(pool) => pool.install(|| {
+                columns
+                    .into_par_iter()
+                    .map(deserialize)
+                    .collect::<Result<Vec<_>>>()
+            }),
+            None => columns.into_iter().map(deserialize).collect(),
+        }?;
+        _Chunk::try_new(arrays)
+    }
+}
+
+/// Deserializes a column chunk into a single array
+fn deserialize(mut column: ArrayIter<'static>) -> Result<Box<dyn Array>> {
+    column.next().unwrap_or_else(|| {
+        Err(arrow2::error::Error::OutOfSpec(
+            "A column chunk must contain at least one array".to_string(),
+        ))
+    })
+}
+
+impl Iterator for RowGroupReader {
+    type Item = Result<_Chunk<Box<dyn Array>>>;
+
+    fn next(&mut self) -> Option<Self::Item> {
+        if self.remaining == Some(0) {
+            return None;
+        }
+        let row_group = loop {
+            let row_group = self.row_groups.pop_front()?;
+            if row_group.num_rows() > 0 {
+                break row_group;
+            }
+        };
+        let chunk = match self.read_row_group(&row_group) {
+            Ok(chunk) => chunk,
+            Err(e) => return Some(Err(e)),
+        };
+
+        let offset = std::mem::take(&mut self.offset);
+        let length = (chunk.len() - offset).min(self.remaining.unwrap_or(usize::MAX));
+        if let Some(remaining) = self.remaining.as_mut() {
+            *remaining -= length;
+        }
+        if offset == 0 && length == chunk.len() {
+            Some(Ok(chunk))
+        } else {
+            Some(Ok(slice_chunk(&chunk, offset, length)))
+        }
+    }
+}
+
+/// Returns the fields of `schema` selected by `columns`, a list of names or of indices.
+fn project(schema: _Schema, columns: &PyAny) -> PyResult<_Schema> {
+    let indices = if let Ok(indices) = columns.extract::<Vec<usize>>() {
+        indices
+    } else {
+        columns
+            .extract::<Vec<&str>>()?
+            .into_iter()
+            .map(|name| {
+                schema
+                    .fields
+                    .iter()
+                    .position(|field| field.name == name)
+                    .ok_or_else(|| PyKeyError::new_err(format!("Column \"{}\" does not exist", name)))
+            })
+            .collect::<PyResult<Vec<_>>>()?
+    };
+
+    let fields = indices
+        .into_iter()
+        .map(|index| {
+            schema.fields.get(index).cloned().ok_or_else(|| {
+                PyIndexError::new_err(format!(
+                    "Column index {} is out of bounds for a schema with {} fields",
+                    index,
+                    schema.fields.len()
+                ))
+            })
+        })
+        .collect::<PyResult<Vec<_>>>()?;
+
+    Ok(_Schema {
+        fields,
+        metadata: schema.metadata,
+    })
+}
 
 #[pyclass]
-pub struct ParquetFileReader(parquet::read::FileReader<file_like::FileReader>, Schema);
+pub struct ParquetFileReader(Chunks<RowGroupReader>, Schema, asyncio::Tasks);
 
 #[pymethods]
 impl ParquetFileReader {
     #[new]
-    fn new(obj: PyObject) -> PyResult<Self> {
-        let mut reader = file_like::FileReader::from_pyobject(obj)?;
+    #[args(
+        num_threads = "1",
+        columns = "None",
+        filters = "None",
+        limit = "None",
+        offset = "0",
+        buffer_size = "file_like::DEFAULT_BUFFER_SIZE",
+        prefetch = "0",
+        prefetch_bytes = "DEFAULT_PREFETCH_BYTES"
+    )]
+    fn new(
+        obj: PyObject,
+        num_threads: usize,
+        columns: Option<&PyAny>,
+        filters: Option<Vec<(&str, &str, &PyAny)>>,
+        limit: Option<usize>,
+        offset: usize,
+        buffer_size: usize,
+        prefetch: usize,
+        prefetch_bytes: usize,
+    ) -> PyResult<Self> {
+        let mut reader = file_like::FileReader::from_pyobject(obj, buffer_size)?;
 
         let metadata = parquet::read::read_metadata(&mut reader).map_err(Error)?;
         let schema = parquet::read::infer_schema(&metadata).map_err(Error)?;
 
-        let reader = parquet::read::FileReader::new(
-            reader,
-            metadata.row_groups,
-            schema.clone(),
-            None,
-            None,
-            None,
-        );
+        let row_groups = match filters {
+            Some(filters) => {
+                let predicates = filters
+                    .into_iter()
+                    .map(|(column, op, value)| Predicate::try_new(column, op, value, &schema))
+                    .collect::<PyResult<Vec<_>>>()?;
+                predicate::prune(metadata.row_groups, &schema, &predicates)?
+            }
+            None => metadata.row_groups,
+        };
+
+        let schema = match columns {
+            Some(columns) => project(schema, columns)?,
+            None => schema,
+        };
+
+        let pool = if num_threads > 1 {
+            let pool = rayon::ThreadPoolBuilder::new()
+                .num_threads(num_threads)
+                .build()
+                .map_err(arrow2::error::Error::from_external_error)
+                .map_err(Error)?;
+            Some(pool)
+        } else {
+            None
+        };
+
+        let reader = RowGroupReader::new(reader, row_groups, schema.clone(), pool, offset, limit);
+        let reader = Chunks::new(reader, prefetch, prefetch_bytes);
 
         let schema = Schema(schema);
 
-        Ok(Self(reader, schema))
+        Ok(Self(reader, schema, asyncio::Tasks::default()))
     }
 
     fn schema(slf: PyRef<Self>) -> Schema {
@@ -42,52 +245,357 @@ impl ParquetFileReader {
     }
 
     fn __next__(mut slf: PyRefMut<Self>) -> PyResult<Option<Chunk>> {
-        let chunk = slf.0.next().transpose().map_err(Error)?;
+        let py = slf.py();
+        let reader = &mut slf.0;
+        // decoding does not need the GIL; file-like objects re-acquire it on every call
+        let chunk = py.allow_threads(|| reader.next()).transpose().map_err(Error)?;
         Ok(chunk.map(Chunk))
     }
+
+    /// Returns an `asyncio.Future` of the next chunk (or `None` when exhausted), read and
+    /// decoded on a native thread without the GIL
+    fn next_async(slf: PyRef<Self>, py: Python) -> PyResult<PyObject> {
+        let tasks = slf.2.clone();
+        asyncio::spawn_with(py, &tasks, slf.into(), |reader: &mut Self| {
+            Ok(reader.0.next().transpose().map_err(Error)?.map(Chunk))
+        })
+    }
+
+    /// Exports the remaining chunks through the Arrow C stream interface. Reading the stream
+    /// advances this reader.
+    fn __arrow_c_stream__(
+        slf: PyRef<Self>,
+        py: Python,
+        requested_schema: Option<PyObject>,
+    ) -> PyResult<PyObject> {
+        let _ = requested_schema;
+        let schema = slf.1 .0.clone();
+        let reader: Py<Self> = slf.into();
+        let chunks = std::iter::from_fn(move || {
+            Python::with_gil(|py| match reader.try_borrow_mut(py) {
+                Ok(mut reader) => {
+                    let reader = &mut reader.0;
+                    py.allow_threads(|| reader.next())
+                }
+                Err(e) => Some(Err(arrow2::error::Error::InvalidArgumentError(e.to_string()))),
+            })
+        });
+        c_data::export_chunks(py, chunks, &schema)
+    }
+}
+
+/// Returns the [`parquet::write::CompressionOptions`] of the codec named `name`
+pub(super) fn compression(
+    name: &str,
+    level: Option<i32>,
+) -> PyResult<parquet::write::CompressionOptions> {
+    use parquet::write::{BrotliLevel, CompressionOptions, GzipLevel, ZstdLevel};
+
+    // levels are validated as given: casting them first would wrap out of range values
+    let invalid = |level: i32| {
+        PyValueError::new_err(format!(
+            "Compression level {} is not valid for \"{}\"",
+            level, name
+        ))
+    };
+    Ok(match name {
+        "uncompressed" => CompressionOptions::Uncompressed,
+        "snappy" => CompressionOptions::Snappy,
+        "lz4" => CompressionOptions::Lz4Raw,
+        "gzip" => CompressionOptions::Gzip(
+            level
+                .map(|level| {
+                    u8::try_from(level)
+                        .ok()
+                        .and_then(|x| GzipLevel::try_new(x).ok())
+                        .ok_or_else(|| invalid(level))
+                })
+                .transpose()?,
+        ),
+        "brotli" => CompressionOptions::Brotli(
+            level
+                .map(|level| {
+                    u32::try_from(level)
+                        .ok()
+                        .and_then(|x| BrotliLevel::try_new(x).ok())
+                        .ok_or_else(|| invalid(level))
+                })
+                .transpose()?,
+        ),
+        "zstd" => CompressionOptions::Zstd(
+            level
+                .map(|level| ZstdLevel::try_new(level).map_err(|_| invalid(level)))
+                .transpose()?,
+        ),
+        other => {
+            return Err(PyValueError::new_err(format!(
+                "Compression \"{}\" is not supported",
+                other
+            )))
+        }
+    })
+}
+
+/// How a column is encoded
+#[derive(Debug, Clone, Copy, PartialEq)]
+enum ColumnEncoding {
+    Plain,
+    Dictionary,
+    DeltaBinaryPacked,
+    DeltaLengthByteArray,
+}
+
+impl ColumnEncoding {
+    fn try_new(name: &str) -> PyResult<Self> {
+        Ok(match name {
+            "plain" => Self::Plain,
+            "dictionary" | "rle_dictionary" => Self::Dictionary,
+            "delta_binary_packed" => Self::DeltaBinaryPacked,
+            "delta_length_byte_array" => Self::DeltaLengthByteArray,
+            other => {
+                return Err(PyValueError::new_err(format!(
+                    "Encoding \"{}\" is not supported",
+                    other
+                )))
+            }
+        })
+    }
+
+    fn encoding(&self) -> parquet::write::Encoding {
+        match self {
+            Self::Plain => parquet::write::Encoding::Plain,
+            Self::Dictionary => parquet::write::Encoding::RleDictionary,
+            Self::DeltaBinaryPacked => parquet::write::Encoding::DeltaBinaryPacked,
+            Self::DeltaLengthByteArray => parquet::write::Encoding::DeltaLengthByteArray,
+        }
+    }
+}
+
+/// The write options of a (top-level) column
+#[derive(Debug, Clone, Copy)]
+struct Column {
+    encoding: ColumnEncoding,
+    options: parquet::write::WriteOptions,
+}
+
+impl Column {
+    /// Encodes `array` into its parquet columns (one per leaf)
+    fn encode(
+        &self,
+        array: &dyn Array,
+        type_: parquet::write::ParquetType,
+    ) -> Result<Vec<parquet::write::DynIter<'static, Result<parquet::write::EncodedPage>>>> {
+        let array = if self.encoding == ColumnEncoding::Dictionary {
+            // dictionary-encoded pages are written from dictionary arrays
+            let data_type = DataType::Dictionary(
+                IntegerType::UInt32,
+                Box::new(array.data_type().clone()),
+                false,
+            );
+            cast::cast(array, &data_type, Default::default())?
+        } else {
+            array.to_boxed()
+        };
+        let encodings =
+            parquet::write::transverse(array.data_type(), |_| self.encoding.encoding());
+        parquet::write::array_to_columns(array, type_, self.options, &encodings)
+    }
+}
+
+/// Returns an iterator of compressed columns of `chunk`, each encoded and compressed according
+/// to its [`Column`]
+fn row_group_iter(
+    chunk: &_Chunk<Box<dyn Array>>,
+    fields: Vec<parquet::write::ParquetType>,
+    columns: &[Column],
+) -> Result<parquet::write::RowGroupIter<'static, arrow2::error::Error>> {
+    use parquet::write::{Compressor, DynIter, DynStreamingIterator, FallibleStreamingIterator};
+
+    let encoded = chunk
+        .arrays()
+        .iter()
+        .zip(fields)
+        .zip(columns)
+        .map(|((array, type_), column)| {
+            column
+                .encode(array.as_ref(), type_)
+                .map(|encoded| (encoded, column.options.compression))
+        })
+        .collect::<Result<Vec<_>>>()?;
+
+    Ok(DynIter::new(encoded.into_iter().flat_map(
+        |(encoded_columns, compression)| {
+            encoded_columns.into_iter().map(move |encoded_pages| {
+                let pages = DynIter::new(
+                    encoded_pages
+                        .into_iter()
+                        .map(|x| x.map_err(|e| ParquetError::OutOfSpec(e.to_string()))),
+                );
+                let compressed_pages = Compressor::new(pages, compression, vec![])
+                    .map_err(arrow2::error::Error::from);
+                Ok(DynStreamingIterator::new(compressed_pages))
+            })
+        },
+    )))
+}
+
+/// Writes `chunks` into `writer` as a parquet file of `schema`, one row group per chunk, with
+/// plain-encoded columns compressed with `compression`
+pub(super) fn write_file<W, I>(
+    writer: W,
+    schema: _Schema,
+    chunks: I,
+    compression: parquet::write::CompressionOptions,
+) -> Result<()>
+where
+    W: std::io::Write,
+    I: Iterator<Item = Result<_Chunk<Box<dyn Array>>>>,
+{
+    let options = parquet::write::WriteOptions {
+        version: parquet::write::Version::V2,
+        write_statistics: true,
+        compression,
+        data_pagesize_limit: None,
+    };
+    let columns = vec![
+        Column {
+            encoding: ColumnEncoding::Plain,
+            options,
+        };
+        schema.fields.len()
+    ];
+
+    let mut writer = parquet::write::FileWriter::try_new(writer, schema, options)?;
+    let fields = writer.parquet_schema().fields().to_vec();
+    for chunk in chunks {
+        writer.write(row_group_iter(&chunk?, fields.clone(), &columns)?)?;
+    }
+    writer.end(None)?;
+    Ok(())
 }
 
 #[pyclass]
-pub struct ParquetFileWriter(parquet::write::FileWriter<file_like::FileWriter>);
+pub struct ParquetFileWriter(
+    parquet::write::FileWriter<file_like::SharedWriter>,
+    Vec<Column>,
+    file_like::SharedWriter,
+    asyncio::Tasks,
+);
+
+impl ParquetFileWriter {
+    fn write_chunk(&mut self, chunk: &_Chunk<Box<dyn Array>>) -> Result<()> {
+        let fields = self.0.parquet_schema().fields().to_vec();
+        let row_group = row_group_iter(chunk, fields, &self.1)?;
+        self.0.write(row_group)
+    }
+}
 
 #[pymethods]
 impl ParquetFileWriter {
     #[new]
-    fn new(obj: PyObject, schema: Schema) -> PyResult<Self> {
-        let writer = file_like::FileWriter::from_pyobject(obj)?;
+    #[args(
+        compression = "\"zstd\"",
+        compression_level = "None",
+        encodings = "None",
+        column_compression = "None",
+        data_page_size = "None",
+        version = "2",
+        buffer_size = "file_like::DEFAULT_WRITE_BUFFER_SIZE"
+    )]
+    fn new(
+        obj: PyObject,
+        schema: Schema,
+        compression: &str,
+        compression_level: Option<i32>,
+        encodings: Option<HashMap<String, String>>,
+        column_compression: Option<HashMap<String, (String, Option<i32>)>>,
+        data_page_size: Option<usize>,
+        version: u8,
+        buffer_size: usize,
+    ) -> PyResult<Self> {
+        let version = match version {
+            1 => parquet::write::Version::V1,
+            2 => parquet::write::Version::V2,
+            other => {
+                return Err(PyValueError::new_err(format!(
+                    "Parquet data page version must be 1 or 2 (got {})",
+                    other
+                )))
+            }
+        };
+        let options = parquet::write::WriteOptions {
+            version,
+            write_statistics: true,
+            compression: self::compression(compression, compression_level)?,
+            data_pagesize_limit: data_page_size,
+        };
 
-        let reader = parquet::write::FileWriter::try_new(
-            writer,
-            schema.0,
-            parquet::write::WriteOptions {
-                version: parquet::write::Version::V2,
-                write_statistics: true,
-                compression: parquet::write::CompressionOptions::Uncompressed,
-                data_pagesize_limit: None,
-            },
-        )
-        .map_err(Error)?;
+        let mut encodings = encodings.unwrap_or_default();
+        let mut column_compression = column_compression.unwrap_or_default();
+        let columns = schema
+            .0
+            .fields
+            .iter()
+            .map(|field| {
+                let encoding = encodings
+                    .remove(&field.name)
+                    .map(|encoding| ColumnEncoding::try_new(&encoding))
+                    .transpose()?
+                    .unwrap_or(ColumnEncoding::Plain);
+                let compression = column_compression
+                    .remove(&field.name)
+                    .map(|(name, level)| self::compression(&name, level))
+                    .transpose()?
+                    .unwrap_or(options.compression);
+                Ok(Column {
+                    encoding,
+                    options: parquet::write::WriteOptions {
+                        compression,
+                        ..options
+                    },
+                })
+            })
+            .collect::<PyResult<Vec<_>>>()?;
+        if let Some(name) = encodings.keys().chain(column_compression.keys()).next() {
+            return Err(PyKeyError::new_err(format!(
+                "Column \"{}\" does not exist",
+                name
+            )));
+        }
+
+        let writer = file_like::FileWriter::from_pyobject(obj, buffer_size)?;
+        let writer = file_like::SharedWriter::new(writer);
+
+        let file_writer = parquet::write::FileWriter::try_new(writer.clone(), schema.0, options)
+            .map_err(Error)?;
 
-        Ok(Self(reader))
+        Ok(Self(file_writer, columns, writer, asyncio::Tasks::default()))
     }
 
     fn write(mut slf: PyRefMut<Self>, chunk: PyRef<Chunk>) -> PyResult<()> {
-        let encodings = chunk
-            .0
-            .arrays()
-            .iter()
-            .map(|array| {
-                parquet::write::transverse(array.data_type(), |_| parquet::write::Encoding::Plain)
-            })
-            .collect::<Vec<_>>();
-        let fields = slf.0.parquet_schema().fields().to_vec();
-        let row_group =
-            parquet::write::row_group_iter(chunk.0.clone(), encodings, fields, slf.0.options());
-        Ok(slf.0.write(row_group).map_err(Error)?)
+        let py = slf.py();
+        let writer = &mut *slf;
+        let chunk = &chunk.0;
+        // encoding and compression do not need the GIL; file-like objects re-acquire it
+        // when flushed
+        py.allow_threads(|| writer.write_chunk(chunk))
+            .map_err(Error)?;
+        Ok(())
+    }
+
+    /// Returns an `asyncio.Future` that completes once `chunk` was written, encoded and
+    /// written on a native thread without the GIL
+    fn write_async(slf: PyRef<Self>, py: Python, chunk: PyRef<Chunk>) -> PyResult<PyObject> {
+        let chunk = chunk.0.clone();
+        let tasks = slf.3.clone();
+        asyncio::spawn_with(py, &tasks, slf.into(), move |writer: &mut Self| {
+            Ok(writer.write_chunk(&chunk).map_err(Error)?)
+        })
     }
 
     fn __exit__(mut slf: PyRefMut<Self>) -> PyResult<()> {
         slf.0.end(None).map_err(Error)?;
+        slf.2.flush()?;
         Ok(())
     }
 }
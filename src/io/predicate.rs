@@ -0,0 +1,311 @@
+//! Predicates evaluated against the statistics of parquet row groups, used to skip
+//! row groups that cannot contain matching rows.
+use std::cmp::Ordering;
+
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+use arrow2::array::{Array, BinaryArray, BooleanArray, PrimitiveArray, Utf8Array};
+use arrow2::datatypes::{DataType, PhysicalType, Schema, TimeUnit};
+use arrow2::io::parquet::read::{statistics, RowGroupMetaData};
+
+use super::super::Error;
+
+/// A scalar value of a statistic or of a predicate
+#[derive(Debug, Clone, PartialEq)]
+enum Value {
+    Bool(bool),
+    Int(i128),
+    Float(f64),
+    Str(String),
+    Bytes(Vec<u8>),
+}
+
+impl Value {
+    fn compare(&self, other: &Value) -> Option<Ordering> {
+        match (self, other) {
+            (Value::Bool(l), Value::Bool(r)) => l.partial_cmp(r),
+            (Value::Int(l), Value::Int(r)) => l.partial_cmp(r),
+            (Value::Float(l), Value::Float(r)) => l.partial_cmp(r),
+            (Value::Int(l), Value::Float(r)) => (*l as f64).partial_cmp(r),
+            (Value::Float(l), Value::Int(r)) => l.partial_cmp(&(*r as f64)),
+            (Value::Str(l), Value::Str(r)) => l.partial_cmp(r),
+            (Value::Bytes(l), Value::Bytes(r)) => l.partial_cmp(r),
+            _ => None,
+        }
+    }
+
+    /// Returns the value of `array` at `index`, or `None` if it is null or of an unsupported type
+    fn from_array(array: &dyn Array, index: usize) -> Option<Value> {
+        use arrow2::datatypes::PrimitiveType::*;
+
+        macro_rules! primitive {
+            ($type:ty, $variant:ident, $cast:ty) => {
+                array
+                    .as_any()
+                    .downcast_ref::<PrimitiveArray<$type>>()
+                    .map(|array| Value::$variant(array.value(index) as $cast))
+            };
+        }
+
+        if index >= array.len() || array.is_null(index) {
+            return None;
+        }
+        match array.data_type().to_physical_type() {
+            PhysicalType::Boolean => array
+                .as_any()
+                .downcast_ref::<BooleanArray>()
+                .map(|array| Value::Bool(array.value(index))),
+            PhysicalType::Primitive(primitive) => match primitive {
+                Int8 => primitive!(i8, Int, i128),
+                Int16 => primitive!(i16, Int, i128),
+                Int32 => primitive!(i32, Int, i128),
+                Int64 => primitive!(i64, Int, i128),
+                UInt8 => primitive!(u8, Int, i128),
+                UInt16 => primitive!(u16, Int, i128),
+                UInt32 => primitive!(u32, Int, i128),
+                UInt64 => primitive!(u64, Int, i128),
+                Float32 => primitive!(f32, Float, f64),
+                Float64 => primitive!(f64, Float, f64),
+                _ => None,
+            },
+            PhysicalType::Utf8 => array
+                .as_any()
+                .downcast_ref::<Utf8Array<i32>>()
+                .map(|array| Value::Str(array.value(index).to_string())),
+            PhysicalType::LargeUtf8 => array
+                .as_any()
+                .downcast_ref::<Utf8Array<i64>>()
+                .map(|array| Value::Str(array.value(index).to_string())),
+            PhysicalType::Binary => array
+                .as_any()
+                .downcast_ref::<BinaryArray<i32>>()
+                .map(|array| Value::Bytes(array.value(index).to_vec())),
+            PhysicalType::LargeBinary => array
+                .as_any()
+                .downcast_ref::<BinaryArray<i64>>()
+                .map(|array| Value::Bytes(array.value(index).to_vec())),
+            _ => None,
+        }
+    }
+
+    /// Converts a Python value to a [`Value`] comparable with statistics of `data_type`.
+    /// `datetime`, `date` and `time` are converted to the physical representation of temporal types.
+    fn from_py(obj: &PyAny, data_type: &DataType) -> PyResult<Value> {
+        let py = obj.py();
+        let datetime = py.import("datetime")?;
+        match data_type {
+            DataType::Timestamp(unit, _) if obj.is_instance(datetime.getattr("datetime")?)? => {
+                // naive datetimes are compared as if they were in UTC
+                let tzinfo = if obj.getattr("tzinfo")?.is_none() {
+                    py.None().into_ref(py)
+                } else {
+                    datetime.getattr("timezone")?.getattr("utc")?
+                };
+                let epoch = datetime
+                    .getattr("datetime")?
+                    .call1((1970, 1, 1, 0, 0, 0, 0, tzinfo))?;
+                let delta = obj.call_method1("__sub__", (epoch,))?;
+                let microseconds = (delta.getattr("days")?.extract::<i128>()? * 86_400
+                    + delta.getattr("seconds")?.extract::<i128>()?)
+                    * 1_000_000
+                    + delta.getattr("microseconds")?.extract::<i128>()?;
+                return Ok(match unit {
+                    TimeUnit::Second => ratio(microseconds, 1_000_000),
+                    TimeUnit::Millisecond => ratio(microseconds, 1_000),
+                    TimeUnit::Microsecond => Value::Int(microseconds),
+                    TimeUnit::Nanosecond => Value::Int(microseconds * 1_000),
+                });
+            }
+            DataType::Date32 if obj.is_instance(datetime.getattr("date")?)? => {
+                let epoch = datetime.getattr("date")?.call1((1970, 1, 1))?;
+                let delta = obj.call_method1("__sub__", (epoch,))?;
+                return Ok(Value::Int(delta.getattr("days")?.extract()?));
+            }
+            DataType::Time64(TimeUnit::Microsecond)
+                if obj.is_instance(datetime.getattr("time")?)? =>
+            {
+                let seconds = (obj.getattr("hour")?.extract::<i128>()? * 60
+                    + obj.getattr("minute")?.extract::<i128>()?)
+                    * 60
+                    + obj.getattr("second")?.extract::<i128>()?;
+                return Ok(Value::Int(
+                    seconds * 1_000_000 + obj.getattr("microsecond")?.extract::<i128>()?,
+                ));
+            }
+            _ => {}
+        };
+
+        if let Ok(value) = obj.extract::<bool>() {
+            Ok(Value::Bool(value))
+        } else if let Ok(value) = obj.extract::<i128>() {
+            Ok(Value::Int(value))
+        } else if let Ok(value) = obj.extract::<f64>() {
+            Ok(Value::Float(value))
+        } else if let Ok(value) = obj.extract::<String>() {
+            Ok(Value::Str(value))
+        } else if let Ok(value) = obj.extract::<Vec<u8>>() {
+            Ok(Value::Bytes(value))
+        } else {
+            Err(PyValueError::new_err(format!(
+                "Value {} cannot be used in a filter",
+                obj
+            )))
+        }
+    }
+}
+
+/// `value / divisor`, exact whenever possible
+fn ratio(value: i128, divisor: i128) -> Value {
+    if value % divisor == 0 {
+        Value::Int(value / divisor)
+    } else {
+        Value::Float(value as f64 / divisor as f64)
+    }
+}
+
+#[derive(Debug, Clone, Copy, PartialEq)]
+enum Op {
+    Eq,
+    Ne,
+    Lt,
+    Le,
+    Gt,
+    Ge,
+    In,
+    NotIn,
+}
+
+/// A predicate of the form `column <op> value`
+#[derive(Debug, Clone)]
+pub struct Predicate {
+    column: String,
+    op: Op,
+    values: Vec<Value>,
+}
+
+impl Predicate {
+    /// Creates a new [`Predicate`] on `column` (a field of `schema`). `value` must be a sequence
+    /// for the operators `in` and `not in`.
+    pub fn try_new(column: &str, op: &str, value: &PyAny, schema: &Schema) -> PyResult<Self> {
+        let field = schema
+            .fields
+            .iter()
+            .find(|field| field.name == column)
+            .ok_or_else(|| {
+                PyValueError::new_err(format!("Filter column \"{}\" does not exist", column))
+            })?;
+
+        let op = match op {
+            "==" | "=" => Op::Eq,
+            "!=" => Op::Ne,
+            "<" => Op::Lt,
+            "<=" => Op::Le,
+            ">" => Op::Gt,
+            ">=" => Op::Ge,
+            "in" => Op::In,
+            "not in" => Op::NotIn,
+            other => {
+                return Err(PyValueError::new_err(format!(
+                    "Filter operator \"{}\" is not supported",
+                    other
+                )))
+            }
+        };
+
+        let values = if matches!(op, Op::In | Op::NotIn) {
+            value
+                .iter()?
+                .map(|value| value.and_then(|value| Value::from_py(value, &field.data_type)))
+                .collect::<PyResult<Vec<_>>>()?
+        } else {
+            vec![Value::from_py(value, &field.data_type)?]
+        };
+
+        Ok(Self {
+            column: column.to_string(),
+            op,
+            values,
+        })
+    }
+
+    /// Returns whether a row group whose column has the given statistics may contain rows
+    /// satisfying this predicate. `None` denotes an unknown statistic.
+    fn may_match(
+        &self,
+        min: Option<Value>,
+        max: Option<Value>,
+        null_count: Option<u64>,
+        num_rows: usize,
+    ) -> bool {
+        // comparisons against nulls are never true
+        if null_count == Some(num_rows as u64) {
+            return false;
+        }
+        let (min, max) = match (min, max) {
+            (Some(min), Some(max)) => (min, max),
+            _ => return true,
+        };
+
+        // `None` (incomparable) is treated as "may match"
+        let lt = |l: &Value, r: &Value| l.compare(r).map(|o| o == Ordering::Less).unwrap_or(true);
+        let le = |l: &Value, r: &Value| l.compare(r).map(|o| o != Ordering::Greater).unwrap_or(true);
+        let eq = |l: &Value, r: &Value| l.compare(r).map(|o| o == Ordering::Equal).unwrap_or(false);
+
+        let value = &self.values[..];
+        match self.op {
+            Op::Eq => le(&min, &value[0]) && le(&value[0], &max),
+            Op::Ne => !(eq(&min, &value[0]) && eq(&max, &value[0])),
+            Op::Lt => lt(&min, &value[0]),
+            Op::Le => le(&min, &value[0]),
+            Op::Gt => lt(&value[0], &max),
+            Op::Ge => le(&value[0], &max),
+            Op::In => value.iter().any(|v| le(&min, v) && le(v, &max)),
+            Op::NotIn => !(eq(&min, &max) && value.iter().any(|v| eq(&min, v))),
+        }
+    }
+}
+
+/// Returns the row groups that may contain rows satisfying all `predicates`, using
+/// their min/max/null-count statistics.
+pub fn prune(
+    row_groups: Vec<RowGroupMetaData>,
+    schema: &Schema,
+    predicates: &[Predicate],
+) -> PyResult<Vec<RowGroupMetaData>> {
+    let mut keep = vec![true; row_groups.len()];
+
+    for predicate in predicates {
+        let field = schema
+            .fields
+            .iter()
+            .find(|field| field.name == predicate.column)
+            .expect("predicates are validated against the schema");
+        let statistics = statistics::deserialize(field, &row_groups).map_err(Error)?;
+        let null_count = statistics
+            .null_count
+            .as_any()
+            .downcast_ref::<PrimitiveArray<u64>>();
+
+        for (index, row_group) in row_groups.iter().enumerate() {
+            if !keep[index] {
+                continue;
+            }
+            let null_count = null_count
+                .filter(|array| array.is_valid(index))
+                .map(|array| array.value(index));
+            keep[index] = predicate.may_match(
+                Value::from_array(statistics.min_value.as_ref(), index),
+                Value::from_array(statistics.max_value.as_ref(), index),
+                null_count,
+                row_group.num_rows(),
+            );
+        }
+    }
+
+    Ok(row_groups
+        .into_iter()
+        .zip(keep)
+        .filter_map(|(row_group, keep)| keep.then(|| row_group))
+        .collect())
+}
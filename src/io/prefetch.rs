@@ -0,0 +1,159 @@
+//! Decoding of chunks ahead of their consumption, on a native background thread
+use std::sync::mpsc::{sync_channel, Receiver};
+use std::sync::{Arc, Condvar, Mutex};
+use std::thread::{self, JoinHandle};
+
+use arrow2::array::Array;
+use arrow2::chunk::Chunk as _Chunk;
+use arrow2::error::Result;
+
+use super::super::{chunk_bytes, without_gil};
+
+/// Default maximum number of bytes of prefetched chunks
+pub const DEFAULT_PREFETCH_BYTES: usize = 256 << 20;
+
+type ChunkResult = Result<_Chunk<Box<dyn Array>>>;
+
+/// The number of bytes of chunks decoded but not yet consumed, and whether the consumer
+/// was dropped
+#[derive(Default)]
+struct Budget {
+    state: Mutex<(usize, bool)>,
+    changed: Condvar,
+}
+
+impl Budget {
+    fn lock(&self) -> std::sync::MutexGuard<(usize, bool)> {
+        self.state.lock().unwrap_or_else(|e| e.into_inner())
+    }
+
+    /// Blocks until less than `max_bytes` are in flight. Returns whether the consumer is alive.
+    fn wait(&self, max_bytes: usize) -> bool {
+        let mut state = self.lock();
+        while !state.1 && state.0 >= max_bytes {
+            state = self.changed.wait(state).unwrap_or_else(|e| e.into_inner());
+        }
+        !state.1
+    }
+
+    /// Returns whether the consumer was dropped
+    fn is_closed(&self) -> bool {
+        self.lock().1
+    }
+
+    fn add(&self, bytes: usize) {
+        self.lock().0 += bytes;
+    }
+
+    fn release(&self, bytes: usize) {
+        self.lock().0 -= bytes;
+        self.changed.notify_all();
+    }
+
+    fn close(&self) {
+        self.lock().1 = true;
+        self.changed.notify_all();
+    }
+}
+
+/// An iterator of chunks decoded by a background thread, up to `chunks` chunks and (after
+/// the first) `max_bytes` bytes ahead of the consumer. Dropping it stops and joins the
+/// thread, which drops the iterator.
+pub struct Prefetcher {
+    receiver: Option<Receiver<(ChunkResult, usize)>>,
+    budget: Arc<Budget>,
+    thread: Option<JoinHandle<()>>,
+}
+
+impl Prefetcher {
+    pub fn new<I>(iter: I, chunks: usize, max_bytes: usize) -> Self
+    where
+        I: Iterator<Item = ChunkResult> + Send + 'static,
+    {
+        // the producer holds one chunk while it is blocked on a full channel
+        let (sender, receiver) = sync_channel(chunks.saturating_sub(1));
+        let budget = Arc::new(Budget::default());
+
+        let producer_budget = budget.clone();
+        let thread = thread::spawn(move || {
+            let mut iter = iter;
+            // stop before decoding another chunk once the consumer was dropped
+            while !producer_budget.is_closed() {
+                let chunk = match iter.next() {
+                    Some(chunk) => chunk,
+                    None => break,
+                };
+                let is_err = chunk.is_err();
+                let bytes = chunk.as_ref().map(chunk_bytes).unwrap_or(0);
+                producer_budget.add(bytes);
+                // the consumer was dropped
+                if sender.send((chunk, bytes)).is_err() || is_err {
+                    break;
+                }
+                if !producer_budget.wait(max_bytes) {
+                    break;
+                }
+            }
+        });
+
+        Self {
+            receiver: Some(receiver),
+            budget,
+            thread: Some(thread),
+        }
+    }
+}
+
+impl Iterator for Prefetcher {
+    type Item = ChunkResult;
+
+    fn next(&mut self) -> Option<Self::Item> {
+        let (chunk, bytes) = self.receiver.as_ref()?.recv().ok()?;
+        self.budget.release(bytes);
+        Some(chunk)
+    }
+}
+
+impl Drop for Prefetcher {
+    fn drop(&mut self) {
+        // unblocks the thread waiting for the budget or on a full channel
+        self.budget.close();
+        self.receiver.take();
+        if let Some(thread) = self.thread.take() {
+            // the thread may be waiting for the GIL, e.g. to read from a file-like object
+            without_gil(move || thread.join().ok());
+        }
+    }
+}
+
+/// An iterator of chunks that are either decoded when requested, or prefetched
+pub enum Chunks<I> {
+    Sequential(I),
+    Prefetched(Prefetcher),
+}
+
+impl<I> Chunks<I>
+where
+    I: Iterator<Item = ChunkResult> + Send + 'static,
+{
+    /// Returns an iterator over `iter` that decodes up to `prefetch` chunks (and `max_bytes`
+    /// bytes) ahead, or none when `prefetch` is 0.
+    pub fn new(iter: I, prefetch: usize, max_bytes: usize) -> Self {
+        if prefetch == 0 {
+            Self::Sequential(iter)
+        } else {
+            Self::Prefetched(Prefetcher::new(iter, prefetch, max_bytes))
+        }
+    }
+}
+
+impl<I: Iterator<Item = ChunkResult>> Iterator for Chunks<I> {
+    type Item = ChunkResult;
+
+    fn next(&mut self) -> Option<Self::Item> {
+        match self {
+            Self::Sequential(iter) => iter.next(),
+            Self::Prefetched(iter) => iter.next(),
+        }
+    }
+}
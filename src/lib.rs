@@ -1,12 +1,21 @@
 mod array;
+mod asyncio;
+mod buffer;
+mod c_data;
+mod compute;
 mod datatypes;
 mod error;
 mod file_like;
 mod io;
 mod iterator;
 mod py_file;
+mod pylist;
+mod rechunk;
+mod temporal;
 
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
+use pyo3::types::PySlice;
 
 use arrow2::array::Array;
 use arrow2::chunk::Chunk as _Chunk;
@@ -17,6 +26,75 @@ use error::Error;
 #[pyclass]
 struct Chunk(pub _Chunk<Box<dyn Array>>);
 
+/// Returns a zero-copy slice of `chunk` with `length` rows starting at row `offset`
+pub(crate) fn slice_chunk(
+    chunk: &_Chunk<Box<dyn Array>>,
+    offset: usize,
+    length: usize,
+) -> _Chunk<Box<dyn Array>> {
+    _Chunk::new(
+        chunk
+            .arrays()
+            .iter()
+            .map(|array| array.slice(offset, length))
+            .collect(),
+    )
+}
+
+/// Runs `f` without the GIL, releasing it if the current thread holds it. Used to block in
+/// destructors, that run both with and without the GIL, on threads that may need it.
+pub(crate) fn without_gil<T, F>(f: F) -> T
+where
+    F: FnOnce() -> T + Send,
+    T: Send,
+{
+    // Safety: `PyGILState_Check` can be called from any thread at any time
+    if unsafe { pyo3::ffi::PyGILState_Check() } == 1 {
+        Python::with_gil(|py| py.allow_threads(f))
+    } else {
+        f()
+    }
+}
+
+/// Returns the estimated size of `chunk` in bytes
+pub(crate) fn chunk_bytes(chunk: &_Chunk<Box<dyn Array>>) -> usize {
+    chunk
+        .arrays()
+        .iter()
+        .map(|array| arrow2::compute::aggregate::estimated_bytes_size(array.as_ref()))
+        .sum()
+}
+
+/// Returns a chunk with the rows of all `chunks` (which must have the same number and types
+/// of columns), in order
+pub(crate) fn concat_chunks(
+    chunks: &[_Chunk<Box<dyn Array>>],
+) -> arrow2::error::Result<_Chunk<Box<dyn Array>>> {
+    if let [chunk] = chunks {
+        return Ok(chunk.clone());
+    }
+    let columns = chunks.first().map(|chunk| chunk.arrays().len()).unwrap_or(0);
+    if let Some(chunk) = chunks.iter().find(|chunk| chunk.arrays().len() != columns) {
+        // concatenate reports mismatching types, but not missing columns
+        return Err(Error::from_py(PyValueError::new_err(format!(
+            "All chunks must have the same number of columns, but chunks have {} and {} columns",
+            columns,
+            chunk.arrays().len()
+        )))
+        .0);
+    }
+    let arrays = (0..columns)
+        .map(|column| {
+            let arrays = chunks
+                .iter()
+                .map(|chunk| chunk.arrays()[column].as_ref())
+                .collect::<Vec<_>>();
+            arrow2::compute::concatenate::concatenate(&arrays)
+        })
+        .collect::<arrow2::error::Result<Vec<_>>>()?;
+    _Chunk::try_new(arrays)
+}
+
 #[pymethods]
 impl Chunk {
     #[new]
@@ -47,6 +125,61 @@ impl Chunk {
             .map(|x| to_py_object(py, x.as_ref()))
             .collect()
     }
+
+    /// The array of the column at `index`
+    fn column(&self, py: Python, index: isize) -> PyResult<PyObject> {
+        let arrays = self.0.arrays();
+        let index = compute::normalize_index(index, arrays.len())?;
+        Ok(to_py_object(py, arrays[index].as_ref()))
+    }
+
+    /// A chunk with the columns at `indices`, in order, without copying them
+    fn select(&self, indices: Vec<isize>) -> PyResult<Chunk> {
+        let arrays = self.0.arrays();
+        let arrays = indices
+            .into_iter()
+            .map(|index| compute::normalize_index(index, arrays.len()).map(|i| arrays[i].clone()))
+            .collect::<PyResult<Vec<_>>>()?;
+        Ok(Self(_Chunk::new(arrays)))
+    }
+
+    /// The rows of a slice: zero-copy when its step is 1
+    fn __getitem__(&self, key: &PySlice) -> PyResult<Chunk> {
+        let arrays = compute::slice_arrays(self.0.arrays(), self.0.len(), key)?;
+        Ok(Self(_Chunk::new(arrays)))
+    }
+
+    /// The rows where `mask` (a boolean array of the same length) is true
+    fn filter(&self, mask: PyRef<BooleanArray>) -> PyResult<Chunk> {
+        let arrays = compute::filter_rows(self.0.arrays(), self.0.len(), &mask.0)?;
+        Ok(Self(_Chunk::new(arrays)))
+    }
+
+    /// The rows at `indices`, an integer array or a sequence of non-negative integers
+    fn take(&self, indices: &PyAny) -> PyResult<Chunk> {
+        let arrays = compute::take_rows(self.0.arrays(), self.0.len(), indices)?;
+        Ok(Self(_Chunk::new(arrays)))
+    }
+
+    /// A dictionary of each of `names` to the values of its column, as a list
+    fn to_pydict(&self, py: Python, names: Vec<String>) -> PyResult<PyObject> {
+        pylist::to_pydict(py, &self.0, &names)
+    }
+
+    /// A list of dictionaries of each of `names` to the value of its column, one per row
+    fn to_pylist(&self, py: Python, names: Vec<String>) -> PyResult<PyObject> {
+        pylist::to_pyrows(py, &self.0, &names)
+    }
+
+    /// Exports this chunk as a struct array through the Arrow C data interface. Fields are
+    /// named after `requested_schema` when provided, and `c{i}` otherwise.
+    fn __arrow_c_array__(
+        &self,
+        py: Python,
+        requested_schema: Option<&PyAny>,
+    ) -> PyResult<(PyObject, PyObject)> {
+        c_data::export_chunk(py, self.0.clone(), requested_schema)
+    }
 }
 
 #[pymodule]
@@ -55,10 +188,19 @@ fn arrowdantic(_py: Python, m: &PyModule) -> PyResult<()> {
 
     m.add_class::<io::ArrowFileReader>()?;
     m.add_class::<io::ArrowFileWriter>()?;
+    m.add_class::<io::ArrowStreamReader>()?;
+    m.add_class::<io::ArrowStreamWriter>()?;
     m.add_class::<io::ParquetFileReader>()?;
     m.add_class::<io::ParquetFileWriter>()?;
     m.add_class::<io::ODBCConnector>()?;
     m.add_class::<io::ODBCIterator>()?;
+    m.add_class::<io::ODBCPool>()?;
+    m.add_class::<c_data::ArrowCStreamReader>()?;
+    m.add_class::<rechunk::Rechunker>()?;
+    m.add_function(wrap_pyfunction!(rechunk::concat, m)?)?;
+    m.add_function(wrap_pyfunction!(temporal::tzinfo_name, m)?)?;
+    m.add_function(wrap_pyfunction!(c_data::import_array, m)?)?;
+    m.add_function(wrap_pyfunction!(c_data::import_chunk, m)?)?;
 
     m.add_class::<Int8Array>()?;
     m.add_class::<Int16Array>()?;
@@ -1,13 +1,25 @@
-use pyo3::{exceptions::PyTypeError, prelude::*};
+use pyo3::{exceptions::PyTypeError, ffi, prelude::*};
 
 use pyo3::types::PyBytes;
 
 use std::io;
 use std::io::{Read, Seek, SeekFrom, Write};
+use std::os::raw::c_char;
 
 #[derive(Debug)]
 pub struct PyFileLikeObject {
     inner: PyObject,
+    // whether `inner` has a `.readinto()` method
+    readinto: bool,
+    // read-ahead buffer: `read_buffer[read_pos..read_end]` are the next bytes to read
+    read_buffer: Vec<u8>,
+    read_pos: usize,
+    read_end: usize,
+    // position of `inner`, when known (i.e. after the first seek)
+    position: Option<u64>,
+    // write buffer, written to `inner` once it would exceed `write_capacity`
+    write_buffer: Vec<u8>,
+    write_capacity: usize,
 }
 
 /// Wraps a `PyObject`, and implements read, seek, and write for it.
@@ -16,7 +28,91 @@ impl PyFileLikeObject {
     /// To assert the object has the required methods methods,
     /// instantiate it with `PyFileLikeObject::require`
     pub fn new(object: PyObject) -> Self {
-        PyFileLikeObject { inner: object }
+        let readinto = Python::with_gil(|py| object.getattr(py, "readinto").is_ok());
+        PyFileLikeObject {
+            inner: object,
+            readinto,
+            read_buffer: vec![],
+            read_pos: 0,
+            read_end: 0,
+            position: None,
+            write_buffer: vec![],
+            write_capacity: 0,
+        }
+    }
+
+    /// Sets the size of the write buffer. Writes are accumulated (without the GIL) and
+    /// written to the object in blocks of up to `capacity` bytes.
+    pub fn with_write_buffer_size(mut self, capacity: usize) -> Self {
+        self.write_capacity = capacity;
+        self
+    }
+
+    /// Writes the whole `buf` to `inner`
+    fn write_inner(&mut self, mut buf: &[u8]) -> io::Result<()> {
+        if buf.is_empty() {
+            return Ok(());
+        }
+        let gil = Python::acquire_gil();
+        let py = gil.python();
+
+        while !buf.is_empty() {
+            let pybytes = PyBytes::new(py, buf);
+
+            let number_bytes_written = self
+                .inner
+                .call_method(py, "write", (pybytes,), None)
+                .map_err(pyerr_to_io_err)?;
+
+            // raw objects may write less than requested; `None` denotes that all were written
+            let number_bytes_written: usize = if number_bytes_written.is_none(py) {
+                buf.len()
+            } else {
+                number_bytes_written.extract(py).map_err(pyerr_to_io_err)?
+            };
+            if number_bytes_written == 0 {
+                return Err(io::Error::new(
+                    io::ErrorKind::WriteZero,
+                    "The object did not accept more bytes",
+                ));
+            }
+            self.position = self
+                .position
+                .map(|position| position + number_bytes_written as u64);
+            buf = &buf[number_bytes_written.min(buf.len())..];
+        }
+        Ok(())
+    }
+
+    /// Writes the write buffer to `inner`
+    fn flush_buffer(&mut self) -> io::Result<()> {
+        let buffer = std::mem::take(&mut self.write_buffer);
+        let result = self.write_inner(&buffer);
+        self.write_buffer = buffer;
+        self.write_buffer.clear();
+        result
+    }
+
+    /// Sets the size of the read-ahead buffer. Reads smaller than `capacity` are served from
+    /// the buffer, so that adjacent small reads are coalesced into a single `.read()`
+    /// call; larger reads are issued directly.
+    pub fn with_buffer_size(mut self, capacity: usize) -> Self {
+        self.read_buffer = vec![0; capacity];
+        self.read_pos = 0;
+        self.read_end = 0;
+        self
+    }
+
+    /// Number of buffered bytes that were read from `inner` but not yet consumed
+    fn buffered(&self) -> usize {
+        self.read_end - self.read_pos
+    }
+
+    /// Reads from `inner` into `buf`, updating the known position
+    fn read_inner(&mut self, buf: &mut [u8]) -> io::Result<usize> {
+        let read = read_into(&self.inner, self.readinto, buf)?;
+        self.position = self.position.map(|position| position + read as u64);
+        Ok(read)
     }
 
     /// Same as `PyFileLikeObject::new`, but validates that the underlying
@@ -68,42 +164,96 @@ fn pyerr_to_io_err(e: PyErr) -> io::Error {
     }
 }
 
-impl Read for PyFileLikeObject {
-    fn read(&mut self, mut buf: &mut [u8]) -> Result<usize, io::Error> {
-        let gil = Python::acquire_gil();
-        let py = gil.python();
+/// Reads from `inner` into `buf`. When `readinto` is true, `inner.readinto` writes directly
+/// into `buf`; otherwise the result of `inner.read` is copied into it.
+fn read_into(inner: &PyObject, readinto: bool, mut buf: &mut [u8]) -> io::Result<usize> {
+    let gil = Python::acquire_gil();
+    let py = gil.python();
 
-        let bytes = self
-            .inner
-            .call_method(py, "read", (buf.len(),), None)
-            .map_err(pyerr_to_io_err)?;
+    if readinto {
+        // Safety: the memoryview is released before `buf` goes out of scope
+        let view = unsafe {
+            PyObject::from_owned_ptr_or_err(
+                py,
+                ffi::PyMemoryView_FromMemory(
+                    buf.as_mut_ptr() as *mut c_char,
+                    buf.len() as ffi::Py_ssize_t,
+                    ffi::PyBUF_WRITE,
+                ),
+            )
+        }
+        .map_err(pyerr_to_io_err)?;
+        let read = inner.call_method1(py, "readinto", (view.clone_ref(py),));
+        view.call_method0(py, "release").map_err(pyerr_to_io_err)?;
+        let read = read.map_err(pyerr_to_io_err)?;
+        return if read.is_none(py) {
+            // non-blocking objects return `None` when no data is available
+            Err(io::Error::new(
+                io::ErrorKind::WouldBlock,
+                "No data is available to read",
+            ))
+        } else {
+            read.extract(py).map_err(pyerr_to_io_err)
+        };
+    }
+
+    let bytes = inner
+        .call_method(py, "read", (buf.len(),), None)
+        .map_err(pyerr_to_io_err)?;
 
-        let bytes: &PyBytes = bytes
-            .cast_as(py)
-            .expect("Expecting to be able to downcast into bytes from read result.");
+    let bytes: &PyBytes = bytes
+        .cast_as(py)
+        .expect("Expecting to be able to downcast into bytes from read result.");
+
+    buf.write_all(bytes.as_bytes())?;
+
+    bytes.len().map_err(pyerr_to_io_err)
+}
 
-        buf.write_all(bytes.as_bytes())?;
+impl Read for PyFileLikeObject {
+    fn read(&mut self, buf: &mut [u8]) -> Result<usize, io::Error> {
+        if self.buffered() == 0 {
+            if buf.len() >= self.read_buffer.len() {
+                // large reads bypass the buffer, whose bytes no longer precede the position
+                self.read_pos = 0;
+                self.read_end = 0;
+                return self.read_inner(buf);
+            }
+            let mut read_buffer = std::mem::take(&mut self.read_buffer);
+            let read = self.read_inner(&mut read_buffer);
+            self.read_buffer = read_buffer;
+            self.read_pos = 0;
+            self.read_end = read?;
+        }
 
-        bytes.len().map_err(pyerr_to_io_err)
+        let read = buf.len().min(self.buffered());
+        buf[..read].copy_from_slice(&self.read_buffer[self.read_pos..self.read_pos + read]);
+        self.read_pos += read;
+        Ok(read)
     }
 }
 
 impl Write for PyFileLikeObject {
     fn write(&mut self, buf: &[u8]) -> Result<usize, io::Error> {
-        let gil = Python::acquire_gil();
-        let py = gil.python();
-
-        let pybytes = PyBytes::new(py, buf);
-
-        let number_bytes_written = self
-            .inner
-            .call_method(py, "write", (pybytes,), None)
-            .map_err(pyerr_to_io_err)?;
-
-        number_bytes_written.extract(py).map_err(pyerr_to_io_err)
+        if self.write_buffer.len() + buf.len() > self.write_capacity {
+            self.flush_buffer()?;
+        }
+        if buf.len() >= self.write_capacity {
+            // large writes bypass the buffer
+            self.write_inner(buf)?;
+        } else {
+            if self.write_buffer.capacity() < self.write_capacity {
+                self.write_buffer
+                    .reserve_exact(self.write_capacity - self.write_buffer.len());
+            }
+            self.write_buffer.extend_from_slice(buf);
+        }
+        Ok(buf.len())
     }
 
     fn flush(&mut self) -> Result<(), io::Error> {
+        self.flush_buffer()?;
+
         let gil = Python::acquire_gil();
         let py = gil.python();
 
@@ -115,8 +265,42 @@ impl Write for PyFileLikeObject {
     }
 }
 
+impl Drop for PyFileLikeObject {
+    fn drop(&mut self) {
+        // errors are ignored, as in `BufWriter`; `flush` surfaces them
+        let _ = self.flush_buffer();
+    }
+}
+
 impl Seek for PyFileLikeObject {
     fn seek(&mut self, pos: SeekFrom) -> Result<u64, io::Error> {
+        self.flush_buffer()?;
+
+        // seeks within the read-ahead buffer do not reach `inner`
+        let target = match (pos, self.position) {
+            (SeekFrom::Start(target), Some(_)) => Some(target),
+            (SeekFrom::Current(delta), Some(position)) => {
+                let target = (position - self.buffered() as u64) as i64 + delta;
+                u64::try_from(target).ok()
+            }
+            _ => None,
+        };
+        if let (Some(target), Some(position)) = (target, self.position) {
+            let start = position - self.read_end as u64;
+            if (start..=position).contains(&target) {
+                self.read_pos = (target - start) as usize;
+                return Ok(target);
+            }
+        }
+
+        // the position of `inner` is ahead of the reader's by the buffered bytes
+        let pos = match pos {
+            SeekFrom::Current(delta) => SeekFrom::Current(delta - self.buffered() as i64),
+            pos => pos,
+        };
+        self.read_pos = 0;
+        self.read_end = 0;
+
         let gil = Python::acquire_gil();
         let py = gil.python();
 
@@ -131,6 +315,8 @@ impl Seek for PyFileLikeObject {
             .call_method(py, "seek", (offset, whence), None)
             .map_err(pyerr_to_io_err)?;
 
-        new_position.extract(py).map_err(pyerr_to_io_err)
+        let new_position = new_position.extract(py).map_err(pyerr_to_io_err)?;
+        self.position = Some(new_position);
+        Ok(new_position)
     }
 }
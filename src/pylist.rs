@@ -0,0 +1,206 @@
+//! Conversion of arrays and chunks to Python lists and dictionaries in a single native loop
+use arrow2::array::{
+    Array, BinaryArray as _BinaryArray, BooleanArray as _BooleanArray, PrimitiveArray, Utf8Array,
+};
+use arrow2::chunk::Chunk as _Chunk;
+use arrow2::datatypes::PhysicalType;
+use arrow2::types::NativeType;
+use pyo3::exceptions::{PyNotImplementedError, PyValueError};
+use pyo3::prelude::*;
+use pyo3::types::{PyDict, PyList, PyString};
+use pyo3::{ffi, AsPyPointer};
+
+use super::array::*;
+use super::temporal;
+
+/// Returns a list of the `length` items of `values` (`None` for nulls), allocated once and
+/// filled in place.
+fn new_list<T, I>(py: Python, length: usize, values: I) -> PyResult<PyObject>
+where
+    T: IntoPy<PyObject>,
+    I: Iterator<Item = Option<T>>,
+{
+    try_new_list(py, length, values.map(Ok))
+}
+
+/// [`new_list`] of fallible `values`, returning the first error
+pub(crate) fn try_new_list<T, I>(py: Python, length: usize, values: I) -> PyResult<PyObject>
+where
+    T: IntoPy<PyObject>,
+    I: Iterator<Item = PyResult<Option<T>>>,
+{
+    unsafe {
+        let list = ffi::PyList_New(length as ffi::Py_ssize_t);
+        if list.is_null() {
+            return Err(PyErr::fetch(py));
+        }
+        // owns the list, releasing it on panic or error. Items not yet set are NULL, which
+        // the list's deallocation skips.
+        let list: PyObject = PyObject::from_owned_ptr(py, list);
+        let mut count = 0;
+        for value in values.take(length) {
+            let item = match value? {
+                Some(value) => value.into_py(py).into_ptr(),
+                None => {
+                    ffi::Py_INCREF(ffi::Py_None());
+                    ffi::Py_None()
+                }
+            };
+            ffi::PyList_SET_ITEM(list.as_ptr(), count as ffi::Py_ssize_t, item);
+            count += 1;
+        }
+        assert_eq!(count, length, "the array yielded fewer items than its length");
+        Ok(list)
+    }
+}
+
+fn primitive<T>(py: Python, array: &dyn Array) -> PyResult<PyObject>
+where
+    T: NativeType + IntoPy<PyObject>,
+{
+    let array = array.as_any().downcast_ref::<PrimitiveArray<T>>().unwrap();
+    new_list(py, array.len(), array.iter().map(|x| x.copied()))
+}
+
+/// Returns the values of `array` as a Python list. Strings and bytes are created directly
+/// from the array's buffers, and temporal values are converted by [`temporal::to_pylist`].
+pub fn to_pylist(py: Python, array: &dyn Array) -> PyResult<PyObject> {
+    use arrow2::datatypes::PrimitiveType::*;
+
+    if let Some(list) = temporal::to_pylist(py, array) {
+        return list;
+    }
+
+    match array.data_type().to_physical_type() {
+        PhysicalType::Null => new_list::<bool, _>(py, array.len(), std::iter::repeat(None)),
+        PhysicalType::Boolean => {
+            let array = array.as_any().downcast_ref::<_BooleanArray>().unwrap();
+            new_list(py, array.len(), array.iter())
+        }
+        PhysicalType::Primitive(primitive) => match primitive {
+            Int8 => self::primitive::<i8>(py, array),
+            Int16 => self::primitive::<i16>(py, array),
+            Int32 => self::primitive::<i32>(py, array),
+            Int64 => self::primitive::<i64>(py, array),
+            UInt8 => self::primitive::<u8>(py, array),
+            UInt16 => self::primitive::<u16>(py, array),
+            UInt32 => self::primitive::<u32>(py, array),
+            UInt64 => self::primitive::<u64>(py, array),
+            Float32 => self::primitive::<f32>(py, array),
+            Float64 => self::primitive::<f64>(py, array),
+            other => Err(PyNotImplementedError::new_err(format!(
+                "Arrays of {:?} cannot be converted to Python",
+                other
+            ))),
+        },
+        PhysicalType::Utf8 => {
+            let array = array.as_any().downcast_ref::<Utf8Array<i32>>().unwrap();
+            new_list(py, array.len(), array.iter())
+        }
+        PhysicalType::LargeUtf8 => {
+            let array = array.as_any().downcast_ref::<Utf8Array<i64>>().unwrap();
+            new_list(py, array.len(), array.iter())
+        }
+        PhysicalType::Binary => {
+            let array = array.as_any().downcast_ref::<_BinaryArray<i32>>().unwrap();
+            new_list(py, array.len(), array.iter())
+        }
+        PhysicalType::LargeBinary => {
+            let array = array.as_any().downcast_ref::<_BinaryArray<i64>>().unwrap();
+            new_list(py, array.len(), array.iter())
+        }
+        other => Err(PyNotImplementedError::new_err(format!(
+            "Arrays of {:?} cannot be converted to Python",
+            other
+        ))),
+    }
+}
+
+fn column_names<'a>(
+    py: Python<'a>,
+    chunk: &_Chunk<Box<dyn Array>>,
+    names: &[String],
+) -> PyResult<Vec<&'a PyString>> {
+    if names.len() != chunk.arrays().len() {
+        return Err(PyValueError::new_err(format!(
+            "Expected {} column names (got {})",
+            chunk.arrays().len(),
+            names.len()
+        )));
+    }
+    Ok(names.iter().map(|name| PyString::new(py, name)).collect())
+}
+
+/// Returns a dictionary of column name to list of values of `chunk`
+pub fn to_pydict(
+    py: Python,
+    chunk: &_Chunk<Box<dyn Array>>,
+    names: &[String],
+) -> PyResult<PyObject> {
+    let names = column_names(py, chunk, names)?;
+    let dict = PyDict::new(py);
+    for (name, array) in names.into_iter().zip(chunk.arrays()) {
+        dict.set_item(name, to_pylist(py, array.as_ref())?)?;
+    }
+    Ok(dict.into())
+}
+
+/// Returns a list with a dictionary of column name to value per row of `chunk`
+pub fn to_pyrows(
+    py: Python,
+    chunk: &_Chunk<Box<dyn Array>>,
+    names: &[String],
+) -> PyResult<PyObject> {
+    let names = column_names(py, chunk, names)?;
+    let columns = chunk
+        .arrays()
+        .iter()
+        .map(|array| to_pylist(py, array.as_ref()))
+        .collect::<PyResult<Vec<_>>>()?;
+    let columns = columns
+        .iter()
+        .map(|column| column.cast_as::<PyList>(py))
+        .collect::<Result<Vec<_>, _>>()?;
+
+    let rows = (0..chunk.len())
+        .map(|row| {
+            let dict = PyDict::new(py);
+            for (name, column) in names.iter().zip(columns.iter()) {
+                dict.set_item(name, column.get_item(row)?)?;
+            }
+            Ok(dict)
+        })
+        .collect::<PyResult<Vec<_>>>()?;
+    Ok(PyList::new(py, rows).into())
+}
+
+/// `to_pylist` of each array
+macro_rules! to_pylist {
+    ($($name:ident),*) => {
+        $(#[pymethods]
+        impl $name {
+            /// The values of this array as a list, converted in a single native loop
+            fn to_pylist(&self, py: Python) -> PyResult<PyObject> {
+                to_pylist(py, &self.0)
+            }
+        })*
+    };
+}
+
+to_pylist!(
+    Int8Array,
+    Int16Array,
+    Int32Array,
+    Int64Array,
+    UInt8Array,
+    UInt16Array,
+    UInt32Array,
+    UInt64Array,
+    Float32Array,
+    Float64Array,
+    BooleanArray,
+    StringArray,
+    LargeStringArray,
+    BinaryArray,
+    LargeBinaryArray
+);
@@ -0,0 +1,167 @@
+//! Merging and splitting of streams of chunks into chunks of a target size
+use std::collections::VecDeque;
+
+use arrow2::array::Array;
+use arrow2::chunk::Chunk as _Chunk;
+use arrow2::error::Result;
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use pyo3::types::PyIterator;
+
+use super::error::Error;
+use super::{chunk_bytes, concat_chunks, slice_chunk, Chunk};
+
+type ChunkResult = Result<_Chunk<Box<dyn Array>>>;
+
+/// An iterator that concatenates consecutive chunks of `iter` and slices them into chunks of
+/// `rows` rows and (estimated) `bytes` bytes, whichever is smaller. The last chunk may be
+/// smaller. Chunks are only copied when they are concatenated.
+pub struct Rechunk<I> {
+    iter: I,
+    rows: Option<usize>,
+    bytes: Option<usize>,
+    pending: VecDeque<_Chunk<Box<dyn Array>>>,
+    pending_rows: usize,
+    // the number of rows of the next chunk
+    target: usize,
+    exhausted: bool,
+}
+
+impl<I> Rechunk<I> {
+    pub fn new(iter: I, rows: Option<usize>, bytes: Option<usize>) -> Self {
+        Self {
+            iter,
+            rows,
+            bytes,
+            pending: VecDeque::new(),
+            pending_rows: 0,
+            target: 1,
+            exhausted: false,
+        }
+    }
+
+    /// The number of rows of a chunk starting with (rows like those of) `chunk`
+    fn target_of(&self, chunk: &_Chunk<Box<dyn Array>>) -> usize {
+        let mut target = self.rows.unwrap_or(usize::MAX);
+        if let Some(bytes) = self.bytes {
+            let row_bytes = (chunk_bytes(chunk) / chunk.len().max(1)).max(1);
+            target = target.min(bytes / row_bytes);
+        }
+        target.max(1)
+    }
+}
+
+impl<I: Iterator<Item = ChunkResult>> Iterator for Rechunk<I> {
+    type Item = ChunkResult;
+
+    fn next(&mut self) -> Option<Self::Item> {
+        while !self.exhausted && self.pending_rows < self.target {
+            match self.iter.next() {
+                Some(Ok(chunk)) if chunk.len() == 0 => {}
+                Some(Ok(chunk)) => {
+                    if self.pending.is_empty() {
+                        self.target = self.target_of(&chunk);
+                    }
+                    self.pending_rows += chunk.len();
+                    self.pending.push_back(chunk);
+                }
+                Some(Err(error)) => return Some(Err(error)),
+                None => self.exhausted = true,
+            }
+        }
+        if self.pending.is_empty() {
+            return None;
+        }
+
+        let rows = self.target.min(self.pending_rows);
+        let mut needed = rows;
+        let mut pieces = vec![];
+        while needed > 0 {
+            let chunk = self.pending.pop_front().expect("pending has enough rows");
+            if chunk.len() <= needed {
+                needed -= chunk.len();
+                pieces.push(chunk);
+            } else {
+                pieces.push(slice_chunk(&chunk, 0, needed));
+                self.pending
+                    .push_front(slice_chunk(&chunk, needed, chunk.len() - needed));
+                needed = 0;
+            }
+        }
+        self.pending_rows -= rows;
+        if let Some(chunk) = self.pending.front() {
+            self.target = self.target_of(chunk);
+        }
+        Some(concat_chunks(&pieces))
+    }
+}
+
+/// The chunks of a Python iterator of [`Chunk`]
+struct PyChunks(PyObject);
+
+impl Iterator for PyChunks {
+    type Item = ChunkResult;
+
+    fn next(&mut self) -> Option<Self::Item> {
+        Python::with_gil(|py| {
+            let mut iterator = self.0.cast_as::<PyIterator>(py).ok()?;
+            let chunk = iterator
+                .next()?
+                .and_then(|chunk| Ok(chunk.extract::<PyRef<Chunk>>()?.0.clone()));
+            // Python exceptions are re-raised by the consumer
+            Some(chunk.map_err(|e| Error::from_py(e).0))
+        })
+    }
+}
+
+/// An iterator of [`Chunk`] over an iterable of chunks, merged and split into chunks of
+/// `target_rows` rows and (estimated) `target_bytes` bytes, whichever is smaller.
+#[pyclass]
+pub struct Rechunker(Rechunk<PyChunks>);
+
+#[pymethods]
+impl Rechunker {
+    #[new]
+    #[args(target_rows = "None", target_bytes = "None")]
+    fn new(
+        chunks: &PyAny,
+        target_rows: Option<usize>,
+        target_bytes: Option<usize>,
+    ) -> PyResult<Self> {
+        if target_rows.is_none() && target_bytes.is_none() {
+            return Err(PyValueError::new_err(
+                "At least one of target_rows and target_bytes must be provided",
+            ));
+        }
+        if target_rows == Some(0) || target_bytes == Some(0) {
+            return Err(PyValueError::new_err(
+                "target_rows and target_bytes must be positive",
+            ));
+        }
+        let chunks = PyChunks(chunks.iter()?.to_object(chunks.py()));
+        Ok(Self(Rechunk::new(chunks, target_rows, target_bytes)))
+    }
+
+    fn __iter__(slf: PyRef<Self>) -> PyRef<Self> {
+        slf
+    }
+
+    fn __next__(mut slf: PyRefMut<Self>) -> PyResult<Option<Chunk>> {
+        let py = slf.py();
+        let rechunk = &mut slf.0;
+        // concatenating does not need the GIL; reading chunks re-acquires it
+        let chunk = py.allow_threads(|| rechunk.next()).transpose().map_err(Error)?;
+        Ok(chunk.map(Chunk))
+    }
+}
+
+/// Concatenates chunks with the same number and types of columns into a single chunk
+#[pyfunction]
+pub fn concat(py: Python, chunks: Vec<PyRef<Chunk>>) -> PyResult<Chunk> {
+    let chunks = chunks
+        .iter()
+        .map(|chunk| chunk.0.clone())
+        .collect::<Vec<_>>();
+    let chunk = py.allow_threads(|| concat_chunks(&chunks)).map_err(Error)?;
+    Ok(Chunk(chunk))
+}
@@ -0,0 +1,371 @@
+//! Conversion between Python `datetime`, `date` and `time` values and Arrow temporal arrays,
+//! with exact integer arithmetic.
+//!
+//! Timestamps are stored as the time since the Unix epoch in UTC. Naive `datetime`s are
+//! treated as if they were in UTC, so that they round trip unchanged.
+use std::collections::HashMap;
+use std::sync::Mutex;
+
+use arrow2::array::{Array, PrimitiveArray};
+use arrow2::datatypes::{DataType, TimeUnit};
+use once_cell::sync::Lazy;
+use pyo3::exceptions::{PyOverflowError, PyValueError};
+use pyo3::prelude::*;
+use pyo3::class::basic::CompareOp;
+use pyo3::types::{
+    PyDate, PyDateAccess, PyDateTime, PyDelta, PyDeltaAccess, PyTime, PyTimeAccess,
+};
+
+use super::pylist::try_new_list;
+
+const MICROS_PER_DAY: i64 = 86_400_000_000;
+
+/// Python `tzinfo`s of Arrow timezone names, created once per name
+static TIMEZONES: Lazy<Mutex<HashMap<String, PyObject>>> = Lazy::new(Default::default);
+
+/// The number of days since 1970-01-01 of a date of the proleptic Gregorian calendar
+fn days_from_civil(year: i32, month: u8, day: u8) -> i64 {
+    let year = year as i64 - (month <= 2) as i64;
+    let era = year.div_euclid(400);
+    let year_of_era = year - era * 400;
+    let month = month as i64;
+    let day_of_year = (153 * (month + if month > 2 { -3 } else { 9 }) + 2) / 5 + day as i64 - 1;
+    let day_of_era = year_of_era * 365 + year_of_era / 4 - year_of_era / 100 + day_of_year;
+    era * 146_097 + day_of_era - 719_468
+}
+
+/// The date of the proleptic Gregorian calendar `days` after 1970-01-01
+fn civil_from_days(days: i64) -> (i32, u8, u8) {
+    let days = days + 719_468;
+    let era = days.div_euclid(146_097);
+    let day_of_era = days - era * 146_097;
+    let year_of_era =
+        (day_of_era - day_of_era / 1460 + day_of_era / 36524 - day_of_era / 146_096) / 365;
+    let day_of_year = day_of_era - (365 * year_of_era + year_of_era / 4 - year_of_era / 100);
+    let month = (5 * day_of_year + 2) / 153;
+    let day = day_of_year - (153 * month + 2) / 5 + 1;
+    let month = if month < 10 { month + 3 } else { month - 9 };
+    let year = year_of_era + era * 400 + (month <= 2) as i64;
+    (year as i32, month as u8, day as u8)
+}
+
+fn overflow(micros: i64, unit: TimeUnit) -> PyErr {
+    PyOverflowError::new_err(format!(
+        "{} microseconds cannot be represented in {:?}",
+        micros, unit
+    ))
+}
+
+/// Converts microseconds to `unit`, rounding down
+fn from_micros(micros: i64, unit: TimeUnit) -> PyResult<i64> {
+    match unit {
+        TimeUnit::Second => Ok(micros.div_euclid(1_000_000)),
+        TimeUnit::Millisecond => Ok(micros.div_euclid(1_000)),
+        TimeUnit::Microsecond => Ok(micros),
+        TimeUnit::Nanosecond => micros
+            .checked_mul(1_000)
+            .ok_or_else(|| overflow(micros, unit)),
+    }
+}
+
+/// Converts a `value` in `unit` to microseconds, rounding down
+fn to_micros(value: i64, unit: TimeUnit) -> PyResult<i64> {
+    match unit {
+        TimeUnit::Second => value.checked_mul(1_000_000),
+        TimeUnit::Millisecond => value.checked_mul(1_000),
+        TimeUnit::Microsecond => Some(value),
+        TimeUnit::Nanosecond => Some(value.div_euclid(1_000)),
+    }
+    .ok_or_else(|| {
+        PyOverflowError::new_err(format!(
+            "{} {:?} cannot be represented in microseconds",
+            value, unit
+        ))
+    })
+}
+
+fn delta_micros(delta: &PyAny) -> PyResult<i64> {
+    let delta = delta.downcast::<PyDelta>()?;
+    Ok((delta.get_days() as i64 * 86_400 + delta.get_seconds() as i64) * 1_000_000
+        + delta.get_microseconds() as i64)
+}
+
+fn time_micros<T: PyTimeAccess>(time: &T) -> i64 {
+    ((time.get_hour() as i64 * 60 + time.get_minute() as i64) * 60 + time.get_second() as i64)
+        * 1_000_000
+        + time.get_microsecond() as i64
+}
+
+fn new_date(py: Python, days: i64) -> PyResult<PyObject> {
+    let (year, month, day) = civil_from_days(days);
+    Ok(PyDate::new(py, year, month, day)?.into())
+}
+
+/// A `time` from microseconds since midnight
+fn new_time(py: Python, micros: i64) -> PyResult<PyObject> {
+    let micros = micros.rem_euclid(MICROS_PER_DAY);
+    let seconds = micros / 1_000_000;
+    Ok(PyTime::new(
+        py,
+        (seconds / 3600) as u8,
+        (seconds / 60 % 60) as u8,
+        (seconds % 60) as u8,
+        (micros % 1_000_000) as u32,
+        None,
+    )?
+    .into())
+}
+
+/// A `datetime` with wall time `micros` since the epoch
+fn new_datetime(py: Python, micros: i64, tzinfo: Option<&PyObject>) -> PyResult<PyObject> {
+    let (year, month, day) = civil_from_days(micros.div_euclid(MICROS_PER_DAY));
+    let micros = micros.rem_euclid(MICROS_PER_DAY);
+    let seconds = micros / 1_000_000;
+    Ok(PyDateTime::new(
+        py,
+        year,
+        month,
+        day,
+        (seconds / 3600) as u8,
+        (seconds / 60 % 60) as u8,
+        (seconds % 60) as u8,
+        (micros % 1_000_000) as u32,
+        tzinfo,
+    )?
+    .into())
+}
+
+/// The offset in seconds of a fixed offset timezone name such as `+01:00` or `-0530`
+fn parse_offset(name: &str) -> Option<i32> {
+    let sign = match name.as_bytes().first()? {
+        b'+' => 1,
+        b'-' => -1,
+        _ => return None,
+    };
+    let digits = name[1..].replace(':', "");
+    if digits.len() != 4 || !digits.bytes().all(|x| x.is_ascii_digit()) {
+        return None;
+    }
+    let hours: i32 = digits[..2].parse().ok()?;
+    let minutes: i32 = digits[2..].parse().ok()?;
+    Some(sign * (hours * 3600 + minutes * 60))
+}
+
+fn new_timezone(py: Python, name: &str) -> PyResult<PyObject> {
+    let datetime = py.import("datetime")?;
+    let timezone = datetime.getattr("timezone")?;
+    Ok(if name == "UTC" || name == "Z" {
+        timezone.getattr("utc")?.into()
+    } else if let Some(seconds) = parse_offset(name) {
+        timezone.call1((PyDelta::new(py, 0, seconds, 0, true)?,))?.into()
+    } else {
+        py.import("zoneinfo")?
+            .getattr("ZoneInfo")?
+            .call1((name,))?
+            .into()
+    })
+}
+
+/// The `tzinfo` of an Arrow timezone name: `datetime.timezone` for UTC and fixed offsets,
+/// and `zoneinfo.ZoneInfo` otherwise
+fn timezone(py: Python, name: &str) -> PyResult<PyObject> {
+    let lock = || TIMEZONES.lock().unwrap_or_else(|e| e.into_inner());
+    if let Some(tz) = lock().get(name) {
+        return Ok(tz.clone_ref(py));
+    }
+    let tz = new_timezone(py, name)?;
+    lock().insert(name.to_string(), tz.clone_ref(py));
+    Ok(tz)
+}
+
+/// The offset in microseconds of `tzinfo` when it is a `datetime.timezone`, whose offset does
+/// not depend on the `datetime`
+fn fixed_offset(tzinfo: &PyAny) -> PyResult<Option<i64>> {
+    let timezone = tzinfo.py().import("datetime")?.getattr("timezone")?;
+    if !tzinfo.is_instance(timezone)? {
+        return Ok(None);
+    }
+    delta_micros(tzinfo.call_method1("utcoffset", (tzinfo.py().None(),))?).map(Some)
+}
+
+/// The Arrow timezone name of `tzinfo`, the `tzinfo` of `value`
+fn timezone_name(tzinfo: &PyAny, offset: Option<i64>, value: &PyAny) -> PyResult<String> {
+    if let Ok(key) = tzinfo.getattr("key") {
+        return key.extract();
+    }
+    Ok(match offset {
+        Some(0) => "UTC".to_string(),
+        Some(offset) => {
+            let minutes = offset.abs() / 60_000_000;
+            let sign = if offset < 0 { '-' } else { '+' };
+            format!("{}{:02}:{:02}", sign, minutes / 60, minutes % 60)
+        }
+        None => tzinfo.call_method1("tzname", (value,))?.extract()?,
+    })
+}
+
+/// Returns the Arrow timezone name of `tzinfo`: the key of a `zoneinfo.ZoneInfo`, `"UTC"` or
+/// `"+HH:MM"` for a `datetime.timezone`, and its `tzname` otherwise
+#[pyfunction]
+pub fn tzinfo_name(py: Python, tzinfo: &PyAny) -> PyResult<String> {
+    timezone_name(tzinfo, fixed_offset(tzinfo)?, py.None().into_ref(py))
+}
+
+fn unit(unit: &str) -> PyResult<TimeUnit> {
+    Ok(match unit {
+        "s" => TimeUnit::Second,
+        "ms" => TimeUnit::Millisecond,
+        "us" => TimeUnit::Microsecond,
+        "ns" => TimeUnit::Nanosecond,
+        other => {
+            return Err(PyValueError::new_err(format!(
+                "Unknown time unit \"{}\"",
+                other
+            )))
+        }
+    })
+}
+
+/// Converts an iterable of optional `datetime`s with the same `tzinfo` to a timestamp array
+/// of `unit` (one of "s", "ms", "us", "ns") in their timezone
+pub fn timestamps_from_py(values: &PyAny, unit: &str) -> PyResult<PrimitiveArray<i64>> {
+    let unit = self::unit(unit)?;
+    // the tzinfo of the first value, its name and its offset, if fixed
+    let mut reference: Option<(&PyAny, Option<String>, Option<i64>)> = None;
+
+    let array = values
+        .iter()?
+        .map(|value| {
+            let value = value?;
+            if value.is_none() {
+                return Ok(None);
+            }
+            let datetime = value.downcast::<PyDateTime>()?;
+            let tzinfo = value.getattr("tzinfo")?;
+            if reference.is_none() {
+                let (name, offset) = if tzinfo.is_none() {
+                    (None, Some(0))
+                } else {
+                    let offset = fixed_offset(tzinfo)?;
+                    (Some(timezone_name(tzinfo, offset, value)?), offset)
+                };
+                reference = Some((tzinfo, name, offset));
+            }
+            let (expected, _, offset) = reference.as_ref().unwrap();
+            if !tzinfo.is(*expected)
+                && !tzinfo.rich_compare(*expected, CompareOp::Eq)?.is_true()?
+            {
+                return Err(PyValueError::new_err("Values must all have the same tzinfo"));
+            }
+            let offset = match offset {
+                Some(offset) => *offset,
+                None => delta_micros(value.call_method0("utcoffset")?)?,
+            };
+
+            let days = days_from_civil(
+                datetime.get_year(),
+                datetime.get_month(),
+                datetime.get_day(),
+            );
+            from_micros(days * MICROS_PER_DAY + time_micros(datetime) - offset, unit).map(Some)
+        })
+        .collect::<PyResult<PrimitiveArray<i64>>>()?;
+
+    let name = reference.and_then(|(_, name, _)| name);
+    Ok(array.to(DataType::Timestamp(unit, name)))
+}
+
+/// Converts an iterable of optional `date`s to a [`DataType::Date32`] array
+pub fn dates_from_py(values: &PyAny) -> PyResult<PrimitiveArray<i32>> {
+    let array = values
+        .iter()?
+        .map(|value| {
+            let value = value?;
+            if value.is_none() {
+                return Ok(None);
+            }
+            let date = value.downcast::<PyDate>()?;
+            Ok(Some(
+                days_from_civil(date.get_year(), date.get_month(), date.get_day()) as i32,
+            ))
+        })
+        .collect::<PyResult<PrimitiveArray<i32>>>()?;
+    Ok(array.to(DataType::Date32))
+}
+
+/// Converts an iterable of optional `time`s to a [`DataType::Time64`] array of microseconds.
+/// Their `tzinfo` is ignored.
+pub fn times_from_py(values: &PyAny) -> PyResult<PrimitiveArray<i64>> {
+    let array = values
+        .iter()?
+        .map(|value| {
+            let value = value?;
+            if value.is_none() {
+                return Ok(None);
+            }
+            Ok(Some(time_micros(value.downcast::<PyTime>()?)))
+        })
+        .collect::<PyResult<PrimitiveArray<i64>>>()?;
+    Ok(array.to(DataType::Time64(TimeUnit::Microsecond)))
+}
+
+fn convert<T, F>(py: Python, array: &dyn Array, f: F) -> PyResult<PyObject>
+where
+    T: arrow2::types::NativeType,
+    F: Fn(T) -> PyResult<PyObject>,
+{
+    let array = array.as_any().downcast_ref::<PrimitiveArray<T>>().unwrap();
+    try_new_list(
+        py,
+        array.len(),
+        array.iter().map(|x| x.map(|x| f(*x)).transpose()),
+    )
+}
+
+fn timestamps_to_pylist(
+    py: Python,
+    array: &dyn Array,
+    unit: TimeUnit,
+    tz: Option<&str>,
+) -> PyResult<PyObject> {
+    let tzinfo = tz.map(|tz| timezone(py, tz)).transpose()?;
+    let offset = tzinfo
+        .as_ref()
+        .map(|tzinfo| fixed_offset(tzinfo.as_ref(py)))
+        .transpose()?;
+
+    match (tzinfo, offset.flatten()) {
+        (None, _) => convert(py, array, |x: i64| {
+            new_datetime(py, to_micros(x, unit)?, None)
+        }),
+        (Some(tzinfo), Some(offset)) => convert(py, array, |x: i64| {
+            new_datetime(py, to_micros(x, unit)? + offset, Some(&tzinfo))
+        }),
+        // the offset depends on the instant: convert from UTC in Python
+        (Some(tzinfo), None) => convert(py, array, |x: i64| {
+            let utc = new_datetime(py, to_micros(x, unit)?, Some(&tzinfo))?;
+            tzinfo.call_method1(py, "fromutc", (utc,))
+        }),
+    }
+}
+
+/// Returns the values of `array` as a list of `datetime`, `date` or `time` when it is of a
+/// temporal type, and `None` otherwise. Timestamps with a timezone are aware `datetime`s.
+pub fn to_pylist(py: Python, array: &dyn Array) -> Option<PyResult<PyObject>> {
+    Some(match array.data_type() {
+        DataType::Timestamp(unit, tz) => timestamps_to_pylist(py, array, *unit, tz.as_deref()),
+        DataType::Date32 => convert(py, array, |x: i32| new_date(py, x as i64)),
+        DataType::Date64 => convert(py, array, |x: i64| {
+            new_date(py, x.div_euclid(MICROS_PER_DAY / 1_000))
+        }),
+        DataType::Time32(unit) => {
+            let unit = *unit;
+            convert(py, array, move |x: i32| new_time(py, to_micros(x as i64, unit)?))
+        }
+        DataType::Time64(unit) => {
+            let unit = *unit;
+            convert(py, array, move |x: i64| new_time(py, to_micros(x, unit)?))
+        }
+        _ => return None,
+    })
+}
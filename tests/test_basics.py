@@ -1,4 +1,5 @@
 import datetime
+import zoneinfo
 
 import arrowdantic as ad
 import pyarrow as pa
@@ -167,12 +168,273 @@ def test_time():
     assert a.type == ad.DataType.time()
 
 
+def test_temporal_exact():
+    utc = datetime.timezone.utc
+    dt = datetime.datetime(2021, 1, 1, 1, 1, 1, 999999, tzinfo=utc)
+    a = ad.TimestampArray([dt, None], "ns")
+    assert a == ad.TimestampArray.from_timestamps([1609462861999999000, None], "ns", utc)
+    assert list(a) == [dt, None]
+    assert a[-2] == dt
+
+    # naive datetimes are stored as if they were in UTC
+    dt = datetime.datetime(1969, 12, 31, 23, 59, 59, 999999)
+    a = ad.TimestampArray([dt], "us")
+    assert a == ad.TimestampArray.from_timestamps([-1], "us", None)
+    assert a.to_pylist() == [dt]
+
+    dt = datetime.datetime(2021, 7, 1, 12, tzinfo=zoneinfo.ZoneInfo("Europe/Berlin"))
+    a = ad.TimestampArray([dt], "ms")
+    assert a.tzinfo == "Europe/Berlin"
+    assert a.to_pylist()[0].utcoffset() == datetime.timedelta(hours=2)
+    assert a.to_pylist() == [dt]
+
+    tz = datetime.timezone(datetime.timedelta(hours=-5))
+    a = ad.TimestampArray([datetime.datetime(2021, 1, 1, tzinfo=tz)], "s")
+    assert a.tzinfo == "-05:00"
+    assert a[0].utcoffset() == datetime.timedelta(hours=-5)
+
+    # timestamps and types round-trip timezones of fixed offsets and of the IANA database
+    for tz, name in [
+        (datetime.timezone(datetime.timedelta(hours=1)), "+01:00"),
+        (zoneinfo.ZoneInfo("Europe/Berlin"), "Europe/Berlin"),
+    ]:
+        a = ad.TimestampArray.from_timestamps([1625140800, None], "s", tz)
+        assert a.tzinfo == name
+        assert a.type == ad.DataType.timestamp("s", tz)
+        assert a.to_pylist() == [datetime.datetime(2021, 7, 1, 12, tzinfo=utc), None]
+        assert a[0].tzinfo == tz
+
+    try:
+        ad.TimestampArray(
+            [datetime.datetime(2021, 1, 1, tzinfo=utc), datetime.datetime(2021, 1, 1)], "s"
+        )
+        assert False
+    except ValueError:
+        pass
+
+    dates = [datetime.date(1900, 3, 1), None, datetime.date(2400, 2, 29)]
+    assert list(ad.DateArray(dates)) == dates
+
+    chunk = ad.Chunk([ad.TimestampArray([None], "us"), ad.TimeArray([datetime.time(23, 59)])])
+    assert chunk.to_pydict() == {"c0": [None], "c1": [datetime.time(23, 59)]}
+
+
+def test_to_numpy():
+    import numpy
+
+    a = ad.Int64Array([1, 2, 3])
+    values, validity = a.to_numpy()
+    assert values.dtype == numpy.int64
+    assert values.tolist() == [1, 2, 3]
+    assert validity is None
+    assert not values.flags.writeable
+
+    a = ad.Float32Array([1.5, None])
+    try:
+        a.to_numpy()
+        assert False
+    except ValueError:
+        pass
+    values, validity = a.to_numpy(zero_copy_only=False)
+    assert values.dtype == numpy.float32
+    assert values[0] == 1.5
+    assert validity.tolist() == [True, False]
+
+
+def test_from_buffer():
+    import array
+    import numpy
+
+    a = ad.Int64Array(numpy.arange(3, dtype=numpy.int64))
+    assert a == ad.Int64Array([0, 1, 2])
+
+    a = ad.Float64Array(numpy.array([1.0, 2.0]), numpy.array([True, False]))
+    assert a == ad.Float64Array([1.0, None])
+
+    a = ad.Int32Array(array.array("i", [1, 2]), [False, True])
+    assert a == ad.Int32Array([None, 2])
+
+    a = ad.UInt8Array(b"ab")
+    assert a == ad.UInt8Array([97, 98])
+
+    try:
+        ad.UInt8Array(b"ab", [True])
+        assert False
+    except ValueError:
+        pass
+
+
+def test_c_data_interface():
+    a = ad.Int32Array([1, None])
+    assert pa.array(a).equals(pa.array([1, None], type=pa.int32()))
+    assert ad.Array.from_arrow(pa.array([1, None], type=pa.int32())) == a
+
+    chunk = ad.Chunk([a, ad.StringArray(["a", None])])
+    batch = pa.record_batch(chunk)
+    assert batch.column_names == ["c0", "c1"]
+    assert ad.Chunk.from_arrow(batch).arrays() == chunk.arrays()
+
+    table = pa.table({"a": pa.array([1, 2], type=pa.int64())})
+    reader = ad.ArrowCStreamReader(table)
+    assert next(reader).arrays() == [ad.Int64Array([1, 2])]
+
+    # a chunk is a struct array, which has no `Array`
+    try:
+        ad.Array.from_arrow(chunk)
+        assert False
+    except TypeError:
+        pass
+
+    dictionary = pa.array(["a", "b", "a"]).dictionary_encode()
+    try:
+        ad.Chunk.from_arrow(pa.record_batch([dictionary], names=["a"]))
+        assert False
+    except TypeError:
+        pass
+
+    try:
+        ad.ArrowCStreamReader(pa.table({"a": dictionary}))
+        assert False
+    except TypeError:
+        pass
+
+
+def test_compute():
+    a = ad.Int32Array([1, None, 3, 4])
+    assert a.sum() == 8
+    assert a.min() == 1
+    assert a.max() == 4
+    assert a.mean() == 8 / 3
+    # the sum overflows an int8, but the mean does not
+    assert ad.Int8Array([100, 100]).mean() == 100.0
+    assert a.count() == 3
+    assert a.null_count() == 1
+    assert ad.Int32Array([None]).sum() is None
+
+    assert (a < 3) == ad.BooleanArray([True, None, False, False])
+    assert a.eq(ad.Int32Array([1, 2, 2, 4])) == ad.BooleanArray([True, None, False, True])
+    assert a == ad.Int32Array([1, None, 3, 4])
+
+    # unsupported operands are left to the other operand
+    class Reflected:
+        def __gt__(self, other):
+            return "reflected"
+
+    assert (a < Reflected()) == "reflected"
+
+    assert a + 1 == ad.Int32Array([2, None, 4, 5])
+    assert 10 - a == ad.Int32Array([9, None, 7, 6])
+    assert a * a == ad.Int32Array([1, None, 9, 16])
+    assert a / 2 == ad.Float64Array([0.5, None, 1.5, 2.0])
+    try:
+        a + ad.Int32Array([1])
+        assert False
+    except ValueError:
+        pass
+
+    b = ad.BooleanArray([True, False, None])
+    assert b.sum() == 1
+    assert ad.BooleanArray([True, None, True])[1:].sum() == 1
+    assert (b & True) == ad.BooleanArray([True, False, None])
+    assert (b | ad.BooleanArray([False, True, True])) == ad.BooleanArray([True, True, None])
+    assert ~b == ad.BooleanArray([False, True, None])
+
+    s = ad.StringArray(["b", None, "a"])
+    assert (s.min(), s.max(), s.count()) == ("a", "b", 2)
+    assert s.ge("b") == ad.BooleanArray([True, None, False])
+
+
+def test_selection():
+    a = ad.Int32Array([1, None, 3, 4])
+    assert a[0] == 1
+    assert a[1] is None
+    assert a[-1] == 4
+    assert a[1:3] == ad.Int32Array([None, 3])
+    assert a[::2] == ad.Int32Array([1, 3])
+    try:
+        a[4]
+        assert False
+    except IndexError:
+        pass
+
+    assert a.filter(a > 1) == ad.Int32Array([3, 4])
+    assert a.take([3, 0]) == ad.Int32Array([4, 1])
+    assert a.take(ad.UInt32Array([1, None])) == ad.Int32Array([None, None])
+    assert ad.StringArray(["a", "b"])[1] == "b"
+    assert ad.BinaryArray([b"a", b"b"])[::-1] == ad.BinaryArray([b"b", b"a"])
+
+    dates = ad.DateArray([datetime.date(2021, 1, 1), None])
+    assert dates[0] == datetime.date(2021, 1, 1)
+    assert list(dates[1:]) == [None]
+
+    chunk = ad.Chunk([a, ad.StringArray(["a", "b", "c", "d"])])
+    schema = ad.Schema(
+        [ad.Field("c1", ad.DataType.int32(), True), ad.Field("c2", ad.DataType.string(), True)]
+    )
+    assert chunk.column(1) == ad.StringArray(["a", "b", "c", "d"])
+    assert chunk.column("c1", schema) == a
+    assert chunk.select(["c2"], schema).arrays() == [ad.StringArray(["a", "b", "c", "d"])]
+    assert chunk[1:2].arrays() == [ad.Int32Array([None]), ad.StringArray(["b"])]
+    assert chunk.filter(a > 3).arrays() == [ad.Int32Array([4]), ad.StringArray(["d"])]
+    assert chunk.take([2]).arrays() == [ad.Int32Array([3]), ad.StringArray(["c"])]
+
+
+def test_to_pylist():
+    assert ad.Int32Array([1, None]).to_pylist() == [1, None]
+    assert ad.Float64Array([1.5]).to_pylist() == [1.5]
+    assert ad.BooleanArray([True, None]).to_pylist() == [True, None]
+    assert ad.StringArray(["a", None, "ü"])[1:].to_pylist() == [None, "ü"]
+    assert ad.LargeBinaryArray([b"a", None]).to_pylist() == [b"a", None]
+    assert ad.DateArray([datetime.date(2021, 1, 1)]).to_pylist() == [datetime.date(2021, 1, 1)]
+
+    chunk = ad.Chunk([ad.Int32Array([1, None]), ad.StringArray(["a", "b"])])
+    assert chunk.to_pydict() == {"c0": [1, None], "c1": ["a", "b"]}
+    schema = ad.Schema(
+        [ad.Field("id", ad.DataType.int32(), True), ad.Field("name", ad.DataType.string(), True)]
+    )
+    assert chunk.to_pylist(schema) == [{"id": 1, "name": "a"}, {"id": None, "name": "b"}]
+
+    chunk = ad.Chunk([ad.TimeArray([datetime.time(1, 2, 3)])])
+    assert chunk.to_pylist() == [{"c0": datetime.time(1, 2, 3)}]
+
+
 def test_chunk():
     a = ad.UInt32Array([1, 2])
     chunk = ad.Chunk([a])
     assert isinstance(chunk.arrays()[0], ad.UInt32Array)
 
 
+def test_rechunk():
+    chunks = [ad.Chunk([ad.Int32Array(list(range(i, i + n)))]) for i, n in [(0, 2), (2, 7), (9, 1)]]
+
+    chunk = ad.concat(chunks)
+    assert chunk.arrays() == [ad.Int32Array(list(range(10)))]
+
+    rechunked = list(ad.rechunk(chunks, target_rows=4))
+    assert [len(chunk) for chunk in rechunked] == [4, 4, 2]
+    assert ad.concat(rechunked).arrays() == chunk.arrays()
+
+    try:
+        ad.concat([ad.Chunk([ad.Int32Array([1]), ad.Int32Array([2])]), chunks[0]])
+        assert False
+    except ValueError:
+        pass
+
+    # 4 bytes per row
+    assert [len(chunk) for chunk in ad.rechunk(chunks, target_bytes=12)] == [3, 3, 3, 1]
+    assert list(ad.rechunk([], target_rows=4)) == []
+
+    def failing():
+        yield chunks[0]
+        raise KeyError("oops")
+
+    try:
+        list(ad.rechunk(failing(), target_rows=4))
+        assert False
+    except KeyError:
+        pass
+
+
 def test_ipc_read():
     arrays = [
         pa.array([True, None, False], type=pa.bool_()),
@@ -312,6 +574,91 @@ def test_ipc_round_trip():
     assert chunk.arrays() == original_arrays
 
 
+def test_ipc_compression():
+    import io
+
+    original_arrays = [ad.Int64Array([1, None] * 1000), ad.StringArray(["aa", None] * 1000)]
+    schema = ad.Schema(
+        [ad.Field(f"c{i}", array.type, True) for i, array in enumerate(original_arrays)]
+    )
+
+    sizes = {}
+    for compression in [None, "lz4", "zstd"]:
+        data = io.BytesIO()
+        with ad.ArrowFileWriter(data, schema, compression=compression) as writer:
+            writer.write(ad.Chunk(original_arrays))
+        sizes[compression] = len(data.getvalue())
+        data.seek(0)
+
+        chunk = next(ad.ArrowFileReader(data))
+        assert chunk.arrays() == original_arrays
+        data.seek(0)
+        assert pa.ipc.open_file(data).read_all().num_rows == 2000
+
+    assert sizes["lz4"] < sizes[None]
+    assert sizes["zstd"] < sizes[None]
+
+
+def test_ipc_memory_map(tmp_path):
+    import io
+
+    original_arrays = [ad.Int64Array(list(range(10))), ad.StringArray(["aa", None] * 5)]
+    schema = ad.Schema(
+        [ad.Field(f"c{i}", array.type, True) for i, array in enumerate(original_arrays)]
+    )
+    path = str(tmp_path / "a.arrow")
+    with ad.ArrowFileWriter(path, schema) as writer:
+        writer.write(ad.Chunk(original_arrays))
+        writer.write(ad.Chunk(original_arrays))
+
+    chunks = list(ad.ArrowFileReader(path, memory_map=True))
+    assert [chunk.arrays() for chunk in chunks] == [original_arrays] * 2
+
+    chunk = next(ad.ArrowFileReader(path, offset=12, memory_map=True))
+    assert chunk.arrays()[0] == ad.Int64Array(list(range(2, 10)))
+
+    try:
+        ad.ArrowFileReader(io.BytesIO(), memory_map=True)
+        assert False
+    except ValueError:
+        pass
+
+
+def test_ipc_stream_round_trip():
+    import os
+    import threading
+
+    original_arrays = [ad.Int64Array([1, None]), ad.StringArray(["aa", None])]
+    schema = ad.Schema(
+        [ad.Field(f"c{i}", array.type, True) for i, array in enumerate(original_arrays)]
+    )
+
+    read_fd, write_fd = os.pipe()
+
+    def write():
+        with open(write_fd, "wb") as sink:
+            with ad.ArrowStreamWriter(sink, schema) as writer:
+                for _ in range(3):
+                    writer.write(ad.Chunk(original_arrays))
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    with open(read_fd, "rb") as source:
+        reader = ad.ArrowStreamReader(source)
+        assert reader.schema().fields == schema.fields
+        chunks = [chunk.arrays() for chunk in reader]
+    thread.join()
+    assert chunks == [original_arrays] * 3
+
+    import io
+
+    data = io.BytesIO()
+    with ad.ArrowStreamWriter(data, schema, compression="zstd") as writer:
+        writer.write(ad.Chunk(original_arrays))
+    data.seek(0)
+    assert pa.ipc.open_stream(data).read_all().num_rows == 2
+
+
 def test_parquet_round_trip():
     original_arrays = [ad.UInt32Array([1, None])]
 
@@ -331,6 +678,325 @@ def test_parquet_round_trip():
     assert chunk.arrays() == original_arrays
 
 
+def test_parquet_write_options():
+    import io
+
+    original_arrays = [
+        ad.Int64Array(list(range(1000))),
+        ad.StringArray(["a", None, "c", "a"] * 250),
+    ]
+    schema = ad.Schema(
+        [ad.Field(f"c{i}", array.type, True) for i, array in enumerate(original_arrays)]
+    )
+
+    for compression in ["uncompressed", "snappy", "gzip", "lz4", "brotli", "zstd"]:
+        data = io.BytesIO()
+        with ad.ParquetFileWriter(
+            data,
+            schema,
+            compression=compression,
+            encodings={"c0": "delta_binary_packed", "c1": "dictionary"},
+            column_compression={"c1": ("zstd", 10)},
+            data_page_size=1024,
+        ) as writer:
+            writer.write(ad.Chunk(original_arrays))
+        data.seek(0)
+
+        assert pa.parquet.read_table(data).column("c1").to_pylist() == ["a", None, "c", "a"] * 250
+        data.seek(0)
+        chunk = next(ad.ParquetFileReader(data))
+        assert chunk.arrays() == original_arrays
+
+    try:
+        with ad.ParquetFileWriter(io.BytesIO(), schema, compression="unknown"):
+            pass
+        assert False
+    except ValueError:
+        pass
+
+    # levels are not wrapped to the codec's integer type
+    for compression, level in [("gzip", 300), ("gzip", -1), ("brotli", -1)]:
+        try:
+            ad.ParquetFileWriter(
+                io.BytesIO(), schema, compression=compression, compression_level=level
+            )
+            assert False
+        except ValueError as e:
+            assert str(level) in str(e)
+
+
+def test_read_file_like():
+    import io
+
+    class Reader:
+        """A file-like object that counts its calls and only has `read`"""
+
+        def __init__(self, data):
+            self._data = io.BytesIO(data)
+            self.calls = 0
+
+        def read(self, n=-1):
+            self.calls += 1
+            return self._data.read(n)
+
+        def seek(self, offset, whence=0):
+            return self._data.seek(offset, whence)
+
+    arrays = [ad.Int64Array(list(range(1000))), ad.StringArray(["aa", None] * 500)]
+    schema = ad.Schema([ad.Field(f"c{i}", array.type, True) for i, array in enumerate(arrays)])
+
+    data = io.BytesIO()
+    with ad.ParquetFileWriter(data, schema) as writer:
+        for _ in range(10):
+            writer.write(ad.Chunk(arrays))
+
+    # `BytesIO` supports `readinto`
+    data.seek(0)
+    assert [chunk.arrays() for chunk in ad.ParquetFileReader(data)] == [arrays] * 10
+
+    unbuffered = Reader(data.getvalue())
+    expected = [chunk.arrays() for chunk in ad.ParquetFileReader(unbuffered, buffer_size=0)]
+    buffered = Reader(data.getvalue())
+    assert [chunk.arrays() for chunk in ad.ParquetFileReader(buffered)] == expected
+    assert buffered.calls < unbuffered.calls
+
+
+def test_read_file_like_seek_back():
+    import io
+
+    n = 800
+    table = pa.table(
+        {
+            "c0": pa.array([None] * n, type=pa.int64()),
+            "c1": pa.array(range(n), type=pa.int64()),
+            "c2": pa.array([i % 3 == 0 for i in range(n)]),
+        }
+    )
+    data = io.BytesIO()
+    pa.parquet.write_table(table, data, use_dictionary=False, compression="none")
+    data.seek(0)
+    c2_size = pa.parquet.ParquetFile(data).metadata.row_group(0).column(2).total_compressed_size
+
+    # `c0` is read through the buffer and `c1` past it; `c2` is then read with a single read
+    # as large as the buffer, and seeking back to read it again must not use the buffer.
+    data.seek(0)
+    reader = ad.ParquetFileReader(data, columns=["c0", "c1", "c2", "c2"], buffer_size=c2_size)
+    expected = [table.column(name).to_pylist() for name in ["c0", "c1", "c2", "c2"]]
+    assert [array.to_pylist() for array in next(reader).arrays()] == expected
+
+
+def test_write_file_like():
+    import io
+
+    class Writer:
+        """A file-like object that counts its calls to `write`"""
+
+        def __init__(self):
+            self.data = io.BytesIO()
+            self.calls = 0
+
+        def write(self, data):
+            self.calls += 1
+            return self.data.write(data)
+
+        def flush(self):
+            pass
+
+        def seek(self, offset, whence=0):
+            return self.data.seek(offset, whence)
+
+    arrays = [ad.Int64Array(list(range(1000))), ad.StringArray(["aa", None] * 500)]
+    schema = ad.Schema([ad.Field(f"c{i}", array.type, True) for i, array in enumerate(arrays)])
+
+    for writer_type in [ad.ArrowFileWriter, ad.ParquetFileWriter]:
+        unbuffered = Writer()
+        with writer_type(unbuffered, schema, buffer_size=0) as writer:
+            for _ in range(10):
+                writer.write(ad.Chunk(arrays))
+        buffered = Writer()
+        with writer_type(buffered, schema) as writer:
+            for _ in range(10):
+                writer.write(ad.Chunk(arrays))
+
+        assert buffered.data.getvalue() == unbuffered.data.getvalue()
+        assert buffered.calls < unbuffered.calls
+
+
+def test_prefetch():
+    import io
+
+    arrays = [ad.Int64Array(list(range(1000)))]
+    schema = ad.Schema([ad.Field("c0", ad.DataType.int64(), True)])
+
+    data = io.BytesIO()
+    with ad.ParquetFileWriter(data, schema) as writer:
+        for _ in range(10):
+            writer.write(ad.Chunk(arrays))
+    for prefetch, prefetch_bytes in [(1, 1 << 20), (4, 1 << 20), (4, 1)]:
+        data.seek(0)
+        reader = ad.ParquetFileReader(data, prefetch=prefetch, prefetch_bytes=prefetch_bytes)
+        assert [chunk.arrays() for chunk in reader] == [arrays] * 10
+
+    data = io.BytesIO()
+    with ad.ArrowFileWriter(data, schema) as writer:
+        for _ in range(10):
+            writer.write(ad.Chunk(arrays))
+    data.seek(0)
+    reader = ad.ArrowFileReader(data, prefetch=2)
+    assert [chunk.arrays() for chunk in reader] == [arrays] * 10
+
+    # dropping a reader with pending chunks stops its thread
+    data.seek(0)
+    reader = ad.ArrowFileReader(data, prefetch=2)
+    next(reader)
+    del reader
+
+
+def test_asyncio(tmp_path):
+    import asyncio
+
+    arrays = [ad.Int64Array(list(range(1000)))]
+    schema = ad.Schema([ad.Field("c0", ad.DataType.int64(), True)])
+
+    async def round_trip(path, writer_type, reader_type):
+        with writer_type(path, schema) as writer:
+            for _ in range(3):
+                await writer.write_async(ad.Chunk(arrays))
+        return [chunk.arrays() async for chunk in reader_type(path)]
+
+    async def main():
+        return await asyncio.gather(
+            round_trip(str(tmp_path / "a.parquet"), ad.ParquetFileWriter, ad.ParquetFileReader),
+            round_trip(str(tmp_path / "a.arrow"), ad.ArrowFileWriter, ad.ArrowFileReader),
+            round_trip(str(tmp_path / "a.stream"), ad.ArrowStreamWriter, ad.ArrowStreamReader),
+        )
+
+    assert asyncio.run(main()) == [[arrays] * 3] * 3
+
+    # concurrent awaits of the same reader run one after the other
+    async def read_concurrently(path):
+        reader = ad.ArrowFileReader(path)
+        chunks = await asyncio.gather(*(reader.__anext__() for _ in range(3)))
+        return [chunk.arrays() for chunk in chunks]
+
+    assert asyncio.run(read_concurrently(str(tmp_path / "a.arrow"))) == [arrays] * 3
+
+
+def test_parquet_read_threads(tmp_path):
+    import concurrent.futures
+
+    arrays = [ad.Int64Array(list(range(1000)))]
+    schema = ad.Schema([ad.Field("c0", ad.DataType.int64(), True)])
+    paths = [str(tmp_path / f"{i}.parquet") for i in range(4)]
+    for path in paths:
+        with ad.ParquetFileWriter(path, schema) as writer:
+            writer.write(ad.Chunk(arrays))
+
+    def read(path):
+        return [len(chunk) for chunk in ad.ParquetFileReader(path)]
+
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        assert list(executor.map(read, paths)) == [[1000]] * 4
+
+
+def test_parquet_read_num_threads():
+    import io
+
+    arrays = [pa.array(range(3), type=pa.int32()) for _ in range(20)]
+    schema = pa.schema([pa.field(f"c{i}", array.type) for i, array in enumerate(arrays)])
+    data = io.BytesIO()
+    pa.parquet.write_table(pa.table(arrays, schema), data, row_group_size=2)
+
+    data.seek(0)
+    expected = [chunk.arrays() for chunk in ad.ParquetFileReader(data)]
+    data.seek(0)
+    result = [chunk.arrays() for chunk in ad.ParquetFileReader(data, num_threads=4)]
+    assert result == expected
+    assert len(result) == 2
+
+
+def test_parquet_read_columns():
+    import io
+
+    arrays = [
+        pa.array(range(3), type=pa.int32()),
+        pa.array(["a", None, "c"], type=pa.string()),
+        pa.array([1.2, None, 3.4], type=pa.float64()),
+    ]
+    schema = pa.schema([pa.field(f"c{i}", array.type) for i, array in enumerate(arrays)])
+    data = io.BytesIO()
+    pa.parquet.write_table(pa.table(arrays, schema), data)
+
+    data.seek(0)
+    reader = ad.ParquetFileReader(data, columns=["c2", "c0"])
+    assert [f.name for f in reader.schema().fields] == ["c2", "c0"]
+    assert next(reader).arrays() == [
+        ad.Float64Array([1.2, None, 3.4]),
+        ad.Int32Array([0, 1, 2]),
+    ]
+
+    data.seek(0)
+    reader = ad.ParquetFileReader(data, columns=[1])
+    assert next(reader).arrays() == [ad.StringArray(["a", None, "c"])]
+
+
+def test_parquet_read_filters():
+    import io
+
+    table = pa.table(
+        {
+            "id": pa.array(range(6), type=pa.int64()),
+            "name": pa.array(["a", "b", "c", "d", "e", "f"], type=pa.string()),
+        }
+    )
+    data = io.BytesIO()
+    pa.parquet.write_table(table, data, row_group_size=2)
+
+    def read(filters):
+        data.seek(0)
+        return [chunk.arrays()[0] for chunk in ad.ParquetFileReader(data, filters=filters)]
+
+    assert read([("id", ">=", 4)]) == [ad.Int64Array([4, 5])]
+    assert read([("id", "in", [0, 5])]) == [ad.Int64Array([0, 1]), ad.Int64Array([4, 5])]
+    assert read([("id", ">", 0), ("name", "<", "c")]) == [ad.Int64Array([0, 1])]
+    assert read([("id", "==", 10)]) == []
+    assert len(read(None)) == 3
+
+
+def test_limit_offset():
+    import io
+
+    table = pa.table({"c0": pa.array(range(10), type=pa.int64())})
+
+    parquet = io.BytesIO()
+    pa.parquet.write_table(table, parquet, row_group_size=3)
+    ipc = io.BytesIO()
+    with pa.ipc.new_file(ipc, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=3):
+            writer.write(batch)
+
+    def read(reader, **kwargs):
+        reader.seek(0)
+        if reader is parquet:
+            chunks = ad.ParquetFileReader(reader, **kwargs)
+        else:
+            chunks = ad.ArrowFileReader(reader, **kwargs)
+        return [x for chunk in chunks for x in chunk.arrays()[0]]
+
+    for data in [parquet, ipc]:
+        assert read(data, limit=4) == [0, 1, 2, 3]
+        assert read(data, offset=4) == [4, 5, 6, 7, 8, 9]
+        assert read(data, offset=4, limit=3) == [4, 5, 6]
+        assert read(data, offset=6, limit=3) == [6, 7, 8]
+        assert read(data, offset=20) == []
+
+        # no chunk, not even an empty one, is read when the limit is 0
+        for kwargs in [{"limit": 0}, {"offset": 4, "limit": 0}]:
+            data.seek(0)
+            reader = ad.ParquetFileReader if data is parquet else ad.ArrowFileReader
+            assert list(reader(data, **kwargs)) == []
+
+
 def test_sql_roundtrip():
     arrays = [ad.Int32Array([1, None]), ad.StringArray(["aa", None])]
 
@@ -350,3 +1016,154 @@ def test_sql_roundtrip():
             ]
             chunk = next(chunks)
     assert chunk.arrays() == arrays
+
+
+def test_sql_prefetch():
+    arrays = [ad.Int32Array([1, None, 3]), ad.StringArray(["aa", None, "c"])]
+
+    with ad.ODBCConnector(r"Driver={SQLite3};Database=sqlite-test.db") as con:
+        con.execute("DROP TABLE IF EXISTS example_prefetch;")
+        con.execute("CREATE TABLE example_prefetch (c1 INT, c2 TEXT);")
+        for _ in range(4):
+            con.write("INSERT INTO example_prefetch (c1, c2) VALUES (?, ?)", ad.Chunk(arrays))
+
+        for prefetch in [0, 1, 2]:
+            with con.execute(
+                "SELECT c1, c2 FROM example_prefetch", 3, prefetch=prefetch
+            ) as chunks:
+                assert [len(next(chunks)) for _ in range(4)] == [3] * 4
+
+
+def test_sql_pool():
+    import concurrent.futures
+
+    arrays = [ad.Int32Array([1, None]), ad.StringArray(["aa", None])]
+
+    with ad.ODBCPool(
+        r"Driver={SQLite3};Database=sqlite-test.db",
+        min_size=1,
+        max_size=2,
+        health_check="SELECT 1",
+    ) as pool:
+        with pool.connection() as con:
+            con.execute("DROP TABLE IF EXISTS example_pool;")
+            con.execute("CREATE TABLE example_pool (c1 INT, c2 TEXT);")
+            con.write("INSERT INTO example_pool (c1, c2) VALUES (?, ?)", ad.Chunk(arrays))
+
+        def read(_):
+            with pool.connection() as con:
+                with con.execute("SELECT c1, c2 FROM example_pool", 1024) as chunks:
+                    return next(chunks).arrays()
+
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            assert list(executor.map(read, range(8))) == [arrays] * 8
+
+        stats = pool.stats()
+        assert stats["checkouts"] == 9
+        assert stats["creations"] <= 2
+        assert stats["size"] <= 2
+
+        # a cursor keeps its connection checked out after the connector exited
+        with pool.connection() as con:
+            chunks = con.execute("SELECT c1, c2 FROM example_pool", 1024)
+        assert pool.stats()["idle"] == pool.stats()["size"] - 1
+        assert next(chunks).arrays() == arrays
+        del chunks
+        assert pool.stats()["idle"] == pool.stats()["size"]
+
+
+def test_sql_write_many():
+    import io
+
+    arrays = [ad.Int32Array([1, None, 3]), ad.StringArray(["aa", None, "c"])]
+    schema = ad.Schema(
+        [ad.Field("c1", ad.DataType.int32(), True), ad.Field("c2", ad.DataType.string(), True)]
+    )
+    data = io.BytesIO()
+    with ad.ParquetFileWriter(data, schema) as writer:
+        for _ in range(10):
+            writer.write(ad.Chunk(arrays))
+    data.seek(0)
+
+    with ad.ODBCConnector(r"Driver={SQLite3};Database=sqlite-test.db") as con:
+        con.execute("DROP TABLE IF EXISTS example_many;")
+        con.execute("CREATE TABLE example_many (c1 INT, c2 TEXT);")
+
+        rows = con.write_many(
+            "INSERT INTO example_many (c1, c2) VALUES (?, ?)",
+            ad.ParquetFileReader(data),
+            batch_size=2,
+            commit_every=4,
+        )
+        assert rows == 30
+
+        with con.execute("SELECT c1, c2 FROM example_many", 1024) as chunks:
+            assert len(next(chunks)) == 30
+
+        # copy between tables of the same connection
+        con.execute("DROP TABLE IF EXISTS example_many_copy;")
+        con.execute("CREATE TABLE example_many_copy (c1 INT, c2 TEXT);")
+        with con.execute("SELECT c1, c2 FROM example_many", 7, prefetch=1) as chunks:
+            rows = con.write_many(
+                "INSERT INTO example_many_copy (c1, c2) VALUES (?, ?)", chunks, commit_every=2
+            )
+        assert rows == 30
+
+        with con.execute("SELECT c1, c2 FROM example_many_copy", 1024) as chunks:
+            assert len(next(chunks)) == 30
+
+        chunks = [
+            ad.Chunk(arrays),
+            ad.Chunk([ad.Int64Array([1, None, 3]), ad.StringArray(["aa", None, "c"])]),
+        ]
+        try:
+            con.write_many("INSERT INTO example_many (c1, c2) VALUES (?, ?)", chunks)
+            assert False
+        except ValueError:
+            pass
+
+
+def test_sql_export():
+    import io
+
+    arrays = [ad.Int32Array([1, None, 3]), ad.StringArray(["aa", None, "c"])]
+
+    with ad.ODBCConnector(r"Driver={SQLite3};Database=sqlite-test.db") as con:
+        con.execute("DROP TABLE IF EXISTS example_export;")
+        con.execute("CREATE TABLE example_export (c1 INT, c2 TEXT);")
+        for _ in range(5):
+            con.write("INSERT INTO example_export (c1, c2) VALUES (?, ?)", ad.Chunk(arrays))
+
+        data = io.BytesIO()
+        rows, size = con.export(
+            "SELECT c1, c2 FROM example_export", data, batch_size=2, row_group_size=4
+        )
+        assert rows == 15
+        assert size == len(data.getvalue())
+        data.seek(0)
+        chunks = list(ad.ParquetFileReader(data))
+        assert [len(chunk) for chunk in chunks] == [4, 4, 4, 3]
+        assert chunks[0].arrays()[0] == ad.Int32Array([1, None, 3, 1])
+
+        data = io.BytesIO()
+        rows, size = con.export(
+            "SELECT c1, c2 FROM example_export", data, format="arrow", compression="lz4"
+        )
+        assert rows == 15
+        assert size == len(data.getvalue())
+        data.seek(0)
+        chunks = list(ad.ArrowFileReader(data))
+        assert [len(chunk) for chunk in chunks] == [15]
+        assert chunks[0].arrays()[1] == ad.StringArray(["aa", None, "c"] * 5)
+
+        try:
+            con.export("SELECT c1 FROM example_export", io.BytesIO(), format="csv")
+            assert False
+        except ValueError:
+            pass
+
+        try:
+            con.export("SELECT c1 FROM example_export", io.BytesIO(), row_group_size=0)
+            assert False
+        except ValueError:
+            pass